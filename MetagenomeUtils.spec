@@ -18,12 +18,25 @@ module MetagenomeUtils {
       assembly_ref: Metagenome assembly object reference
       binned_contig_name: BinnedContig object name
       workspace_name: the name/id of the workspace it gets saved to
+
+      optional params:
+      parallelism: number of bins processed concurrently. default to the number of CPUs
+      contig_bin_file: contig to bin table (tab/comma separated contig_id, bin_id) used instead
+                       of bin fasta files in file_directory; bins are built from assembly
+                       contig stats only
+      previous_binned_contig_ref: BinnedContig object from an earlier run of file_to_binned_contigs;
+                                  its bins whose bin file is unchanged are reused without re-scanning.
+                                  Bin file fingerprints are kept in the local binned contig cache, if
+                                  none are found for it every bin is rebuilt
     */
     typedef structure {
       string file_directory;
       obj_ref assembly_ref;
       string binned_contig_name;
       string workspace_name;
+      int parallelism;
+      string contig_bin_file;
+      obj_ref previous_binned_contig_ref;
     } FileToBinnedContigParams;
 
     typedef structure {
@@ -39,6 +52,16 @@ module MetagenomeUtils {
       binned_contig_name: BinnedContig object name
       workspace_name: the name/id of the workspace it gets saved to
 
+      optional params:
+      parallelism: number of bins processed concurrently. default to the number of CPUs
+      contig_bin_file: contig to bin table (tab/comma separated contig_id, bin_id) used instead
+                       of bin fasta files in file_directory; bins are built from assembly
+                       contig stats only
+      previous_binned_contig_ref: BinnedContig object from an earlier run of file_to_binned_contigs;
+                                  its bins whose bin file is unchanged are reused without re-scanning.
+                                  Bin file fingerprints are kept in the local binned contig cache, if
+                                  none are found for it every bin is rebuilt
+
       return params:
       binned_contig_obj_ref: generated result BinnedContig object reference
 
@@ -51,10 +74,42 @@ module MetagenomeUtils {
 
       optional params:
       save_to_shock: saving result bin files to shock. default to True
+      engine: (binned_contigs_to_file only) how bin files are written, one of
+              indexed: read each bin's contigs through a .fai index of the assembly
+              bucketed: stream the assembly once, routing each contig to its bin file
+              default to bucketed if bin_id_list picks out bins sharing no contig (and bin
+              files are kept, not concatenated), otherwise indexed
+      line_width: (binned_contigs_to_file only) wrap bin file sequences every line_width
+                  bases (e.g. 60 or 80), default to 0: each sequence on a single line
+      keep_bin_files: (binned_contigs_to_file only) write bin files into bin_file_directory.
+                      default to True, if set to False bins are streamed straight into the
+                      packed file
+      compression: (binned_contigs_to_file only) packed file layout, one of
+                   deflated (default): deflated bin files
+                   stored: uncompressed bin files
+                   bgzf: bin files compressed to BGZF (bgzip compatible gzip, named
+                         bin_id + '.gz') and stored uncompressed in the packed file
+      compression_level: (binned_contigs_to_file only) zlib level 0-9 of deflated or BGZF
+                         bin files
+      parallelism: (binned_contigs_to_file only) number of threads writing (indexed engine)
+                   and BGZF compressing bin files side by side. default to 1
+      output_layout: (binned_contigs_to_file only) one of
+                     bin_files (default): one fasta file per bin, named by bin id
+                     concatenated: all bins in a single fasta file (binned_contigs.fasta)
+                                   with >contig_id bin=<bid> headers, plus a TSV manifest of
+                                   the byte range of each bin in the uncompressed file
+                                   (binned_contigs.manifest.tsv)
     */
     typedef structure {
       string input_ref;
       boolean save_to_shock;
+      string engine;
+      int line_width;
+      boolean keep_bin_files;
+      string compression;
+      int compression_level;
+      int parallelism;
+      string output_layout;
     } ExportParams;
 
     /*
@@ -74,16 +129,41 @@ module MetagenomeUtils {
 
       optional params:
       save_to_shock: saving result bin files to shock. default to True
+      engine: how bin files are written, one of
+              indexed: read each bin's contigs through a .fai index of the assembly
+              bucketed: stream the assembly once, routing each contig to its bin file
+              default to bucketed if bin_id_list picks out bins sharing no contig (and bin
+              files are kept, not concatenated), otherwise indexed
+      line_width: wrap bin file sequences every line_width bases (e.g. 60 or 80),
+                  default to 0: each sequence on a single line
+      keep_bin_files: write bin files into bin_file_directory. default to True, if set to
+                      False bins are streamed straight into the packed file
+      compression: packed file layout, one of
+                   deflated (default): deflated bin files
+                   stored: uncompressed bin files
+                   bgzf: bin files compressed to BGZF (bgzip compatible gzip, named
+                         bin_id + '.gz') and stored uncompressed in the packed file
+      compression_level: zlib level 0-9 of deflated or BGZF bin files
+      parallelism: number of threads writing (indexed engine) and BGZF compressing bin
+                   files side by side. default to 1
+      output_layout: one of
+                     bin_files (default): one fasta file per bin, named by bin id
+                     concatenated: all bins in a single fasta file (binned_contigs.fasta)
+                                   with >contig_id bin=<bid> headers, plus a TSV manifest of
+                                   the byte range of each bin in the uncompressed file
+                                   (binned_contigs.manifest.tsv)
 
       return params:
       shock_id: saved packed file shock id (None if save_to_shock is set to False)
-      bin_file_directory: directory that contains all bin files
+      bin_file_directory: directory that contains all bin files (None if keep_bin_files is
+                          set to False)
     */
     funcdef binned_contigs_to_file(ExportParams params)
         returns (ExportOutput returnVal) authentication required;
 
     /*
       export_binned_contigs_as_excel: Convert BinnedContig object to an excel file and pack it to shock
+                                      one sheet per bin, with one row per contig
 
       required params:
       input_ref: BinnedContig object reference
@@ -102,15 +182,38 @@ module MetagenomeUtils {
       string shock_id;
       string workspace_name;
       string binned_contigs_name;
+      int parallelism;
+      boolean validate;
     } ImportExcelParams;
 
+    /*
+      bid: bin id
+      contig_id: contig of the bin missing from the assembly
+    */
+    typedef structure {
+      string bid;
+      string contig_id;
+    } UnknownContig;
+
+    /*
+      contig_id: contig found in more than one bin (or twice in a bin)
+      bids: bins of the contig, one per occurrence
+    */
+    typedef structure {
+      string contig_id;
+      list<string> bids;
+    } DuplicateContig;
+
     typedef structure {
       string report_name;
       string report_ref;
       string binned_contigs_ref;
+      list<UnknownContig> unknown_contigs;
+      list<DuplicateContig> duplicate_contigs;
     } ImportExcelOutput;
     /*
     import_excel_as_binned_contigs: Import an excel file as BinnedContigs
+                                    sheets with one row or one column per contig are read
 
     required params:
     shock_id: Excel file stored in shock
@@ -119,10 +222,87 @@ module MetagenomeUtils {
     optional params:
     binned_contigs_name: saved BinnedContig name. 
                          Auto append timestamp from excel if not given.
+    parallelism: number of worker processes parsing sheets side by side. default to 1
+    validate: check contig ids against assembly_ref before saving. default to False
+
+    return params:
+    binned_contigs_ref: saved BinnedContig reference (None if validation failed)
+    unknown_contigs: (validate only) contigs missing from assembly_ref
+    duplicate_contigs: (validate only) contigs found in more than one bin
     */
     funcdef import_excel_as_binned_contigs(ImportExcelParams params)
         returns (ImportExcelOutput returnVal) authentication required;
 
+    /*
+      input_ref: BinnedContig object reference
+
+      optional params:
+      save_to_shock: saving result table file to shock. default to True
+      table_format: one of tsv (default) or csv
+    */
+    typedef structure {
+      string input_ref;
+      boolean save_to_shock;
+      string table_format;
+    } ExportTableParams;
+
+    /*
+      export_binned_contigs_as_table: Convert BinnedContig object to a TSV or CSV table and pack
+                                      it to shock, one row per contig
+
+      the table starts with an #assembly_ref row and one #bin | bin_id | total_coverage row per
+      bin, followed by a bin_id | contig_id | gc | len | cov header row and the contig rows
+      grouped by bin; a contig without coverage has an empty cov field
+
+      required params:
+      input_ref: BinnedContig object reference
+
+      optional params:
+      save_to_shock: saving result table file to shock. default to True
+      table_format: one of tsv (default) or csv
+
+      return params:
+      shock_id: saved packed file shock id (None if save_to_shock is set to False)
+      bin_file_directory: directory that contains the table file
+    */
+    funcdef export_binned_contigs_as_table(ExportTableParams params)
+        returns (ExportOutput returnVal) authentication required;
+
+    typedef structure {
+      string shock_id;
+      string workspace_name;
+      string binned_contigs_name;
+      boolean validate;
+    } ImportTableParams;
+
+    typedef structure {
+      string report_name;
+      string report_ref;
+      string binned_contigs_ref;
+      list<UnknownContig> unknown_contigs;
+      list<DuplicateContig> duplicate_contigs;
+    } ImportTableOutput;
+    /*
+    import_table_as_binned_contigs: Import a TSV or CSV table written by
+                                    export_binned_contigs_as_table as BinnedContigs
+
+    required params:
+    shock_id: table file stored in shock
+    workspace_name: the name of the workspace object gets saved to
+
+    optional params:
+    binned_contigs_name: saved BinnedContig name.
+                         Auto append timestamp from table file if not given.
+    validate: check contig ids against assembly_ref before saving. default to False
+
+    return params:
+    binned_contigs_ref: saved BinnedContig reference (None if validation failed)
+    unknown_contigs: (validate only) contigs missing from assembly_ref
+    duplicate_contigs: (validate only) contigs found in more than one bin
+    */
+    funcdef import_table_as_binned_contigs(ImportTableParams params)
+        returns (ImportTableOutput returnVal) authentication required;
+
     /*
       binned_contig_obj_ref: BinnedContig object reference
       extracted_assemblies: a list of dictionaries:
@@ -130,6 +310,7 @@ module MetagenomeUtils {
       assembly_suffix: suffix appended to assembly object name
       assembly_set_name:  name for created assembly set
       workspace_name: the name of the workspace it gets saved to
+      max_concurrent_saves: number of Assembly saves in flight. default to 4
     */
     typedef structure {
       obj_ref binned_contig_obj_ref;
@@ -137,15 +318,29 @@ module MetagenomeUtils {
       string assembly_suffix;
       string assembly_set_name;
       string workspace_name;
+      int max_concurrent_saves;
     } ExtractBinAsAssemblyParams;
 
+    /*
+      bid: bin id
+      error: why the Assembly of the bin could not be saved
+    */
+    typedef structure {
+      string bid;
+      string error;
+    } FailedBin;
+
     /*
       assembly_ref_list: list of generated Assembly object reference
+      assembly_refs: generated Assembly object reference by bin id
+      failed_bins: bins whose Assembly could not be saved
       report_name: report name generated by KBaseReport
       report_ref: report reference generated by KBaseReport
     */
     typedef structure {
       list <obj_ref> assembly_ref_list;
+      mapping<string, obj_ref> assembly_refs;
+      list<FailedBin> failed_bins;
       string report_name;
       string report_ref;
       string assembly_set_ref;
@@ -161,8 +356,14 @@ module MetagenomeUtils {
             assembly_suffix: suffix appended to assembly object name
       workspace_name: the name of the workspace it gets saved to
 
+      optional params:
+      max_concurrent_saves: number of Assembly saves in flight. default to 4
+
       return params:
-      assembly_ref_list: list of generated result Assembly object reference
+      assembly_ref_list: list of generated result Assembly object reference, in
+                         extracted_assemblies order without the failed bins
+      assembly_refs: generated result Assembly object reference by bin id
+      failed_bins: bins whose Assembly could not be saved, the others are still saved
       report_name: report name generated by KBaseReport
       report_ref: report reference generated by KBaseReport
     */
@@ -54,6 +54,15 @@ class MetagenomeUtils:
         assembly_ref: Metagenome assembly object reference
         binned_contig_name: BinnedContig object name
         workspace_name: the name/id of the workspace it gets saved to
+        optional params:
+        parallelism: number of bins processed concurrently. default to the number of CPUs
+        contig_bin_file: contig to bin table (tab/comma separated contig_id, bin_id) used instead
+                         of bin fasta files in file_directory; bins are built from assembly
+                         contig stats only
+        previous_binned_contig_ref: BinnedContig object from an earlier run of file_to_binned_contigs;
+                                    its bins whose bin file is unchanged are reused without re-scanning.
+                                    Bin file fingerprints are kept in the local binned contig cache, if
+                                    none are found for it every bin is rebuilt
         return params:
         binned_contig_obj_ref: generated result BinnedContig object reference
         :param params: instance of type "FileToBinnedContigParams"
@@ -61,11 +70,22 @@ class MetagenomeUtils:
            contig file(s) to build BinnedContig object assembly_ref:
            Metagenome assembly object reference binned_contig_name:
            BinnedContig object name workspace_name: the name/id of the
-           workspace it gets saved to) -> structure: parameter
-           "file_directory" of String, parameter "assembly_ref" of type
-           "obj_ref" (An X/Y/Z style reference), parameter
-           "binned_contig_name" of String, parameter "workspace_name" of
-           String
+           workspace it gets saved to optional params: parallelism: number
+           of bins processed concurrently. default to the number of CPUs
+           contig_bin_file: contig to bin table (tab/comma separated
+           contig_id, bin_id) used instead of bin fasta files in
+           file_directory; bins are built from assembly contig stats only
+           previous_binned_contig_ref: BinnedContig object from an earlier
+           run of file_to_binned_contigs; its bins whose bin file is
+           unchanged are reused without re-scanning. Bin file fingerprints
+           are kept in the local binned contig cache, if none are found for
+           it every bin is rebuilt) -> structure: parameter "file_directory"
+           of String, parameter "assembly_ref" of type "obj_ref" (An X/Y/Z
+           style reference), parameter "binned_contig_name" of String,
+           parameter "workspace_name" of String, parameter "parallelism" of
+           Long, parameter "contig_bin_file" of String, parameter
+           "previous_binned_contig_ref" of type "obj_ref" (An X/Y/Z style
+           reference)
         :returns: instance of type "FileToBinnedContigResult" -> structure:
            parameter "binned_contig_obj_ref" of type "obj_ref" (An X/Y/Z
            style reference)
@@ -98,14 +118,68 @@ class MetagenomeUtils:
         input_ref: BinnedContig object reference
         optional params:
         save_to_shock: saving result bin files to shock. default to True
+        engine: how bin files are written, one of
+                indexed: read each bin's contigs through a .fai index of the assembly
+                bucketed: stream the assembly once, routing each contig to its bin file
+                default to bucketed if bin_id_list picks out bins sharing no contig (and bin
+                files are kept, not concatenated), otherwise indexed
+        line_width: wrap bin file sequences every line_width bases (e.g. 60 or 80),
+                    default to 0: each sequence on a single line
+        keep_bin_files: write bin files into bin_file_directory. default to True, if set to
+                        False bins are streamed straight into the packed file
+        compression: packed file layout, one of
+                     deflated (default): deflated bin files
+                     stored: uncompressed bin files
+                     bgzf: bin files compressed to BGZF (bgzip compatible gzip, named
+                           bin_id + '.gz') and stored uncompressed in the packed file
+        compression_level: zlib level 0-9 of deflated or BGZF bin files
+        parallelism: number of threads writing (indexed engine) and BGZF compressing bin
+                     files side by side. default to 1
+        output_layout: one of
+                       bin_files (default): one fasta file per bin, named by bin id
+                       concatenated: all bins in a single fasta file (binned_contigs.fasta)
+                                     with >contig_id bin=<bid> headers, plus a TSV manifest of
+                                     the byte range of each bin in the uncompressed file
+                                     (binned_contigs.manifest.tsv)
         return params:
         shock_id: saved packed file shock id (None if save_to_shock is set to False)
-        bin_file_directory: directory that contains all bin files
+        bin_file_directory: directory that contains all bin files (None if keep_bin_files is
+                            set to False)
         :param params: instance of type "ExportParams" (input_ref:
            BinnedContig object reference optional params: save_to_shock:
-           saving result bin files to shock. default to True) -> structure:
-           parameter "input_ref" of String, parameter "save_to_shock" of type
-           "boolean" (A boolean - 0 for false, 1 for true. @range (0, 1))
+           saving result bin files to shock. default to True engine:
+           (binned_contigs_to_file only) how bin files are written, one of
+           indexed: read each bin's contigs through a .fai index of the
+           assembly bucketed: stream the assembly once, routing each contig
+           to its bin file default to bucketed if bin_id_list picks out bins
+           sharing no contig (and bin files are kept, not concatenated),
+           otherwise indexed line_width: (binned_contigs_to_file only) wrap
+           bin file sequences every line_width bases (e.g. 60 or 80),
+           default to 0: each sequence on a single line keep_bin_files:
+           (binned_contigs_to_file only) write bin files into
+           bin_file_directory. default to True, if set to False bins are
+           streamed straight into the packed file compression:
+           (binned_contigs_to_file only) packed file layout, one of deflated
+           (default): deflated bin files stored: uncompressed bin files
+           bgzf: bin files compressed to BGZF (bgzip compatible gzip, named
+           bin_id + '.gz') and stored uncompressed in the packed file
+           compression_level: (binned_contigs_to_file only) zlib level 0-9
+           of deflated or BGZF bin files parallelism:
+           (binned_contigs_to_file only) number of threads writing (indexed
+           engine) and BGZF compressing bin files side by side. default to 1
+           output_layout: (binned_contigs_to_file only) one of bin_files
+           (default): one fasta file per bin, named by bin id concatenated:
+           all bins in a single fasta file (binned_contigs.fasta) with
+           >contig_id bin=<bid> headers, plus a TSV manifest of the byte
+           range of each bin in the uncompressed file
+           (binned_contigs.manifest.tsv)) -> structure: parameter
+           "input_ref" of String, parameter "save_to_shock" of type
+           "boolean" (A boolean - 0 for false, 1 for true. @range (0, 1)),
+           parameter "engine" of String, parameter "line_width" of Long,
+           parameter "keep_bin_files" of type "boolean" (A boolean - 0 for
+           false, 1 for true. @range (0, 1)), parameter "compression" of
+           String, parameter "compression_level" of Long, parameter
+           "parallelism" of Long, parameter "output_layout" of String
         :returns: instance of type "ExportOutput" (shock_id: saved packed
            file shock id bin_file_directory: directory that contains all bin
            files) -> structure: parameter "shock_id" of String, parameter
@@ -135,6 +209,7 @@ class MetagenomeUtils:
     def export_binned_contigs_as_excel(self, ctx, params):
         """
         export_binned_contigs_as_excel: Convert BinnedContig object to an excel file and pack it to shock
+                                        one sheet per bin, with one row per contig
         required params:
         input_ref: BinnedContig object reference
         optional params:
@@ -144,9 +219,39 @@ class MetagenomeUtils:
         bin_file_directory: directory that contains all bin files
         :param params: instance of type "ExportParams" (input_ref:
            BinnedContig object reference optional params: save_to_shock:
-           saving result bin files to shock. default to True) -> structure:
-           parameter "input_ref" of String, parameter "save_to_shock" of type
-           "boolean" (A boolean - 0 for false, 1 for true. @range (0, 1))
+           saving result bin files to shock. default to True engine:
+           (binned_contigs_to_file only) how bin files are written, one of
+           indexed: read each bin's contigs through a .fai index of the
+           assembly bucketed: stream the assembly once, routing each contig
+           to its bin file default to bucketed if bin_id_list picks out bins
+           sharing no contig (and bin files are kept, not concatenated),
+           otherwise indexed line_width: (binned_contigs_to_file only) wrap
+           bin file sequences every line_width bases (e.g. 60 or 80),
+           default to 0: each sequence on a single line keep_bin_files:
+           (binned_contigs_to_file only) write bin files into
+           bin_file_directory. default to True, if set to False bins are
+           streamed straight into the packed file compression:
+           (binned_contigs_to_file only) packed file layout, one of deflated
+           (default): deflated bin files stored: uncompressed bin files
+           bgzf: bin files compressed to BGZF (bgzip compatible gzip, named
+           bin_id + '.gz') and stored uncompressed in the packed file
+           compression_level: (binned_contigs_to_file only) zlib level 0-9
+           of deflated or BGZF bin files parallelism:
+           (binned_contigs_to_file only) number of threads writing (indexed
+           engine) and BGZF compressing bin files side by side. default to 1
+           output_layout: (binned_contigs_to_file only) one of bin_files
+           (default): one fasta file per bin, named by bin id concatenated:
+           all bins in a single fasta file (binned_contigs.fasta) with
+           >contig_id bin=<bid> headers, plus a TSV manifest of the byte
+           range of each bin in the uncompressed file
+           (binned_contigs.manifest.tsv)) -> structure: parameter
+           "input_ref" of String, parameter "save_to_shock" of type
+           "boolean" (A boolean - 0 for false, 1 for true. @range (0, 1)),
+           parameter "engine" of String, parameter "line_width" of Long,
+           parameter "keep_bin_files" of type "boolean" (A boolean - 0 for
+           false, 1 for true. @range (0, 1)), parameter "compression" of
+           String, parameter "compression_level" of Long, parameter
+           "parallelism" of Long, parameter "output_layout" of String
         :returns: instance of type "ExportOutput" (shock_id: saved packed
            file shock id bin_file_directory: directory that contains all bin
            files) -> structure: parameter "shock_id" of String, parameter
@@ -176,18 +281,35 @@ class MetagenomeUtils:
     def import_excel_as_binned_contigs(self, ctx, params):
         """
         import_excel_as_binned_contigs: Import an excel file as BinnedContigs
+                                        sheets with one row or one column per contig are read
         required params:
         shock_id: Excel file stored in shock
         workspace_name: the name of the workspace object gets saved to
         optional params:
         binned_contigs_name: saved BinnedContig name. 
                              Auto append timestamp from excel if not given.
+        parallelism: number of worker processes parsing sheets side by side. default to 1
+        validate: check contig ids against assembly_ref before saving. default to False
+        return params:
+        binned_contigs_ref: saved BinnedContig reference (None if validation failed)
+        unknown_contigs: (validate only) contigs missing from assembly_ref
+        duplicate_contigs: (validate only) contigs found in more than one bin
         :param params: instance of type "ImportExcelParams" -> structure:
            parameter "shock_id" of String, parameter "workspace_name" of
-           String, parameter "binned_contigs_name" of String
+           String, parameter "binned_contigs_name" of String, parameter
+           "parallelism" of Long, parameter "validate" of type "boolean" (A
+           boolean - 0 for false, 1 for true. @range (0, 1))
         :returns: instance of type "ImportExcelOutput" -> structure:
            parameter "report_name" of String, parameter "report_ref" of
-           String, parameter "binned_contigs_ref" of String
+           String, parameter "binned_contigs_ref" of String, parameter
+           "unknown_contigs" of list of type "UnknownContig" (bid: bin id
+           contig_id: contig of the bin missing from the assembly) ->
+           structure: parameter "bid" of String, parameter "contig_id" of
+           String, parameter "duplicate_contigs" of list of type
+           "DuplicateContig" (contig_id: contig found in more than one bin
+           (or twice in a bin) bids: bins of the contig, one per occurrence)
+           -> structure: parameter "contig_id" of String, parameter "bids"
+           of list of String
         """
         # ctx is the context object
         # return variables are: returnVal
@@ -210,6 +332,107 @@ class MetagenomeUtils:
         # return the results
         return [returnVal]
 
+    def export_binned_contigs_as_table(self, ctx, params):
+        """
+        export_binned_contigs_as_table: Convert BinnedContig object to a TSV or CSV table and pack
+                                        it to shock, one row per contig
+        the table starts with an #assembly_ref row and one #bin | bin_id | total_coverage row per
+        bin, followed by a bin_id | contig_id | gc | len | cov header row and the contig rows
+        grouped by bin; a contig without coverage has an empty cov field
+        required params:
+        input_ref: BinnedContig object reference
+        optional params:
+        save_to_shock: saving result table file to shock. default to True
+        table_format: one of tsv (default) or csv
+        return params:
+        shock_id: saved packed file shock id (None if save_to_shock is set to False)
+        bin_file_directory: directory that contains the table file
+        :param params: instance of type "ExportTableParams" (input_ref:
+           BinnedContig object reference optional params: save_to_shock:
+           saving result table file to shock. default to True table_format:
+           one of tsv (default) or csv) -> structure: parameter "input_ref"
+           of String, parameter "save_to_shock" of type "boolean" (A boolean
+           - 0 for false, 1 for true. @range (0, 1)), parameter
+           "table_format" of String
+        :returns: instance of type "ExportOutput" (shock_id: saved packed
+           file shock id bin_file_directory: directory that contains all bin
+           files) -> structure: parameter "shock_id" of String, parameter
+           "bin_file_directory" of String
+        """
+        # ctx is the context object
+        # return variables are: returnVal
+        #BEGIN export_binned_contigs_as_table
+        logging.info('--->\nRunning MetagenomeUtils.export_binned_contigs_as_table\nparams:'
+                     + json.dumps(params, indent=1))
+
+        for key, value in params.items():
+            if isinstance(value, str):
+                params[key] = value.strip()
+
+        binned_contig_downloader = MetagenomeFileUtils(self.config)
+        returnVal = binned_contig_downloader.export_binned_contigs_as_table(params)
+        #END export_binned_contigs_as_table
+
+        # At some point might do deeper type checking...
+        if not isinstance(returnVal, dict):
+            raise ValueError('Method export_binned_contigs_as_table return value ' +
+                             'returnVal is not type dict as required.')
+        # return the results
+        return [returnVal]
+
+    def import_table_as_binned_contigs(self, ctx, params):
+        """
+        import_table_as_binned_contigs: Import a TSV or CSV table written by
+                                        export_binned_contigs_as_table as BinnedContigs
+        required params:
+        shock_id: table file stored in shock
+        workspace_name: the name of the workspace object gets saved to
+        optional params:
+        binned_contigs_name: saved BinnedContig name.
+                             Auto append timestamp from table file if not given.
+        validate: check contig ids against assembly_ref before saving. default to False
+        return params:
+        binned_contigs_ref: saved BinnedContig reference (None if validation failed)
+        unknown_contigs: (validate only) contigs missing from assembly_ref
+        duplicate_contigs: (validate only) contigs found in more than one bin
+        :param params: instance of type "ImportTableParams" -> structure:
+           parameter "shock_id" of String, parameter "workspace_name" of
+           String, parameter "binned_contigs_name" of String, parameter
+           "validate" of type "boolean" (A boolean - 0 for false, 1 for
+           true. @range (0, 1))
+        :returns: instance of type "ImportTableOutput" -> structure:
+           parameter "report_name" of String, parameter "report_ref" of
+           String, parameter "binned_contigs_ref" of String, parameter
+           "unknown_contigs" of list of type "UnknownContig" (bid: bin id
+           contig_id: contig of the bin missing from the assembly) ->
+           structure: parameter "bid" of String, parameter "contig_id" of
+           String, parameter "duplicate_contigs" of list of type
+           "DuplicateContig" (contig_id: contig found in more than one bin
+           (or twice in a bin) bids: bins of the contig, one per occurrence)
+           -> structure: parameter "contig_id" of String, parameter "bids"
+           of list of String
+        """
+        # ctx is the context object
+        # return variables are: returnVal
+        #BEGIN import_table_as_binned_contigs
+        logging.info('--->\nRunning MetagenomeUtils.import_table_as_binned_contigs\nparams:'
+                     + json.dumps(params, indent=1))
+
+        for key, value in params.items():
+            if isinstance(value, str):
+                params[key] = value.strip()
+
+        binned_contig_importer = MetagenomeFileUtils(self.config)
+        returnVal = binned_contig_importer.import_table_as_binned_contigs(params)
+        #END import_table_as_binned_contigs
+
+        # At some point might do deeper type checking...
+        if not isinstance(returnVal, dict):
+            raise ValueError('Method import_table_as_binned_contigs return value ' +
+                             'returnVal is not type dict as required.')
+        # return the results
+        return [returnVal]
+
     def extract_binned_contigs_as_assembly(self, ctx, params):
         """
         extract_binned_contigs_as_assembly: extract one/multiple Bins from BinnedContigs as Assembly object
@@ -219,8 +442,13 @@ class MetagenomeUtils:
               bin_id: target bin id to be extracted
               assembly_suffix: suffix appended to assembly object name
         workspace_name: the name of the workspace it gets saved to
+        optional params:
+        max_concurrent_saves: number of Assembly saves in flight. default to 4
         return params:
-        assembly_ref_list: list of generated result Assembly object reference
+        assembly_ref_list: list of generated result Assembly object reference, in
+                           extracted_assemblies order without the failed bins
+        assembly_refs: generated result Assembly object reference by bin id
+        failed_bins: bins whose Assembly could not be saved, the others are still saved
         report_name: report name generated by KBaseReport
         report_ref: report reference generated by KBaseReport
         :param params: instance of type "ExtractBinAsAssemblyParams"
@@ -228,18 +456,28 @@ class MetagenomeUtils:
            extracted_assemblies: a list of dictionaries: bin_id: target bin
            id to be extracted assembly_suffix: suffix appended to assembly
            object name assembly_set_name:  name for created assembly set
-           workspace_name: the name of the workspace it gets saved to) ->
-           structure: parameter "binned_contig_obj_ref" of type "obj_ref" (An
-           X/Y/Z style reference), parameter "extracted_assemblies" of
-           String, parameter "assembly_suffix" of String, parameter
-           "assembly_set_name" of String, parameter "workspace_name" of String
+           workspace_name: the name of the workspace it gets saved to
+           max_concurrent_saves: number of Assembly saves in flight. default
+           to 4) -> structure: parameter "binned_contig_obj_ref" of type
+           "obj_ref" (An X/Y/Z style reference), parameter
+           "extracted_assemblies" of String, parameter "assembly_suffix" of
+           String, parameter "assembly_set_name" of String, parameter
+           "workspace_name" of String, parameter "max_concurrent_saves" of
+           Long
         :returns: instance of type "ExtractBinAsAssemblyResult"
            (assembly_ref_list: list of generated Assembly object reference
-           report_name: report name generated by KBaseReport report_ref:
-           report reference generated by KBaseReport) -> structure: parameter
+           assembly_refs: generated Assembly object reference by bin id
+           failed_bins: bins whose Assembly could not be saved report_name:
+           report name generated by KBaseReport report_ref: report reference
+           generated by KBaseReport) -> structure: parameter
            "assembly_ref_list" of list of type "obj_ref" (An X/Y/Z style
-           reference), parameter "report_name" of String, parameter
-           "report_ref" of String, parameter "assembly_set_ref" of String
+           reference), parameter "assembly_refs" of mapping from String to
+           type "obj_ref" (An X/Y/Z style reference), parameter
+           "failed_bins" of list of type "FailedBin" (bid: bin id error: why
+           the Assembly of the bin could not be saved) -> structure:
+           parameter "bid" of String, parameter "error" of String, parameter
+           "report_name" of String, parameter "report_ref" of String,
+           parameter "assembly_set_ref" of String
         """
         # ctx is the context object
         # return variables are: returnVal
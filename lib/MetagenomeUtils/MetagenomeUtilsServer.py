@@ -354,6 +354,14 @@ class Application(object):
                              name='MetagenomeUtils.import_excel_as_binned_contigs',
                              types=[dict])
         self.method_authentication['MetagenomeUtils.import_excel_as_binned_contigs'] = 'required'  # noqa
+        self.rpc_service.add(impl_MetagenomeUtils.export_binned_contigs_as_table,
+                             name='MetagenomeUtils.export_binned_contigs_as_table',
+                             types=[dict])
+        self.method_authentication['MetagenomeUtils.export_binned_contigs_as_table'] = 'required'  # noqa
+        self.rpc_service.add(impl_MetagenomeUtils.import_table_as_binned_contigs,
+                             name='MetagenomeUtils.import_table_as_binned_contigs',
+                             types=[dict])
+        self.method_authentication['MetagenomeUtils.import_table_as_binned_contigs'] = 'required'  # noqa
         self.rpc_service.add(impl_MetagenomeUtils.extract_binned_contigs_as_assembly,
                              name='MetagenomeUtils.extract_binned_contigs_as_assembly',
                              types=[dict])
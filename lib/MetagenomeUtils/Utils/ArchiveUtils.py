@@ -0,0 +1,188 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import struct
+import tarfile
+import uuid
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+_DECOMPRESSORS = {'.gz': lambda stream: gzip.GzipFile(fileobj=stream),
+                  '.bz2': bz2.BZ2File,
+                  '.xz': lzma.LZMAFile}
+_TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+_ZIP_SUFFIXES = ('.zip',)
+_BLOCK_SIZE = 1024 * 1024
+# BGZF blocks hold at most 64KB of compressed data, samtools fills them with 0xff00 bytes
+_BGZF_BLOCK_SIZE = 0xff00
+_BGZF_EOF = bytes.fromhex('1f8b08040000000000ff0600424302001b0003000000000000000000')
+
+
+def is_tar_archive(file_name):
+    return file_name.lower().endswith(_TAR_SUFFIXES)
+
+
+def is_archive(file_name):
+    return is_tar_archive(file_name) or file_name.lower().endswith(_ZIP_SUFFIXES)
+
+
+def strip_compression_suffix(file_name):
+    """
+    strip_compression_suffix: 'bin.001.fasta.gz' -> 'bin.001.fasta'
+    """
+    root, ext = os.path.splitext(file_name)
+    return root if ext.lower() in _DECOMPRESSORS else file_name
+
+
+def _decompressing(file_name, stream):
+    """
+    _decompressing: wrap a binary stream with the decompressor matching file_name suffix
+    """
+    decompressor = _DECOMPRESSORS.get(os.path.splitext(file_name)[1].lower())
+    return decompressor(stream) if decompressor else stream
+
+
+@contextmanager
+def open_compressed(file_path):
+    """
+    open_compressed: open a plain, gzip, bzip2 or xz file as a decompressed binary stream
+    """
+    with open(file_path, 'rb') as raw_file:
+        with _decompressing(file_path, raw_file) as stream:
+            yield stream
+
+
+def list_archive_members(file_path):
+    """
+    list_archive_members: names of the regular file members of a tar or zip archive
+    """
+    if is_tar_archive(file_path):
+        with tarfile.open(file_path, 'r|*') as tar:
+            return [member.name for member in tar if member.isfile()]
+
+    with zipfile.ZipFile(file_path) as zip_file:
+        return [info.filename for info in zip_file.infolist() if not info.is_dir()]
+
+
+def iter_archive_members(file_path, member_names):
+    """
+    iter_archive_members: yield (member_name, decompressed binary stream) for each member
+                          of member_names in archive order
+
+    tar archives (compressed or not) are read in a single sequential pass; each stream
+    must be consumed before advancing to the next member
+    """
+    member_names = set(member_names)
+
+    if is_tar_archive(file_path):
+        with tarfile.open(file_path, 'r|*') as tar:
+            for member in tar:
+                if member.isfile() and member.name in member_names:
+                    with _decompressing(member.name, tar.extractfile(member)) as stream:
+                        yield member.name, stream
+        return
+
+    with zipfile.ZipFile(file_path) as zip_file:
+        for info in zip_file.infolist():
+            if info.filename in member_names:
+                with _decompressing(info.filename, zip_file.open(info)) as stream:
+                    yield info.filename, stream
+
+
+class BgzfWriter(io.RawIOBase):
+    """
+    BgzfWriter: write-only binary stream compressing into BGZF blocks on stream
+
+    BGZF (as produced by bgzip) is a series of small gzip members, so the output stays
+    readable by any gzip reader while supporting random access (e.g. samtools faidx).
+    Closing the writer adds the BGZF EOF marker and closes stream.
+    """
+
+    def __init__(self, stream, compression_level=None):
+        self._stream = stream
+        self._compression_level = (zlib.Z_DEFAULT_COMPRESSION if compression_level is None
+                                   else compression_level)
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def _write_block(self, block):
+        compressor = zlib.compressobj(self._compression_level, zlib.DEFLATED, -15)
+        data = compressor.compress(block) + compressor.flush()
+        # gzip header with the BC extra subfield holding the total block size - 1
+        self._stream.write(struct.pack('<4BI2BH2BHH', 0x1f, 0x8b, 8, 4, 0, 0, 0xff, 6,
+                                       ord('B'), ord('C'), 2, len(data) + 25))
+        self._stream.write(data)
+        self._stream.write(struct.pack('<2I', zlib.crc32(block), len(block)))
+
+    def write(self, data):
+        self._buffer += data
+        if len(self._buffer) >= _BGZF_BLOCK_SIZE:
+            block_view = memoryview(self._buffer)
+            full_size = len(self._buffer) - len(self._buffer) % _BGZF_BLOCK_SIZE
+            for start in range(0, full_size, _BGZF_BLOCK_SIZE):
+                self._write_block(block_view[start:start + _BGZF_BLOCK_SIZE])
+            block_view.release()
+            del self._buffer[:full_size]
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            if self._buffer:
+                self._write_block(bytes(self._buffer))
+            self._stream.write(_BGZF_EOF)
+            self._stream.close()
+        super().close()
+
+
+def _bgzf_compress_file(file_path, output_path, compression_level):
+    with open(file_path, 'rb') as input_file:
+        with BgzfWriter(open(output_path, 'wb'), compression_level) as output_file:
+            shutil.copyfileobj(input_file, output_file, _BLOCK_SIZE)
+
+
+def pack_files(zip_path, file_paths, layout='deflated', compression_level=None,
+               max_workers=1):
+    """
+    pack_files: pack file_paths into a zip archive at zip_path, one member per file named
+                by its basename
+
+    layout: one of
+            deflated: deflated members
+            stored: uncompressed members
+            bgzf: members compressed to BGZF (named file name + '.gz'), stored in the zip
+    compression_level: zlib level 0-9, default to zlib's default
+    max_workers: number of threads BGZF compressing members side by side (zlib releases
+                 the GIL); members are compressed to temporary files next to zip_path and
+                 added to the archive in file_paths order. deflated and stored members are
+                 written by ZipFile.write in a single thread
+    """
+    if layout != 'bgzf':
+        compression = zipfile.ZIP_STORED if layout == 'stored' else zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(zip_path, 'w', compression, allowZip64=True,
+                             compresslevel=compression_level) as zip_file:
+            for file_path in file_paths:
+                zip_file.write(file_path, os.path.basename(file_path))
+        return
+
+    tmp_paths = [f'{zip_path}.{uuid.uuid4()}.tmp' for _ in file_paths]
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED, allowZip64=True) as zip_file:
+            futures = [executor.submit(_bgzf_compress_file, file_path, tmp_path,
+                                       compression_level)
+                       for file_path, tmp_path in zip(file_paths, tmp_paths)]
+            for file_path, tmp_path, future in zip(file_paths, tmp_paths, futures):
+                future.result()
+                zip_file.write(tmp_path, os.path.basename(file_path) + '.gz')
+                os.remove(tmp_path)
+    finally:
+        for tmp_path in tmp_paths:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
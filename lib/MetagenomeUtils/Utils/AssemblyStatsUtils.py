@@ -0,0 +1,78 @@
+from array import array
+
+from MetagenomeUtils.Utils.JsonStreamUtils import JsonStreamReader
+
+
+class ContigStatsTable:
+    """
+    ContigStatsTable: compact contig_id -> (length, gc) table
+
+    lengths and GC contents are kept in typed arrays; only the contig id to row
+    mapping is a Python dict
+    """
+
+    __slots__ = ('_rows', '_lengths', '_gcs')
+
+    def __init__(self):
+        self._rows = {}
+        self._lengths = array('q')
+        self._gcs = array('d')
+
+    def add(self, contig_id, length, gc):
+        self._rows[contig_id] = len(self._lengths)
+        self._lengths.append(length)
+        self._gcs.append(gc)
+
+    def get(self, contig_id, default=None):
+        row = self._rows.get(contig_id)
+        if row is None:
+            return default
+        return self._lengths[row], self._gcs[row]
+
+    def __contains__(self, contig_id):
+        return contig_id in self._rows
+
+    def missing(self, contig_ids):
+        """
+        missing: set of contig_ids that are not in the table, looked up in a single set operation
+        """
+        if not isinstance(contig_ids, (set, frozenset)):
+            contig_ids = set(contig_ids)
+        return contig_ids.difference(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __bool__(self):
+        return bool(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+def iter_assembly_contig_stats(json_file_path):
+    """
+    iter_assembly_contig_stats: stream (contig_id, length, gc_content) out of an Assembly
+                                object JSON file (e.g. WsLargeDataIO data_json_file)
+                                without loading the whole document
+    """
+    with open(json_file_path, 'r') as json_file:
+        reader = JsonStreamReader(json_file)
+        for key in reader.iter_object_items():
+            if key != 'contigs':
+                reader.decode_value()
+                continue
+            for contig_id in reader.iter_object_items():
+                contig = reader.decode_value()
+                yield contig_id, contig.get('length'), contig.get('gc_content')
+
+
+def load_assembly_contig_stats(json_file_path):
+    """
+    load_assembly_contig_stats: build a ContigStatsTable from an Assembly object JSON file
+    """
+    contig_stats = ContigStatsTable()
+    for contig_id, length, gc in iter_assembly_contig_stats(json_file_path):
+        contig_stats.add(contig_id, length, gc)
+
+    return contig_stats
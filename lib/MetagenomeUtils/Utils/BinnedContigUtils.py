@@ -0,0 +1,248 @@
+import csv
+import itertools
+import json
+from array import array
+from operator import itemgetter
+
+from MetagenomeUtils.Utils.JsonStreamUtils import JsonStreamReader
+
+# stands in for a contig without coverage in the coverage column
+_NO_COV = float('nan')
+# BinnedContigs table formats and their delimiters, the first one is the default
+TABLE_DELIMITERS = {'tsv': '\t', 'csv': ','}
+TABLE_COLUMNS = ('bin_id', 'contig_id', 'gc', 'len', 'cov')
+_TABLE_ASSEMBLY_REF = '#assembly_ref'
+_TABLE_BIN = '#bin'
+
+
+class ContigTable:
+    """
+    ContigTable: compact, insertion ordered table of the contigs of one ContigBin
+
+    contig ids are packed into a single UTF-8 buffer with an end offset column, and
+    length, GC content and coverage are kept in typed arrays, so a contig costs its id
+    length plus 24 bytes instead of a few hundred bytes as a dict of dicts. Use
+    to_dict/from_dict to convert from/to the workspace
+    {contig_id: {'gc': .., 'len': .., 'cov': ..}} shape.
+    """
+
+    __slots__ = ('_ids', '_id_ends', '_lengths', '_gcs', '_covs')
+
+    def __init__(self):
+        self._ids = bytearray()
+        self._id_ends = array('I')
+        self._lengths = array('I')
+        self._gcs = array('d')
+        self._covs = array('d')
+
+    @classmethod
+    def from_dict(cls, contigs):
+        contig_table = cls()
+        for contig_id, contig in contigs.items():
+            contig_table.add(contig_id, contig.get('len'), contig.get('gc'), contig.get('cov'))
+
+        return contig_table
+
+    def add(self, contig_id, length, gc, cov=None):
+        self._ids += contig_id.encode()
+        self._id_ends.append(len(self._ids))
+        self._lengths.append(length)
+        self._gcs.append(gc)
+        self._covs.append(_NO_COV if cov is None else cov)
+
+    def extend(self, other):
+        """
+        extend: append every contig of other, contig ids are not checked for duplicates
+        """
+        offset = len(self._ids)
+        self._ids += other._ids
+        self._id_ends.extend(end + offset for end in other._id_ends)
+        self._lengths.extend(other._lengths)
+        self._gcs.extend(other._gcs)
+        self._covs.extend(other._covs)
+
+    def rows(self):
+        """
+        rows: yield (contig_id, length, gc, cov) per contig, cov is None if not set
+        """
+        start = 0
+        for end, length, gc, cov in zip(self._id_ends, self._lengths, self._gcs, self._covs):
+            yield self._ids[start:end].decode(), length, gc, None if cov != cov else cov
+            start = end
+
+    def to_dict(self):
+        contigs = {}
+        for contig_id, length, gc, cov in self.rows():
+            contig = {'gc': gc, 'len': length}
+            if cov is not None:
+                contig['cov'] = cov
+            contigs[contig_id] = contig
+
+        return contigs
+
+    def __iter__(self):
+        # slice the ids out with C level maps rather than a Python loop
+        id_slices = map(slice, itertools.chain((0,), self._id_ends), self._id_ends)
+        ids = self._ids.decode()
+        if len(ids) == len(self._ids):
+            # ASCII ids, byte offsets are character offsets
+            return map(ids.__getitem__, id_slices)
+        return map(bytes.decode, map(bytes(self._ids).__getitem__, id_slices))
+
+    def __len__(self):
+        return len(self._id_ends)
+
+
+def _as_contig_table(contigs):
+    return contigs if isinstance(contigs, ContigTable) else ContigTable.from_dict(contigs)
+
+
+def bins_to_workspace(bins):
+    """
+    bins_to_workspace: copies of ContigBins with contigs in the workspace dict shape
+    """
+    return [dict(contig_bin, contigs=_as_contig_table(contig_bin.get('contigs')).to_dict())
+            for contig_bin in bins]
+
+
+def bins_from_workspace(bins):
+    """
+    bins_from_workspace: copies of workspace ContigBins with contigs as ContigTable
+    """
+    return [dict(contig_bin, contigs=_as_contig_table(contig_bin.get('contigs')))
+            for contig_bin in bins]
+
+
+def _iter_contigs_json(contig_table):
+    for contig_id, length, gc, cov in contig_table.rows():
+        if cov is None:
+            yield f'{json.dumps(contig_id)}: {{"gc": {gc!r}, "len": {length}}}'
+        else:
+            yield f'{json.dumps(contig_id)}: {{"gc": {gc!r}, "len": {length}, "cov": {cov!r}}}'
+
+
+def write_binned_contigs_json(binned_contigs, json_file_path):
+    """
+    write_binned_contigs_json: write a BinnedContigs object to a JSON file (e.g. for
+                               WsLargeDataIO save_objects), one contig at a time
+    """
+    with open(json_file_path, 'w') as json_file:
+        json_file.write('{')
+        for key, value in binned_contigs.items():
+            if key != 'bins':
+                json_file.write(f'{json.dumps(key)}: {json.dumps(value)}, ')
+
+        json_file.write('"bins": [')
+        for index, contig_bin in enumerate(binned_contigs.get('bins')):
+            if index:
+                json_file.write(', ')
+            json_file.write('{')
+            for key, value in contig_bin.items():
+                if key != 'contigs':
+                    json_file.write(f'{json.dumps(key)}: {json.dumps(value)}, ')
+            json_file.write('"contigs": {')
+            for contig_index, contig_json in enumerate(
+                    _iter_contigs_json(_as_contig_table(contig_bin.get('contigs')))):
+                if contig_index:
+                    json_file.write(', ')
+                json_file.write(contig_json)
+            json_file.write('}}')
+        json_file.write(']}')
+
+
+def load_binned_contigs(json_file_path):
+    """
+    load_binned_contigs: read a BinnedContigs object JSON file (e.g. WsLargeDataIO
+                         data_json_file) with the contigs of every bin as a ContigTable,
+                         without loading the whole document
+    """
+    binned_contigs = {}
+    with open(json_file_path, 'r') as json_file:
+        reader = JsonStreamReader(json_file)
+        for key in reader.iter_object_items():
+            if key != 'bins':
+                binned_contigs[key] = reader.decode_value()
+                continue
+
+            bins = binned_contigs['bins'] = []
+            for _ in reader.iter_array_items():
+                contig_bin = {}
+                for bin_key in reader.iter_object_items():
+                    if bin_key != 'contigs':
+                        contig_bin[bin_key] = reader.decode_value()
+                        continue
+                    contigs = contig_bin['contigs'] = ContigTable()
+                    for contig_id in reader.iter_object_items():
+                        contig = reader.decode_value()
+                        contigs.add(contig_id, contig.get('len'), contig.get('gc'),
+                                    contig.get('cov'))
+                bins.append(contig_bin)
+
+    return binned_contigs
+
+
+def write_binned_contigs_table(binned_contigs, table_file, delimiter='\t'):
+    """
+    write_binned_contigs_table: write a BinnedContigs object to a text table_file, one row
+                                per contig
+
+    the table starts with a header section: an #assembly_ref row and one
+    #bin | bin_id | total_coverage row per bin, followed by a TABLE_COLUMNS row and the
+    contig rows grouped by bin; a missing coverage is an empty field
+    """
+    writer = csv.writer(table_file, delimiter=delimiter, lineterminator='\n')
+    bins = binned_contigs.get('bins')
+
+    writer.writerow((_TABLE_ASSEMBLY_REF, binned_contigs.get('assembly_ref')))
+    writer.writerows((_TABLE_BIN, contig_bin.get('bid'),
+                      '' if contig_bin.get('cov') is None else contig_bin.get('cov'))
+                     for contig_bin in bins)
+    writer.writerow(TABLE_COLUMNS)
+    for contig_bin in bins:
+        bin_id = contig_bin.get('bid')
+        writer.writerows((bin_id, contig_id, gc, length, '' if cov is None else cov)
+                         for contig_id, length, gc, cov in
+                         _as_contig_table(contig_bin.get('contigs')).rows())
+
+
+def read_binned_contigs_table(table_file):
+    """
+    read_binned_contigs_table: read a table written by write_binned_contigs_table (with
+                               any of TABLE_DELIMITERS)
+
+    return: (assembly_ref, bins), bins yields (bin_id, total_coverage, contig rows) per bin
+            where contig rows yields (contig_id, gc, len, cov) string fields; each bin's rows
+            are read lazily and must be consumed before advancing to the next bin
+    """
+    first_line = table_file.readline()
+    if not first_line.startswith(_TABLE_ASSEMBLY_REF):
+        raise ValueError(f'Expecting {_TABLE_ASSEMBLY_REF} on the first line of the table')
+    delimiter = first_line[len(_TABLE_ASSEMBLY_REF):][:1]
+    if delimiter not in TABLE_DELIMITERS.values():
+        raise ValueError(f'Unexpected table delimiter [{delimiter}]')
+
+    reader = csv.reader(itertools.chain([first_line], table_file), delimiter=delimiter)
+    assembly_ref = next(reader)[1]
+    bin_headers = []
+    for row in reader:
+        if row[0] != _TABLE_BIN:
+            if tuple(row) != TABLE_COLUMNS:
+                raise ValueError(f'Expecting table columns [{", ".join(TABLE_COLUMNS)}]')
+            break
+        bin_headers.append((row[1], row[2]))
+
+    def iter_bins():
+        contig_groups = itertools.groupby(reader, key=itemgetter(0))
+        contig_group = next(contig_groups, None)
+        for bin_id, total_coverage in bin_headers:
+            if contig_group is not None and contig_group[0] == bin_id:
+                yield bin_id, total_coverage, (row[1:5] for row in contig_group[1])
+                contig_group = next(contig_groups, None)
+            else:
+                yield bin_id, total_coverage, iter(())
+        if contig_group is not None:
+            error_msg = f'Contigs of bin [{contig_group[0]}] are not listed in the bin header '
+            error_msg += 'section or not grouped together'
+            raise ValueError(error_msg)
+
+    return assembly_ref, iter_bins()
@@ -0,0 +1,258 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import uuid
+from contextlib import contextmanager
+
+_STATS_FILE = 'cache_stats.json'
+_LOCK_FILE = '.lock'
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path, digest=None):
+    """
+    hash_file: feed the content of file_path into digest (sha256 by default)
+    """
+    if digest is None:
+        digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+
+    return digest
+
+
+class LRUFileCache:
+    """
+    LRUFileCache: content-addressed on-disk cache with least recently used eviction
+
+    entries are files named by key; reading an entry refreshes its mtime and eviction
+    removes the oldest entries until the cache fits in max_bytes. Writers and eviction
+    are serialized across processes with a lock file in cache_dir.
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @contextmanager
+    def _lock(self, lock_name=_LOCK_FILE):
+        with open(os.path.join(self.cache_dir, lock_name), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _fill_lock(self, key, suffix):
+        """
+        _fill_lock: exclusive lock serializing fetches of one entry across processes
+
+        the lock file is removed on release, so waiters that locked the removed file
+        (checked by inode) retry on a new one
+        """
+        lock_path = os.path.join(self.cache_dir, f'.{key}{suffix}.lock')
+        while True:
+            lock_file = open(lock_path, 'a')
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+        try:
+            yield
+        finally:
+            with self._lock():
+                os.remove(lock_path)
+            lock_file.close()
+
+    def _entry_path(self, key, suffix):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def _entries(self):
+        """
+        _entries: (mtime, size, path) of every cache entry, oldest first
+        """
+        entries = []
+        for file in os.listdir(self.cache_dir):
+            if file in (_STATS_FILE, _LOCK_FILE) or file.startswith('.'):
+                continue
+            file_path = os.path.join(self.cache_dir, file)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+
+        return sorted(entries)
+
+    def _evict(self):
+        """
+        _evict: remove least recently used entries until the cache fits in max_bytes
+
+        entries currently opened through fetch_file are skipped
+        """
+        entries = self._entries()
+        total_bytes = sum(size for mtime, size, file_path in entries)
+        for mtime, size, file_path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                with open(file_path, 'rb') as entry_file:
+                    fcntl.flock(entry_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    logging.info(f'evicting cache entry: {file_path}')
+                    os.remove(file_path)
+            except BlockingIOError:
+                continue
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+    def _record(self, hit):
+        """
+        _record: count a cache hit or miss and return the overall hit rate
+        """
+        with self._lock():
+            stats_file = os.path.join(self.cache_dir, _STATS_FILE)
+            try:
+                with open(stats_file, 'r') as file:
+                    stats = json.load(file)
+            except (FileNotFoundError, ValueError):
+                stats = {'hits': 0, 'misses': 0}
+            stats['hits' if hit else 'misses'] += 1
+            with open(stats_file, 'w') as file:
+                json.dump(stats, file)
+
+        return float(stats['hits']) / (stats['hits'] + stats['misses'])
+
+    def _record_lookup(self, hit, entry_name):
+        hit_rate = self._record(hit)
+        logging.info('cache {} for key {}, cache hit rate: {:.1%}'.format(
+            'hit' if hit else 'miss', entry_name, hit_rate))
+
+    def get_json(self, key, record=True):
+        """
+        get_json: cached JSON value for key, None on a cache miss
+
+        record: count the lookup in the cache hit rate
+        """
+        entry_path = self._entry_path(key, '.json')
+        try:
+            with open(entry_path, 'r') as entry_file:
+                value = json.load(entry_file)
+            os.utime(entry_path)
+        except (FileNotFoundError, ValueError):
+            value = None
+
+        if record:
+            self._record_lookup(value is not None, key)
+
+        return value
+
+    def put_json(self, key, value):
+        """
+        put_json: store JSON serializable value under key, then evict down to max_bytes
+        """
+        def write_json(file_path):
+            with open(file_path, 'w') as file:
+                json.dump(value, file)
+
+        self.put_file(key, '.json', write_json)
+
+    @contextmanager
+    def get_file(self, key, suffix, record=True):
+        """
+        get_file: context yielding the path of the cached file for key, None on a cache
+                  miss
+
+        a hit is share-locked while the context is open so eviction leaves it alone
+        record: count the lookup in the cache hit rate
+        """
+        entry_path = self._entry_path(key, suffix)
+        entry_file = self._open_locked(entry_path)
+        if entry_file is not None:
+            os.utime(entry_path)
+        if record:
+            self._record_lookup(entry_file is not None, key + suffix)
+
+        try:
+            yield None if entry_file is None else entry_path
+        finally:
+            if entry_file is not None:
+                entry_file.close()
+
+    def put_file(self, key, suffix, write):
+        """
+        put_file: store the file created by calling write(file_path) under key, then
+                  evict down to max_bytes
+        """
+        entry_path = self._entry_path(key, suffix)
+        tmp_path = os.path.join(self.cache_dir, f'.{key}.{uuid.uuid4()}.tmp')
+        try:
+            write(tmp_path)
+            with self._lock():
+                os.replace(tmp_path, entry_path)
+                self._evict()
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _open_locked(self, entry_path):
+        """
+        _open_locked: open entry_path holding a shared lock, None if it does not exist
+                      (or was evicted before the lock was acquired)
+        """
+        try:
+            entry_file = open(entry_path, 'rb')
+        except FileNotFoundError:
+            return None
+        fcntl.flock(entry_file, fcntl.LOCK_SH)
+        try:
+            if os.stat(entry_path).st_ino == os.fstat(entry_file.fileno()).st_ino:
+                return entry_file
+        except FileNotFoundError:
+            pass
+        entry_file.close()
+        return None
+
+    @contextmanager
+    def fetch_file(self, key, suffix, fill):
+        """
+        fetch_file: context yielding the path of the cached file for key, created by
+                    calling fill(file_path) on a cache miss
+
+        the entry is share-locked while the context is open so eviction leaves it alone;
+        concurrent fetches of the same missing key wait for a single fill
+        """
+        entry_path = self._entry_path(key, suffix)
+        with self._fill_lock(key, suffix):
+            entry_file = self._open_locked(entry_path)
+            hit = entry_file is not None
+            if not hit:
+                tmp_path = os.path.join(self.cache_dir, f'.{key}.{uuid.uuid4()}{suffix}')
+                try:
+                    fill(tmp_path)
+                    entry_file = open(tmp_path, 'rb')
+                    fcntl.flock(entry_file, fcntl.LOCK_SH)
+                    with self._lock():
+                        os.replace(tmp_path, entry_path)
+                        self._evict()
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            else:
+                os.utime(entry_path)
+
+        self._record_lookup(hit, key + suffix)
+
+        try:
+            yield entry_path
+        finally:
+            entry_file.close()
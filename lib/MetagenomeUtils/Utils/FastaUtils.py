@@ -0,0 +1,395 @@
+import mmap
+import os
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# characters SeqIO drops from sequence lines; everything else counts toward length
+_SEQUENCE_WHITESPACE = b'\n\r '
+# every byte but G/C (either case), deleted by translate so only GC bases are left
+_NON_GC_BYTES = bytes(byte for byte in range(256) if byte not in b'GCgc')
+# translate table folding sequence bytes to upper case, applied with the whitespace
+# deletion in the same pass
+_UPPER_CASE = bytes.maketrans(b'abcdefghijklmnopqrstuvwxyz', b'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+_BLOCK_SIZE = 1024 * 1024
+# files smaller than this are always scanned by a single process
+_PARALLEL_SCAN_MIN_SIZE = 64 * 1024 * 1024
+# well below the common default ulimit -n of 1024
+_MAX_OPEN_FILES = 256
+
+
+def _parse_contig_id(header):
+    """
+    _parse_contig_id: contig id from a FASTA header line (without the leading '>'),
+                      the first whitespace separated token, same as SeqRecord.id
+    """
+    fields = header.split(None, 1)
+    return fields[0].decode() if fields else ''
+
+
+def _sequence_stats(body):
+    """
+    _sequence_stats: (length, gc_count) of a raw multi-line sequence block
+
+    counts with two bytes.translate deletions rather than one count() pass per
+    character
+    """
+    length = len(body.translate(None, _SEQUENCE_WHITESPACE))
+    gc_count = len(body.translate(None, _NON_GC_BYTES))
+
+    return length, gc_count
+
+
+def _iter_records(buffer, start=0, size=None):
+    """
+    _iter_records: yield (header_start, header_end, sequence_end) byte positions of every
+                   record in a bytes-like buffer supporting find() (bytes or mmap),
+                   between start and size; sequence_end is the end of the last sequence
+                   line, before its line break
+    """
+    if size is None:
+        size = len(buffer)
+
+    if buffer[start:start + 1] != b'>':
+        start = buffer.find(b'\n>', start, size) + 1
+        if not start:
+            return
+
+    while True:
+        header_end = buffer.find(b'\n', start, size)
+        if header_end == -1:
+            header_end = size
+        next_record = buffer.find(b'\n>', header_end, size)
+        end = size if next_record == -1 else next_record
+
+        yield start, header_end, end
+
+        if next_record == -1:
+            break
+        start = next_record + 1
+
+
+def _scan_buffer(buffer, start=0, size=None):
+    """
+    _scan_buffer: yield (contig_id, length, gc_count) for every record in a bytes-like
+                  buffer supporting find() and slicing (bytes or mmap), between start
+                  and size
+    """
+    for header_start, header_end, end in _iter_records(buffer, start, size):
+        contig_id = _parse_contig_id(buffer[header_start + 1:header_end])
+        length, gc_count = _sequence_stats(buffer[header_end:end])
+
+        yield contig_id, length, gc_count
+
+
+def _scan_file_range(file_path, start, end):
+    """
+    _scan_file_range: (contig_id, length, gc_count) of the records of file_path
+                      starting between start and end
+    """
+    with open(file_path, 'rb') as fasta_file:
+        with mmap.mmap(fasta_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return list(_scan_buffer(buffer, start, end))
+
+
+def _split_records(file_path, parts):
+    """
+    _split_records: cut file_path into up to parts byte ranges, each starting at a record
+    """
+    with open(file_path, 'rb') as fasta_file:
+        with mmap.mmap(fasta_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            size = len(buffer)
+            starts = [0]
+            for part in range(1, parts):
+                next_record = buffer.find(b'\n>', max(size * part // parts, starts[-1]))
+                if next_record == -1:
+                    break
+                starts.append(next_record + 1)
+
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def scan_fasta_stats(file_path, parallelism=1):
+    """
+    scan_fasta_stats: stream per-contig stats out of a FASTA file
+
+    memory-maps file_path and yields (contig_id, length, gc_count) per record without
+    building SeqRecord objects; gc_count counts both upper and lower case G/C, length
+    counts every sequence character (N included) like len(record.seq)
+
+    parallelism: number of worker processes scanning large files, each one a range of
+                 whole records; records are yielded in file order either way
+    """
+    file_size = os.path.getsize(file_path)
+    if not file_size:
+        return
+
+    if parallelism > 1 and file_size >= _PARALLEL_SCAN_MIN_SIZE:
+        file_ranges = _split_records(file_path, parallelism)
+        with ProcessPoolExecutor(max_workers=len(file_ranges)) as executor:
+            for contig_stats in executor.map(_scan_file_range,
+                                             [file_path] * len(file_ranges),
+                                             *zip(*file_ranges)):
+                yield from contig_stats
+        return
+
+    with open(file_path, 'rb') as fasta_file:
+        with mmap.mmap(fasta_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from _scan_buffer(buffer)
+
+
+def scan_fasta_stream(stream, block_size=_BLOCK_SIZE):
+    """
+    scan_fasta_stream: stream per-contig stats out of a readable binary FASTA stream
+
+    same output as scan_fasta_stats, for inputs that cannot be memory-mapped
+    (e.g. decompressed or archive member streams); reads block_size bytes at a time and
+    counts sequence bytes as they come, so only a header line split across blocks is
+    carried over to the next block
+    """
+    contig_id = None
+    length = gc_count = 0
+    header = None
+    line_start = True
+
+    for block in iter(lambda: stream.read(block_size), b''):
+        start = 0
+        if header is not None:
+            header_end = block.find(b'\n')
+            if header_end == -1:
+                header += block
+                continue
+            header += block[:header_end]
+            contig_id = _parse_contig_id(header)
+            header = None
+            start = header_end
+
+        while start < len(block):
+            # a '>' only starts a record at the start of a line
+            if block[start:start + 1] == b'>' and (start or line_start):
+                if contig_id is not None:
+                    yield contig_id, length, gc_count
+                length = gc_count = 0
+                header_end = block.find(b'\n', start)
+                if header_end == -1:
+                    header = bytearray(block[start + 1:])
+                    break
+                contig_id = _parse_contig_id(block[start + 1:header_end])
+                start = header_end
+
+            next_record = block.find(b'\n>', start)
+            end = len(block) if next_record == -1 else next_record + 1
+            if contig_id is not None:
+                block_length, block_gc_count = _sequence_stats(block[start:end])
+                length += block_length
+                gc_count += block_gc_count
+            start = end
+
+        line_start = block.endswith(b'\n')
+
+    if header is not None:
+        contig_id = _parse_contig_id(header)
+    if contig_id is not None:
+        yield contig_id, length, gc_count
+
+
+def _iter_index_lines(buffer):
+    """
+    _iter_index_lines: yield one .fai line per record in buffer
+    """
+    for header_start, header_end, end in _iter_records(buffer):
+        offset = min(header_end + 1, end)
+        line_end = buffer.find(b'\n', offset, end)
+        line_width = (end if line_end == -1 else line_end) + 1 - offset
+        line_bases = len(buffer[offset:offset + line_width].translate(None,
+                                                                      _SEQUENCE_WHITESPACE))
+        length = len(buffer[offset:end].translate(None, _SEQUENCE_WHITESPACE))
+
+        contig_id = _parse_contig_id(buffer[header_start + 1:header_end])
+        yield f'{contig_id}\t{length}\t{offset}\t{line_bases}\t{line_width}\n'
+
+
+def build_fasta_index(fasta_path, index_path=None):
+    """
+    build_fasta_index: write a samtools faidx compatible index of fasta_path
+
+    one tab separated line per record: contig_id, sequence length, byte offset of the
+    sequence, bases per line and bytes per line (of the first sequence line)
+
+    return: index_path, default to fasta_path + '.fai'
+    """
+    if index_path is None:
+        index_path = fasta_path + '.fai'
+
+    with open(fasta_path, 'rb') as fasta_file, open(index_path + '.tmp', 'w') as index_file:
+        if os.path.getsize(fasta_path):
+            with mmap.mmap(fasta_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                index_file.writelines(_iter_index_lines(buffer))
+    os.replace(index_path + '.tmp', index_path)
+
+    return index_path
+
+
+def fasta_record_chunks(contig_id, sequence, line_width=None, description=None):
+    """
+    fasta_record_chunks: the byte chunks of one FASTA record, for writelines
+
+    sequence: bytes-like sequence without line breaks, wrapped every line_width bases
+              (default to a single line) through memoryview slices, so it is not copied
+    description: appended to the header line after contig_id and a space
+    """
+    chunks = [b'>', contig_id.encode(), b'\n']
+    if description:
+        chunks[2:2] = [b' ', description.encode()]
+    if not line_width or len(sequence) <= line_width:
+        chunks += [sequence, b'\n']
+        return chunks
+
+    sequence = memoryview(sequence)
+    for start in range(0, len(sequence), line_width):
+        chunks += [sequence[start:start + line_width], b'\n']
+    return chunks
+
+
+class FastaIndex:
+    """
+    FastaIndex: random access to the sequences of a FASTA file through its .fai index
+
+    the index (default to fasta_path + '.fai') is built unless an up to date one exists;
+    only the entries of contig_ids (all if None) are kept in memory, and fetch() slices
+    one sequence out of the memory-mapped fasta_path
+    """
+
+    def __init__(self, fasta_path, contig_ids=None, index_path=None):
+        if index_path is None:
+            index_path = fasta_path + '.fai'
+        if (not os.path.exists(index_path) or
+                os.path.getmtime(index_path) < os.path.getmtime(fasta_path)):
+            build_fasta_index(fasta_path, index_path)
+
+        # contig_id -> row of the typed index columns
+        self._rows = {}
+        self._columns = tuple(array('q') for _ in range(4))
+        with open(index_path, 'r') as index_file:
+            for line in index_file:
+                fields = line.split('\t')
+                if contig_ids is None or fields[0] in contig_ids:
+                    self._rows[fields[0]] = len(self._columns[0])
+                    for column, value in zip(self._columns, fields[1:5]):
+                        column.append(int(value))
+
+        self._fasta_file = open(fasta_path, 'rb')
+        self._buffer = b''
+        if os.path.getsize(fasta_path):
+            self._buffer = mmap.mmap(self._fasta_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def fetch(self, contig_id, upper=False):
+        """
+        fetch: sequence bytes of contig_id without line breaks, None if not indexed
+
+        upper: fold the sequence to upper case while removing line breaks
+        """
+        row = self._rows.get(contig_id)
+        if row is None:
+            return None
+        length, offset, line_bases, line_width = (column[row] for column in self._columns)
+
+        if line_bases:
+            full_lines, last_line_bases = divmod(length, line_bases)
+            span = full_lines * line_width + last_line_bases
+        else:
+            span = length
+        table = _UPPER_CASE if upper else None
+        sequence = self._buffer[offset:offset + span].translate(table, _SEQUENCE_WHITESPACE)
+        # records with irregular line lengths are read up to the next record
+        if len(sequence) < length:
+            end = self._buffer.find(b'\n>', offset)
+            end = len(self._buffer) if end == -1 else end
+            sequence = self._buffer[offset:end].translate(table, _SEQUENCE_WHITESPACE)
+
+        return sequence[:length]
+
+    def get_length(self, contig_id):
+        """
+        get_length: sequence length of contig_id, None if not indexed
+        """
+        row = self._rows.get(contig_id)
+        return None if row is None else self._columns[0][row]
+
+    def __contains__(self, contig_id):
+        return contig_id in self._rows
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._fasta_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _FileHandlePool:
+    """
+    _FileHandlePool: append handles to a set of files, at most max_open_files open at a
+                     time; the least recently written file is closed first
+    """
+
+    def __init__(self, max_open_files):
+        self._max_open_files = max_open_files
+        self._handles = OrderedDict()
+
+    def get(self, file_path):
+        handle = self._handles.get(file_path)
+        if handle is not None:
+            self._handles.move_to_end(file_path)
+            return handle
+
+        if len(self._handles) >= self._max_open_files:
+            self._handles.popitem(last=False)[1].close()
+        handle = self._handles[file_path] = open(file_path, 'ab')
+        return handle
+
+    def close(self):
+        while self._handles:
+            self._handles.popitem()[1].close()
+
+
+def split_fasta(fasta_path, contig_file_paths, max_open_files=_MAX_OPEN_FILES,
+                line_width=None):
+    """
+    split_fasta: route every record of fasta_path to the files its contig_id maps to in
+                 contig_file_paths, reading fasta_path once sequentially
+
+    contig_file_paths: {contig_id: [file paths]}, a contig shared by several bins is
+                       written to each of their files
+    records are appended in fasta_path order, upper case and wrapped every line_width
+    bases (default to the sequence on one line); records not in contig_file_paths are
+    skipped without being decoded, and reading stops as soon as every contig has been
+    found. Found contigs are removed from contig_file_paths, so whatever is left
+    afterwards was not in fasta_path.
+    """
+    if not contig_file_paths or not os.path.getsize(fasta_path):
+        return
+
+    handle_pool = _FileHandlePool(max_open_files)
+    try:
+        with open(fasta_path, 'rb') as fasta_file:
+            with mmap.mmap(fasta_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for header_start, header_end, end in _iter_records(buffer):
+                    contig_id = _parse_contig_id(buffer[header_start + 1:header_end])
+                    file_paths = contig_file_paths.pop(contig_id, None)
+                    if file_paths is None:
+                        continue
+
+                    sequence = buffer[header_end:end].translate(_UPPER_CASE,
+                                                                _SEQUENCE_WHITESPACE)
+                    record = fasta_record_chunks(contig_id, sequence, line_width)
+                    for file_path in file_paths:
+                        handle_pool.get(file_path).writelines(record)
+                    if not contig_file_paths:
+                        break
+    finally:
+        handle_pool.close()
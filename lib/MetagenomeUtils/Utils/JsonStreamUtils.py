@@ -0,0 +1,120 @@
+import json
+import re
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_KEY = r'"(?P<key>[^"\\]*(?:\\.[^"\\]*)*)"[ \t\n\r]*:[ \t\n\r]*'
+_FIRST_MEMBER = re.compile(r'[ \t\n\r]*' + _KEY)
+_NEXT_MEMBER = re.compile(r'[ \t\n\r]*(?:(?P<end>})|,[ \t\n\r]*' + _KEY + ')')
+_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class JsonStreamReader:
+    """
+    JsonStreamReader: incremental reader over a JSON text file
+
+    only the value currently being decoded (plus one read chunk) is held in memory
+    """
+
+    def __init__(self, json_file, chunk_size=_CHUNK_SIZE):
+        self._file = json_file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """
+        _fill: drop consumed text and read the next chunk, returns False at EOF
+        """
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _match(self, pattern):
+        """
+        _match: match pattern at the current position, reading more of the file while
+                the match could still be extended by the next chunk
+        """
+        while True:
+            match = pattern.match(self._buffer, self._pos)
+            if (match and match.end() < len(self._buffer)) or not self._fill():
+                return match
+
+    def peek(self):
+        self._pos = self._match(_WHITESPACE).end()
+        return self._buffer[self._pos:self._pos + 1]
+
+    def expect(self, char):
+        next_char = self.peek()
+        if next_char != char:
+            raise ValueError(f'Expecting [{char}] at JSON position, but getting [{next_char}]')
+        self._pos += 1
+
+    def decode_value(self):
+        """
+        decode_value: decode the complete JSON value following an object key, reading
+                      more of the file until the value is closed
+        """
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number running into the buffer end may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def iter_object_items(self):
+        """
+        iter_object_items: yield the key of each member of the JSON object at the
+                           current position; the caller must consume the value
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        pattern = _FIRST_MEMBER
+        while True:
+            match = self._match(pattern)
+            if not match:
+                raise ValueError('Expecting JSON object key')
+            self._pos = match.end()
+            if match.lastgroup == 'end':
+                return
+
+            key = match.group('key')
+            if '\\' in key:
+                key = json.loads(f'"{key}"')
+
+            yield key
+
+            pattern = _NEXT_MEMBER
+
+    def iter_array_items(self):
+        """
+        iter_array_items: yield once per element of the JSON array at the current
+                          position; the caller must consume the element
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield
+            next_char = self.peek()
+            self._pos += 1
+            if next_char == ']':
+                return
+            if next_char != ',':
+                raise ValueError(f'Expecting [,] or []] in JSON array, but getting [{next_char}]')
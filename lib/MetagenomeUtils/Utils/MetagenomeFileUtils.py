@@ -1,18 +1,23 @@
 import datetime
 import errno
+import hashlib
+import itertools
 import json
 import os
 import re
+import shutil
 import sys
+import threading
 import time
 import uuid
 import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from pprint import pformat
 import logging
 
 import xlsxwriter
-from Bio import SeqIO
-from openpyxl import load_workbook
 from six import string_types
 
 from installed_clients.AssemblyUtilClient import AssemblyUtil
@@ -21,6 +26,44 @@ from installed_clients.KBaseReportClient import KBaseReport
 from installed_clients.SetAPIClient import SetAPI
 from installed_clients.WorkspaceClient import Workspace as workspaceService
 from installed_clients.WsLargeDataIOClient import WsLargeDataIO
+from MetagenomeUtils.Utils.AssemblyStatsUtils import (ContigStatsTable,
+                                                      load_assembly_contig_stats)
+from MetagenomeUtils.Utils.ArchiveUtils import (BgzfWriter, is_archive, is_tar_archive,
+                                                iter_archive_members, list_archive_members,
+                                                open_compressed, pack_files,
+                                                strip_compression_suffix)
+from MetagenomeUtils.Utils.BinnedContigUtils import (TABLE_DELIMITERS, ContigTable,
+                                                     load_binned_contigs,
+                                                     read_binned_contigs_table,
+                                                     write_binned_contigs_json,
+                                                     write_binned_contigs_table)
+from MetagenomeUtils.Utils.CacheUtils import LRUFileCache, hash_file
+from MetagenomeUtils.Utils.FastaUtils import (FastaIndex, build_fasta_index,
+                                              fasta_record_chunks, scan_fasta_stats,
+                                              scan_fasta_stream, split_fasta)
+from MetagenomeUtils.Utils.XlsxUtils import XlsxReader
+
+# bump when the structure of generated bins changes to invalidate cached results
+BINNED_CONTIG_CACHE_VERSION = 1
+BINNED_CONTIG_CACHE_SIZE = 2 * 1024 ** 3
+ASSEMBLY_CACHE_SIZE = 20 * 1024 ** 3
+# binned_contigs_to_file engines, the first one is the default unless bin_id_list picks out
+# bins sharing no contig (see _get_default_bin_file_engine)
+BIN_FILE_ENGINES = ('indexed', 'bucketed')
+# packed bin archive layouts (see ArchiveUtils.pack_files), the first one is the default
+PACKED_FILE_LAYOUTS = ('deflated', 'stored', 'bgzf')
+# binned_contigs_to_file output layouts, the first one is the default
+OUTPUT_LAYOUTS = ('bin_files', 'concatenated')
+CONCATENATED_BIN_FILE = 'binned_contigs.fasta'
+BIN_MANIFEST_FILE = 'binned_contigs.manifest.tsv'
+# sequence bytes held at once across the threads of a parallel bin file export
+BIN_WRITER_INFLIGHT_BYTES = 256 * 1024 ** 2
+# default number of save_assembly_from_fasta calls in flight when extracting bins
+MAX_CONCURRENT_ASSEMBLY_SAVES = 4
+# header row of the one row per contig Excel sheet layout, contigs start on the next row
+EXCEL_CONTIG_HEADER = ('contig_id', 'gc', 'len', 'contig_coverage')
+EXCEL_CONTIG_HEADER_ROW = 5
+EXCEL_MAX_ROWS = 1048576
 
 
 def log(message, prefix_newline=False):
@@ -28,6 +71,73 @@ def log(message, prefix_newline=False):
     logging.info(('\n' if prefix_newline else '') + str(message))
 
 
+class _ByteBudget:
+    """
+    _ByteBudget: blocks threads holding bytes while more than max_bytes are held in total
+
+    a single request above max_bytes is clamped to max_bytes, so it runs alone
+    """
+
+    def __init__(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._held_bytes = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def hold(self, size):
+        size = min(size, self._max_bytes)
+        with self._condition:
+            self._condition.wait_for(lambda: self._held_bytes + size <= self._max_bytes)
+            self._held_bytes += size
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._held_bytes -= size
+                self._condition.notify_all()
+
+
+# per-process state shared by every bin handled in a contig bin worker, set once by
+# _init_contig_bin_worker so the (possibly large) assembly contig table is not
+# re-sent with each bin
+_contig_bin_worker_context = {}
+
+
+def _init_contig_bin_worker(binned_contig_builder, file_directory, assembly_contigs,
+                            summary_index, bin_sources):
+    _contig_bin_worker_context.update({'binned_contig_builder': binned_contig_builder,
+                                       'file_directory': file_directory,
+                                       'assembly_contigs': assembly_contigs,
+                                       'summary_index': summary_index,
+                                       'bin_sources': bin_sources})
+
+
+def _generate_contig_bin_group_worker(bin_ids):
+    context = _contig_bin_worker_context
+    return context['binned_contig_builder']._generate_contig_bin_group(
+                                                                bin_ids,
+                                                                context['file_directory'],
+                                                                context['assembly_contigs'],
+                                                                context['summary_index'],
+                                                                context['bin_sources'])
+
+
+# per-process workbook of an Excel sheet worker, opened once by _init_excel_sheet_worker so
+# the shared strings table is parsed once per process rather than once per sheet
+_excel_sheet_worker_context = {}
+
+
+def _init_excel_sheet_worker(binned_contig_builder, file_path):
+    _excel_sheet_worker_context.update({'binned_contig_builder': binned_contig_builder,
+                                        'workbook': XlsxReader(file_path)})
+
+
+def _process_binned_contig_sheet_worker(sheet):
+    context = _excel_sheet_worker_context
+    return context['binned_contig_builder']._process_binned_contig_sheet(
+                                                    context['workbook'].iter_rows(sheet))
+
+
 class MetagenomeFileUtils:
 
     def _validate_merge_bins_from_binned_contig_params(self, params):
@@ -93,10 +203,20 @@ class MetagenomeFileUtils:
         log('Start validating file_to_binned_contigs params')
 
         # check for required parameters
-        for p in ['assembly_ref', 'file_directory', 'binned_contig_name', 'workspace_name']:
+        required_params = ['assembly_ref', 'binned_contig_name', 'workspace_name']
+        if 'contig_bin_file' not in params:
+            required_params.append('file_directory')
+        for p in required_params:
             if p not in params:
                 raise ValueError(f'"{p}" parameter is required, but missing')
 
+        parallelism = params.get('parallelism')
+        if parallelism is not None:
+            if not isinstance(parallelism, int) or parallelism < 1:
+                error_msg = 'expecting a positive integer for parallelism param, '
+                error_msg += f'but getting [{parallelism}]'
+                raise ValueError(error_msg)
+
     def _validate_binned_contigs_to_file_params(self, params):
         """
         _validate_binned_contigs_to_file_params:
@@ -111,6 +231,58 @@ class MetagenomeFileUtils:
             if p not in params:
                 raise ValueError(f'"{p}" parameter is required, but missing')
 
+        engine = params.get('engine')
+        if engine is not None and engine not in BIN_FILE_ENGINES:
+            error_msg = f'expecting one of [{", ".join(BIN_FILE_ENGINES)}] for engine param, '
+            error_msg += f'but getting [{engine}]'
+            raise ValueError(error_msg)
+
+        line_width = params.get('line_width')
+        if line_width is not None:
+            if not isinstance(line_width, int) or line_width < 0:
+                error_msg = 'expecting a non-negative integer for line_width param, '
+                error_msg += f'but getting [{line_width}]'
+                raise ValueError(error_msg)
+
+        compression = params.get('compression')
+        if compression is not None and compression not in PACKED_FILE_LAYOUTS:
+            error_msg = f'expecting one of [{", ".join(PACKED_FILE_LAYOUTS)}] for compression '
+            error_msg += f'param, but getting [{compression}]'
+            raise ValueError(error_msg)
+
+        parallelism = params.get('parallelism')
+        if parallelism is not None:
+            if not isinstance(parallelism, int) or parallelism < 1:
+                error_msg = 'expecting a positive integer for parallelism param, '
+                error_msg += f'but getting [{parallelism}]'
+                raise ValueError(error_msg)
+
+        compression_level = params.get('compression_level')
+        if compression_level is not None:
+            if not isinstance(compression_level, int) or not 0 <= compression_level <= 9:
+                error_msg = 'expecting an integer between 0 and 9 for compression_level param, '
+                error_msg += f'but getting [{compression_level}]'
+                raise ValueError(error_msg)
+
+        output_layout = params.get('output_layout')
+        if output_layout is not None and output_layout not in OUTPUT_LAYOUTS:
+            error_msg = f'expecting one of [{", ".join(OUTPUT_LAYOUTS)}] for output_layout '
+            error_msg += f'param, but getting [{output_layout}]'
+            raise ValueError(error_msg)
+
+        if output_layout == 'concatenated' and engine == 'bucketed':
+            error_msg = 'bucketed engine writes bins side by side and cannot concatenate them, '
+            error_msg += 'use the indexed engine'
+            raise ValueError(error_msg)
+
+        if params.get('keep_bin_files') in (0, False):
+            if engine == 'bucketed':
+                error_msg = 'bucketed engine writes bins side by side and cannot stream them '
+                error_msg += 'into an archive, set keep_bin_files or use the indexed engine'
+                raise ValueError(error_msg)
+            if params.get('save_to_shock') in (0, False):
+                raise ValueError('keep_bin_files and save_to_shock cannot both be turned off')
+
     def _validate_import_excel_as_binned_contigs_params(self, params):
         """
         _validate_import_excel_as_binned_contigs_params:
@@ -125,6 +297,47 @@ class MetagenomeFileUtils:
             if p not in params:
                 raise ValueError(f'"{p}" parameter is required, but missing')
 
+        parallelism = params.get('parallelism')
+        if parallelism is not None:
+            if not isinstance(parallelism, int) or parallelism < 1:
+                error_msg = 'expecting a positive integer for parallelism param, '
+                error_msg += f'but getting [{parallelism}]'
+                raise ValueError(error_msg)
+
+    def _validate_export_binned_contigs_as_table_params(self, params):
+        """
+        _validate_export_binned_contigs_as_table_params:
+                validates params passed to export_binned_contigs_as_table method
+
+        """
+
+        log('Start validating export_binned_contigs_as_table params')
+
+        # check for required parameters
+        for p in ['input_ref']:
+            if p not in params:
+                raise ValueError(f'"{p}" parameter is required, but missing')
+
+        table_format = params.get('table_format')
+        if table_format is not None and table_format not in TABLE_DELIMITERS:
+            error_msg = f'expecting one of [{", ".join(TABLE_DELIMITERS)}] for table_format '
+            error_msg += f'param, but getting [{table_format}]'
+            raise ValueError(error_msg)
+
+    def _validate_import_table_as_binned_contigs_params(self, params):
+        """
+        _validate_import_table_as_binned_contigs_params:
+                validates params passed to import_table_as_binned_contigs method
+
+        """
+
+        log('Start validating import_table_as_binned_contigs params')
+
+        # check for required parameters
+        for p in ['shock_id', 'workspace_name']:
+            if p not in params:
+                raise ValueError(f'"{p}" parameter is required, but missing')
+
     def _validate_extract_binned_contigs_as_assembly_params(self, params):
         """
         _validate_extract_binned_contigs_as_assembly_params:
@@ -153,6 +366,13 @@ class MetagenomeFileUtils:
             raise ValueError(
                 '"assembly_set_names" parameter is required for more than one extracted assembly')
 
+        max_concurrent_saves = params.get('max_concurrent_saves')
+        if max_concurrent_saves is not None:
+            if not isinstance(max_concurrent_saves, int) or max_concurrent_saves < 1:
+                error_msg = 'expecting a positive integer for max_concurrent_saves param, '
+                error_msg += f'but getting [{max_concurrent_saves}]'
+                raise ValueError(error_msg)
+
     def _mkdir_p(self, path):
         """
         _mkdir_p: make directory for given path
@@ -167,21 +387,48 @@ class MetagenomeFileUtils:
             else:
                 raise
 
-    def _get_bin_ids(self, file_directory):
+    def _get_bin_sources(self, file_directory):
         """
-        _get_bin_ids: getting bin contig ids from files
+        _get_bin_sources: getting bin_id -> (file_name, member_name) from files
+
+        bin contig files may be plain, gzip/bzip2/xz compressed or members of a tar/zip
+        archive in file_directory (member_name is None unless read from an archive).
+        bin_id is the bin contig file name without its compression suffix.
 
         NOTE: This method is very specific to MaxBin2 app result.
               Bin contig files generated by MaxBin2 follow 'header.0xx.fasta' name pattern
         """
 
-        bin_ids = []
+        bin_sources = {}
 
         result_files = os.listdir(file_directory)
 
         for file in result_files:
-            if re.match(r'.*\.\d{3}\.fasta', file):
-                bin_ids.append(file)
+            if is_archive(file):
+                for member_name in list_archive_members(os.path.join(file_directory, file)):
+                    bin_id = strip_compression_suffix(os.path.basename(member_name))
+                    if re.match(r'.*\.\d{3}\.fasta', bin_id):
+                        # a bin file next to the archive takes precedence
+                        bin_sources.setdefault(bin_id, (file, member_name))
+            else:
+                bin_id = strip_compression_suffix(file)
+                if re.match(r'.*\.\d{3}\.fasta', bin_id):
+                    bin_sources[bin_id] = (file, None)
+
+        return bin_sources
+
+    def _get_bin_ids(self, file_directory, bin_sources=None):
+        """
+        _get_bin_ids: getting bin contig ids from files
+
+        NOTE: This method is very specific to MaxBin2 app result.
+              Bin contig files generated by MaxBin2 follow 'header.0xx.fasta' name pattern
+        """
+
+        if bin_sources is None:
+            bin_sources = self._get_bin_sources(file_directory)
+
+        bin_ids = list(bin_sources)
 
         log('generated bin ids:\n{}'.format('\n'.join(bin_ids)))
 
@@ -203,21 +450,75 @@ class MetagenomeFileUtils:
         maxbin_output.001.fasta   97.2%           2690533         52.9
         """
 
-        for line in lines:
-            line_list = line.split('\t')
-            if line_list[0] == bin_id:
-                if len(line_list) == 5:
-                    gc = round(float(line_list[4]) / 100, 5)
-                    sum_contig_len = int(line_list[3])
-                    cov = round(float(line_list[2].partition('%')[0]) / 100, 5)
-                elif len(line_list) == 4:
-                    gc = round(float(line_list[3]) / 100, 5)
-                    sum_contig_len = int(line_list[2])
-                    cov = round(float(line_list[1].partition('%')[0]) / 100, 5)
+        summary = self._parse_summary_lines(lines).get(bin_id)
+        if not summary:
+            raise ValueError(f'Cannot find bin [{bin_id}] in summary file')
+
+        gc, sum_contig_len, cov, abundance = summary
 
         return gc, sum_contig_len, cov
 
-    def _get_total_contig_len(self, file_directory):
+    def _parse_summary_lines(self, lines):
+        """
+        _parse_summary_lines: parse header.summary file content into a
+                              bin_id -> (gc, sum_contig_len, cov, abundance) dict
+
+        abundance is None for the 4-column layout (see _process_summary_file)
+        """
+
+        summary_index = {}
+        for line in lines:
+            line_list = line.rstrip('\r\n').split('\t')
+            if len(line_list) == 5:
+                abundance_column = line_list[1]
+                cov_column, len_column, gc_column = line_list[2:5]
+            elif len(line_list) == 4:
+                abundance_column = None
+                cov_column, len_column, gc_column = line_list[1:4]
+            else:
+                continue
+
+            try:
+                abundance = float(abundance_column) if abundance_column else None
+                gc = round(float(gc_column) / 100, 5)
+                sum_contig_len = int(len_column)
+                cov = round(float(cov_column.partition('%')[0]) / 100, 5)
+            except ValueError:
+                # header line
+                continue
+
+            summary_index[line_list[0]] = (gc, sum_contig_len, cov, abundance)
+
+        return summary_index
+
+    def _build_summary_index(self, file_directory):
+        """
+        _build_summary_index: read every header.summary file in file_directory once and
+                              build a bin_id -> (gc, sum_contig_len, cov, abundance) dict
+
+        NOTE: This method is very specific to MaxBin2 app result.
+        """
+
+        log('building bin summary index')
+        summary_index = {}
+
+        for file in sorted(os.listdir(file_directory)):
+            file_path = os.path.join(file_directory, file)
+            if is_archive(file):
+                member_names = [member_name for member_name in list_archive_members(file_path)
+                                if strip_compression_suffix(member_name).endswith('.summary')]
+                for member_name, stream in iter_archive_members(file_path, member_names):
+                    lines = stream.read().decode().splitlines()
+                    summary_index.update(self._parse_summary_lines(lines))
+            elif strip_compression_suffix(file).endswith('.summary'):
+                with open_compressed(file_path) as stream:
+                    lines = stream.read().decode().splitlines()
+                    summary_index.update(self._parse_summary_lines(lines))
+
+        log(f'built bin summary index for {len(summary_index)} bins')
+        return summary_index
+
+    def _get_total_contig_len(self, file_directory, summary_index=None):
         """
         _get_total_contig_len: process header.summary file content
                                getting total contig length from header.summary file
@@ -226,24 +527,15 @@ class MetagenomeFileUtils:
         """
 
         log('generating total contig length')
-        total_contig_len = 0
+        if summary_index is None:
+            summary_index = self._build_summary_index(file_directory)
 
-        file_list = os.listdir(file_directory)
-        for file in file_list:
-            if file.endswith('.summary'):
-                with open(os.path.join(file_directory, file), 'r') as summary_file:
-                    lines = summary_file.readlines()
-                    for line in lines[1:]:
-                        line_list = line.split('\t')
-                        if len(line_list) == 5:
-                            total_contig_len += int(line_list[3])
-                        elif len(line_list) == 4:
-                            total_contig_len += int(line_list[2])
+        total_contig_len = sum(summary[1] for summary in summary_index.values())
 
         log(f'generated total contig length: {total_contig_len}')
         return total_contig_len
 
-    def _generate_contig_bin_summary(self, bin_id, file_directory):
+    def _generate_contig_bin_summary(self, bin_id, file_directory, summary_index=None):
         """
         _generate_contig_bin_summary: getting ContigBin summary from header.summary file
 
@@ -251,73 +543,73 @@ class MetagenomeFileUtils:
         """
         log(f'generating summary for bin_id: {bin_id}')
 
-        file_list = os.listdir(file_directory)
+        if summary_index is None:
+            summary_index = self._build_summary_index(file_directory)
+
+        summary = summary_index.get(bin_id)
+        if not summary:
+            raise ValueError(f'Cannot find bin [{bin_id}] in summary file from '
+                             f'[{file_directory}]')
 
-        for file in file_list:
-            if file.endswith('.summary'):
-                with open(os.path.join(file_directory, file), 'r') as summary_file:
-                    lines = summary_file.readlines()
-                    gc, sum_contig_len, cov = self._process_summary_file(bin_id, lines)
+        gc, sum_contig_len, cov, abundance = summary
 
         log(f'generated GC content: {gc}, Genome size: {sum_contig_len} ')
         log(f'and Completeness: {cov} for bin_id: {bin_id}')
         return gc, sum_contig_len, cov
 
-    def _generate_contigs(self, file_name, file_directory, assembly_contigs):
+    def _generate_contigs(self, file_name, file_directory, assembly_contigs, contig_stats=None,
+                          parallelism=1):
         """
         _generate_contigs: generate contigs from assembly object
 
         file_name: file name of fasta file
         file_directory: fasta file directory
-        assembly_ref: associated assembly object reference
+        assembly_contigs: ContigStatsTable of contig_id -> (length, gc) from assembly object
+        contig_stats: (contig_id, length, gc_count) iterator of an already opened
+                      (e.g. decompressed) fasta stream, read instead of file_name
+        parallelism: number of worker processes scanning file_name
         """
 
         log(f'start generating contig objects for file: {file_name}')
 
-        contigs = {}
-        for record in SeqIO.parse(os.path.join(file_directory, file_name), "fasta"):
+        if contig_stats is None:
+            contig_stats = scan_fasta_stats(os.path.join(file_directory, file_name),
+                                            parallelism)
+
+        contigs = ContigTable()
+        for contig_id, sequence_length, contig_gc_len in contig_stats:
 
-            contig_id = record.id
             contig = assembly_contigs.get(contig_id)
 
             if contig:
                 # using assembly object data
-                contig_gc = contig.get('gc_content')
-                sequence_length = contig.get('length')
+                sequence_length, contig_gc = contig
             else:
                 log(f'cannot find contig [{contig_id}] from assembly.')
                 log('computing contig info')
 
-                sequence = str(record.seq).upper()
-                sequence_length = len(sequence)
-
-                contig_gc_len = 0
-                contig_gc_len += sequence.count('G')
-                contig_gc_len += sequence.count('C')
-
                 contig_gc = round(float(contig_gc_len) / float(sequence_length), 5)
 
-            contig = {
-                'gc': contig_gc,
-                'len': sequence_length
-            }
-            contigs[contig_id] = contig
+            contigs.add(contig_id, sequence_length, contig_gc)
 
         log(f'complete generating contig objects for file: {file_name}')
 
         return contigs
 
-    def _generate_contig_bin(self, bin_id, file_directory, assembly_contigs):
+    def _generate_contig_bin(self, bin_id, file_directory, assembly_contigs,
+                             summary_index=None, contig_stats=None, parallelism=1):
         """
         _generate_contig_bin: gerneate ContigBin structure
         """
         log(f'start generating BinnedContig info for bin: {bin_id}')
 
         # generate ContigBin summery info
-        gc, sum_contig_len, cov = self._generate_contig_bin_summary(bin_id, file_directory)
+        gc, sum_contig_len, cov = self._generate_contig_bin_summary(bin_id, file_directory,
+                                                                    summary_index)
 
         # generate Contig info
-        contigs = self._generate_contigs(bin_id, file_directory, assembly_contigs)
+        contigs = self._generate_contigs(bin_id, file_directory, assembly_contigs, contig_stats,
+                                         parallelism)
 
         contig_bin = {
             'bid': bin_id,
@@ -332,6 +624,378 @@ class MetagenomeFileUtils:
 
         return contig_bin
 
+    def _generate_contig_bin_group(self, bin_ids, file_directory, assembly_contigs,
+                                   summary_index, bin_sources, parallelism=1):
+        """
+        _generate_contig_bin_group: generate ContigBin structures for bins sharing one source
+                                    file, decompressing on the fly without extracting to disk
+
+        archive members are read in a single pass over the archive; plain bin files are
+        scanned with up to parallelism worker processes
+        """
+        file_name = bin_sources[bin_ids[0]][0]
+        file_path = os.path.join(file_directory, file_name)
+
+        if is_archive(file_name):
+            member_bin_ids = {bin_sources[bin_id][1]: bin_id for bin_id in bin_ids}
+            contig_bins = {}
+            for member_name, stream in iter_archive_members(file_path, member_bin_ids):
+                bin_id = member_bin_ids[member_name]
+                contig_bins[bin_id] = self._generate_contig_bin(bin_id, file_directory,
+                                                                assembly_contigs, summary_index,
+                                                                scan_fasta_stream(stream))
+            return [contig_bins[bin_id] for bin_id in bin_ids]
+
+        contig_bins = []
+        for bin_id in bin_ids:
+            if file_name == bin_id:
+                contig_bin = self._generate_contig_bin(bin_id, file_directory,
+                                                       assembly_contigs, summary_index,
+                                                       parallelism=parallelism)
+            else:
+                with open_compressed(file_path) as stream:
+                    contig_bin = self._generate_contig_bin(bin_id, file_directory,
+                                                           assembly_contigs, summary_index,
+                                                           scan_fasta_stream(stream))
+            contig_bins.append(contig_bin)
+
+        return contig_bins
+
+    def _generate_contig_bins(self, bin_ids, file_directory, assembly_contigs, summary_index,
+                              parallelism, bin_sources=None):
+        """
+        _generate_contig_bins: generate ContigBin structures for bin_ids using up to
+                               parallelism worker processes
+
+        bins from the same tar archive are generated together by one worker so the
+        archive is decompressed once; bins are returned in bin_ids order regardless
+        of parallelism
+        """
+        if bin_sources is None:
+            bin_sources = {bin_id: (bin_id, None) for bin_id in bin_ids}
+
+        bin_id_groups = []
+        tar_groups = {}
+        for bin_id in bin_ids:
+            file_name = bin_sources[bin_id][0]
+            if is_tar_archive(file_name):
+                if file_name not in tar_groups:
+                    tar_groups[file_name] = []
+                    bin_id_groups.append(tar_groups[file_name])
+                tar_groups[file_name].append(bin_id)
+            else:
+                bin_id_groups.append([bin_id])
+
+        if len(bin_id_groups) == 1:
+            # a single bin file is split across the worker processes instead
+            contig_bin_groups = [self._generate_contig_bin_group(bin_id_groups[0],
+                                                                 file_directory,
+                                                                 assembly_contigs, summary_index,
+                                                                 bin_sources, parallelism)]
+        elif parallelism <= 1:
+            contig_bin_groups = [self._generate_contig_bin_group(bin_id_group, file_directory,
+                                                                 assembly_contigs, summary_index,
+                                                                 bin_sources)
+                                 for bin_id_group in bin_id_groups]
+        else:
+            parallelism = min(parallelism, len(bin_id_groups))
+            log(f'generating {len(bin_ids)} bins with {parallelism} worker processes')
+            with ProcessPoolExecutor(max_workers=parallelism,
+                                     initializer=_init_contig_bin_worker,
+                                     initargs=(self, file_directory, assembly_contigs,
+                                               summary_index, bin_sources)) as executor:
+                contig_bin_groups = list(executor.map(_generate_contig_bin_group_worker,
+                                                      bin_id_groups))
+
+        contig_bins = {contig_bin.get('bid'): contig_bin
+                       for contig_bin_group in contig_bin_groups
+                       for contig_bin in contig_bin_group}
+
+        return [contig_bins[bin_id] for bin_id in bin_ids]
+
+    def _read_contig_bin_table(self, contig_bin_file, assembly_contigs):
+        """
+        _read_contig_bin_table: read a contig to bin table into a bin_id -> [contig_id] dict
+
+        contig_bin_file is a tab or comma separated file with contig id in the first column
+        and bin id in the second (MetaBAT2 --saveCls, CONCOCT clustering csv, DAS Tool
+        contig2bin tsv). Blank lines and lines starting with '#' are skipped, and the first
+        line is taken as a header if its contig id is not in the assembly.
+        """
+        log(f'reading contig to bin table: {contig_bin_file}')
+
+        contig_bin_table = {}
+        binned_contig_ids = set()
+        first_line = True
+
+        with open(contig_bin_file, 'r') as table_file:
+            for line in table_file:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+
+                delimiter = '\t' if '\t' in line else ','
+                line_list = [field.strip() for field in line.split(delimiter)]
+                if len(line_list) < 2:
+                    raise ValueError(f'Unexpected line in contig to bin table: {line}')
+                contig_id, bin_id = line_list[:2]
+
+                if first_line:
+                    first_line = False
+                    if contig_id not in assembly_contigs:
+                        log(f'skipping contig to bin table header: {line}')
+                        continue
+
+                if contig_id in binned_contig_ids:
+                    raise ValueError(f'Contig [{contig_id}] appears in multiple bins')
+                binned_contig_ids.add(contig_id)
+
+                contig_bin_table.setdefault(bin_id, []).append(contig_id)
+
+        log(f'read {len(binned_contig_ids)} contigs in {len(contig_bin_table)} bins')
+
+        return contig_bin_table
+
+    def _generate_contig_bins_from_table(self, contig_bin_table, assembly_contigs):
+        """
+        _generate_contig_bins_from_table: gerneate ContigBin structures purely from assembly
+                                          contig stats, without reading any bin fasta file
+        """
+        missing_contig_ids = [contig_id for contig_ids in contig_bin_table.values()
+                              for contig_id in contig_ids if contig_id not in assembly_contigs]
+        if missing_contig_ids:
+            error_msg = f'Cannot find {len(missing_contig_ids)} contig(s) from assembly: '
+            error_msg += ', '.join(missing_contig_ids[:10])
+            raise ValueError(error_msg)
+
+        bins = []
+        for bin_id, contig_ids in contig_bin_table.items():
+            contigs = ContigTable()
+            sum_contig_len = 0
+            sum_gc_count = 0
+            for contig_id in contig_ids:
+                contig_len, contig_gc = assembly_contigs.get(contig_id)
+                contigs.add(contig_id, contig_len, contig_gc)
+                sum_gc_count += round(contig_len * contig_gc, 5)
+                sum_contig_len += contig_len
+
+            contig_bin = {
+                'bid': bin_id,
+                'contigs': contigs,
+                'n_contigs': len(contigs),
+                'gc': round(float(sum_gc_count) / sum_contig_len, 5) if sum_contig_len else 0,
+                'sum_contig_len': sum_contig_len
+            }
+            bins.append(contig_bin)
+
+        return bins
+
+    def _get_assembly_contig_stats(self, assembly_ref):
+        """
+        _get_assembly_contig_stats: get ContigStatsTable of assembly contigs,
+                                    empty if the assembly object cannot be fetched
+        """
+        try:
+            ws_large_data = WsLargeDataIO(self.callback_url, service_ver="beta")
+            res = ws_large_data.get_objects({'objects': [{"ref": assembly_ref}]})['data'][0]
+            try:
+                assembly_contigs = load_assembly_contig_stats(res['data_json_file'])
+            finally:
+                os.remove(res['data_json_file'])
+        except Exception:
+            assembly_contigs = ContigStatsTable()
+
+        return assembly_contigs
+
+    def _get_binned_contig_object(self, binned_contig_ref):
+        """
+        _get_binned_contig_object: get (info, data) of a BinnedContig object, with the
+                                   contigs of every bin loaded as a ContigTable
+        """
+        ws_large_data = WsLargeDataIO(self.callback_url, service_ver="beta")
+        res = ws_large_data.get_objects({'objects': [{'ref': binned_contig_ref}]})['data'][0]
+        try:
+            binned_contig_data = load_binned_contigs(res['data_json_file'])
+        finally:
+            os.remove(res['data_json_file'])
+
+        return res['info'], binned_contig_data
+
+    def _generate_binned_contig_bins(self, assembly_ref, file_directory, contig_bin_file,
+                                     parallelism, bin_sources, summary_index,
+                                     reusable_bins=None):
+        """
+        _generate_binned_contig_bins: generate ContigBin structures and total contig length
+                                      from a contig to bin table or bin files
+
+        bins in reusable_bins whose summary (gc, sum_contig_len, cov) is unchanged are kept
+        as-is and their bin files are not scanned
+
+        return: bins, total_contig_len and whether contig stats came from the assembly object
+        """
+        if contig_bin_file:
+            assembly_contigs = self._get_assembly_contig_stats(assembly_ref)
+            contig_bin_table = self._read_contig_bin_table(contig_bin_file, assembly_contigs)
+            bins = self._generate_contig_bins_from_table(contig_bin_table, assembly_contigs)
+
+            total_contig_len = sum(contig_bin.get('sum_contig_len') for contig_bin in bins)
+
+            return bins, total_contig_len, bool(assembly_contigs)
+
+        bin_ids = self._get_bin_ids(file_directory, bin_sources)
+
+        reused_bins = {}
+        for bin_id, contig_bin in (reusable_bins or {}).items():
+            summary = summary_index.get(bin_id)
+            if summary and summary[:3] == (contig_bin.get('gc'),
+                                           contig_bin.get('sum_contig_len'),
+                                           contig_bin.get('cov')):
+                reused_bins[bin_id] = contig_bin
+
+        bin_ids_to_generate = [bin_id for bin_id in bin_ids if bin_id not in reused_bins]
+        log(f'reusing {len(reused_bins)} unchanged bins, '
+            f'generating {len(bin_ids_to_generate)} bins')
+
+        generated_bins = {}
+        assembly_contigs = ContigStatsTable()
+        if bin_ids_to_generate:
+            assembly_contigs = self._get_assembly_contig_stats(assembly_ref)
+            contig_bins = self._generate_contig_bins(bin_ids_to_generate, file_directory,
+                                                     assembly_contigs, summary_index,
+                                                     parallelism, bin_sources)
+            generated_bins = dict(zip(bin_ids_to_generate, contig_bins))
+
+        bins = [reused_bins.get(bin_id) or generated_bins.get(bin_id) for bin_id in bin_ids]
+
+        total_contig_len = self._get_total_contig_len(file_directory, summary_index)
+
+        return bins, total_contig_len, bool(assembly_contigs) or not bin_ids_to_generate
+
+    def _get_versioned_ref(self, obj_ref):
+        """
+        _get_versioned_ref: resolve obj_ref to a ws_id/obj_id/version reference
+        """
+        obj_info = self.wss.get_object_info3({'objects': [{'ref': obj_ref}]})['infos'][0]
+
+        return f'{obj_info[6]}/{obj_info[0]}/{obj_info[4]}'
+
+    def _get_bin_fingerprints(self, file_directory, bin_sources):
+        """
+        _get_bin_fingerprints: sha256 of every bin contig file (or archive member) content
+        """
+        log('fingerprinting bin files')
+        bin_fingerprints = {}
+
+        archive_members = {}
+        for bin_id, (file_name, member_name) in bin_sources.items():
+            if member_name is None:
+                file_path = os.path.join(file_directory, file_name)
+                bin_fingerprints[bin_id] = hash_file(file_path).hexdigest()
+            else:
+                archive_members.setdefault(file_name, {})[member_name] = bin_id
+
+        for file_name, member_bin_ids in archive_members.items():
+            for member_name, stream in iter_archive_members(
+                    os.path.join(file_directory, file_name), member_bin_ids):
+                digest = hashlib.sha256()
+                for block in iter(lambda: stream.read(1024 * 1024), b''):
+                    digest.update(block)
+                bin_fingerprints[member_bin_ids[member_name]] = digest.hexdigest()
+
+        return bin_fingerprints
+
+    def _get_bin_fingerprints_cache_key(self, versioned_binned_contig_ref):
+        return 'bin_fingerprints_' + versioned_binned_contig_ref.replace('/', '_')
+
+    def _get_reusable_bins(self, previous_binned_contig_ref, assembly_ref, bin_fingerprints):
+        """
+        _get_reusable_bins: ContigBins of a previous BinnedContig object whose bin file
+                            fingerprint matches the current bin file, by bin_id
+
+        bins are only reusable if the previous object was built against the same assembly
+        version and its bin fingerprints were recorded in the local binned contig cache
+        when it was saved; otherwise (e.g. the object was built by another deployment or
+        the entry was evicted) no bin is reused and every bin is rebuilt
+        """
+        log(f'comparing bins with previous BinnedContig: {previous_binned_contig_ref}')
+
+        previous_info, previous_data = self._get_binned_contig_object(
+            previous_binned_contig_ref)
+
+        if (self._get_versioned_ref(previous_data.get('assembly_ref')) !=
+                self._get_versioned_ref(assembly_ref)):
+            log('previous BinnedContig uses a different assembly, regenerating all bins')
+            return {}
+
+        versioned_previous_ref = f'{previous_info[6]}/{previous_info[0]}/{previous_info[4]}'
+        previous_fingerprints = self.binned_contig_cache.get_json(
+            self._get_bin_fingerprints_cache_key(versioned_previous_ref), record=False)
+        if not previous_fingerprints:
+            log('no bin fingerprints recorded for previous BinnedContig, regenerating all bins')
+            return {}
+
+        reusable_bins = {}
+        for contig_bin in previous_data.get('bins'):
+            bin_id = contig_bin.get('bid')
+            fingerprint = bin_fingerprints.get(bin_id)
+            if fingerprint and fingerprint == previous_fingerprints.get(bin_id):
+                reusable_bins[bin_id] = contig_bin
+
+        return reusable_bins
+
+    def _get_binned_contig_cache_key(self, assembly_ref, bin_fingerprints, summary_index,
+                                     contig_bin_file):
+        """
+        _get_binned_contig_cache_key: content hash of the versioned assembly reference and
+                                      the bin fingerprints and summaries, or the contig to
+                                      bin table file
+
+        returns None (no caching) if the assembly reference cannot be resolved
+        """
+        try:
+            versioned_assembly_ref = self._get_versioned_ref(assembly_ref)
+        except Exception as e:
+            log(f'cannot resolve assembly_ref [{assembly_ref}], skipping cache: {e}')
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(f'{BINNED_CONTIG_CACHE_VERSION}\n{versioned_assembly_ref}\n'.encode())
+
+        if contig_bin_file:
+            hash_file(contig_bin_file, digest)
+        else:
+            for bin_id, fingerprint in sorted(bin_fingerprints.items()):
+                digest.update(f'{bin_id}\t{fingerprint}\n'.encode())
+            digest.update(json.dumps(sorted(summary_index.items())).encode())
+
+        return digest.hexdigest()
+
+    def _get_cached_bins(self, cache_key):
+        """
+        _get_cached_bins: (bins, total_contig_len) cached under cache_key, None on a cache
+                          miss; contigs are read straight into ContigTables
+        """
+        with self.binned_contig_cache.get_file(cache_key, '.json') as entry_path:
+            if entry_path is None:
+                return None
+            try:
+                cached_binned_contigs = load_binned_contigs(entry_path)
+            except ValueError as e:
+                log(f'ignoring unreadable cache entry [{cache_key}]: {e}')
+                return None
+
+        return cached_binned_contigs.get('bins'), cached_binned_contigs.get('total_contig_len')
+
+    def _put_cached_bins(self, cache_key, bins, total_contig_len):
+        """
+        _put_cached_bins: cache bins and total_contig_len under cache_key, writing contigs
+                          one at a time
+        """
+        self.binned_contig_cache.put_file(
+            cache_key, '.json',
+            lambda file_path: write_binned_contigs_json({'total_contig_len': total_contig_len,
+                                                         'bins': bins}, file_path))
+
     def _get_contig_file(self, assembly_ref):
         """
         _get_contig_file: get contig file from GenomeAssembly object
@@ -347,48 +1011,278 @@ class MetagenomeFileUtils:
 
         return contig_file
 
-    def _get_contig_string(self, contig_id, assembly_contig_file, parsed_assembly):
+    @contextmanager
+    def _get_cached_contig_file(self, assembly_ref, with_index=True):
         """
-        _get_contig_string: find and return contig string from assembly contig file
+        _get_cached_contig_file: context yielding (contig file, .fai index file) of
+                                 assembly_ref from the local assembly cache, downloading
+                                 the assembly only on a cache miss
+
+        entries are keyed by the resolved ws/obj/ver assembly reference and stay locked
+        against eviction while the context is open; the index file is None unless
+        with_index is set
         """
+        versioned_assembly_ref = self._get_versioned_ref(assembly_ref)
+        cache_key = 'assembly_' + versioned_assembly_ref.replace('/', '_')
 
-        # parsed_assembly = SeqIO.to_dict(SeqIO.parse(assembly_contig_file, "fasta"))
+        def fill_contig_file(file_path):
+            shutil.move(self._get_contig_file(assembly_ref), file_path)
 
-        contig_record = parsed_assembly.get(contig_id)
+        with self.assembly_cache.fetch_file(cache_key, '.fasta',
+                                            fill_contig_file) as contig_file:
+            if not with_index:
+                yield contig_file, None
+                return
+            with self.assembly_cache.fetch_file(
+                    cache_key, '.fasta.fai',
+                    lambda file_path: build_fasta_index(contig_file, file_path)) as index_file:
+                yield contig_file, index_file
 
-        if contig_record:
-            string_contig = ''
-            string_contig += f'>{contig_id}\n'
-            string_contig += str(contig_record.seq).upper()
-            string_contig += '\n'
-        else:
+    def _get_contig_record(self, contig_id, assembly_contig_file, fasta_index,
+                           line_width=None, description=None):
+        """
+        _get_contig_record: find contig in assembly contig file and return its upper case
+                            fasta record as a list of byte chunks (for writelines)
+
+        fasta_index: FastaIndex of assembly_contig_file
+        line_width: wrap the sequence every line_width bases, default to a single line
+        description: header description following contig_id
+        """
+
+        contig_sequence = fasta_index.fetch(contig_id, upper=True)
+
+        if contig_sequence is None:
             error_msg = f'Cannot find contig [{contig_id}] from file [{assembly_contig_file}].'
             raise ValueError(error_msg)
 
-        return string_contig
+        return fasta_record_chunks(contig_id, contig_sequence, line_width, description)
 
-    def _pack_file_to_shock(self, result_files):
+    def _write_bins_indexed(self, bins, assembly_contig_file, open_bin, index_file=None,
+                            index_bin_contigs_only=False, line_width=None, tag_bin=False,
+                            parallelism=1):
         """
-        _pack_file_to_shock: pack files in result_files list and save in shock
+        _write_bins_indexed: write the fasta records of each bin to the binary stream
+                             returned by open_bin(bin_id), reading each contig through a
+                             .fai index (index_file, built next to assembly_contig_file if
+                             not given)
+
+        index_bin_contigs_only: keep only the index entries of the contigs in bins in
+                                memory (e.g. when exporting a few bins of a large assembly)
+        line_width: wrap sequences every line_width bases, default to a single line
+        tag_bin: add bin=<bid> to every record header
+        parallelism: number of threads writing bins side by side, open_bin streams must be
+                     independent of each other; sequences held at once are capped at
+                     BIN_WRITER_INFLIGHT_BYTES
+
+        return: number of bytes written per bin, in bins order
         """
+        contig_ids = None
+        if index_bin_contigs_only:
+            contig_ids = {contig_id for bin in bins for contig_id in bin.get('contigs')}
 
-        log('start packing and uploading files:\n{}'.format('\n'.join(result_files)))
+        log(f'indexing assembly file [{assembly_contig_file}]')
+        byte_budget = _ByteBudget(BIN_WRITER_INFLIGHT_BYTES)
+        with FastaIndex(assembly_contig_file, contig_ids, index_file) as fasta_index:
+
+            def write_bin(bin):
+                bin_id = bin.get('bid')
+                description = f'bin={bin_id}' if tag_bin else None
+                log(f'processing bin: {bin_id}')
+                bin_size = 0
+                with open_bin(bin_id) as file:
+                    contigs = bin.get('contigs')
+                    for contig_id in contigs:
+                        with byte_budget.hold(fasta_index.get_length(contig_id) or 0):
+                            record = self._get_contig_record(contig_id, assembly_contig_file,
+                                                             fasta_index, line_width,
+                                                             description)
+                            file.writelines(record)
+                        bin_size += sum(map(len, record))
+                return bin_size
+
+            if parallelism > 1:
+                with ThreadPoolExecutor(max_workers=parallelism) as executor:
+                    return list(executor.map(write_bin, bins))
+            return [write_bin(bin) for bin in bins]
+
+    def _get_bin_manifest(self, bins, bin_sizes):
+        """
+        _get_bin_manifest: TSV manifest of the byte range (offset, length) of each bin in a
+                           concatenated bin file
+        """
+        manifest = 'bid\toffset\tlength\n'
+        offset = 0
+        for bin, bin_size in zip(bins, bin_sizes):
+            manifest += f'{bin.get("bid")}\t{offset}\t{bin_size}\n'
+            offset += bin_size
+
+        return manifest
+
+    def _write_concatenated_bin_file(self, bins, assembly_contig_file, result_directory,
+                                     index_file=None, index_bin_contigs_only=False,
+                                     line_width=None):
+        """
+        _write_concatenated_bin_file: write all bins one after another into a single fasta
+                                      file with >contig_id bin=<bid> headers, plus a
+                                      manifest of the byte range of each bin, into
+                                      result_directory
+
+        see _write_bins_indexed for the other params
+        """
+        result_files = [os.path.join(result_directory, CONCATENATED_BIN_FILE),
+                        os.path.join(result_directory, BIN_MANIFEST_FILE)]
+        with open(result_files[0], 'wb') as file:
+            bin_sizes = self._write_bins_indexed(bins, assembly_contig_file,
+                                                 lambda bin_id: nullcontext(file), index_file,
+                                                 index_bin_contigs_only, line_width,
+                                                 tag_bin=True)
+        with open(result_files[1], 'w') as file:
+            file.write(self._get_bin_manifest(bins, bin_sizes))
+        log(f'saved concatenated contig file to: {result_files[0]}')
+
+        return result_files
+
+    def _write_bin_files_indexed(self, bins, assembly_contig_file, result_directory,
+                                 index_file=None, index_bin_contigs_only=False,
+                                 line_width=None, parallelism=1):
+        """
+        _write_bin_files_indexed: write one fasta file per bin into result_directory,
+                                  see _write_bins_indexed
+
+        return: bin file paths, in bins order
+        """
+        result_files = [os.path.join(result_directory, bin.get('bid')) for bin in bins]
+        self._write_bins_indexed(
+            bins, assembly_contig_file,
+            lambda bin_id: open(os.path.join(result_directory, bin_id), 'wb'),
+            index_file, index_bin_contigs_only, line_width, parallelism=parallelism)
+        log('saved contig files to: {}'.format(result_directory))
+
+        return result_files
+
+    def _write_bin_files_bucketed(self, bins, assembly_contig_file, result_directory,
+                                  line_width=None):
+        """
+        _write_bin_files_bucketed: write one fasta file per bin into result_directory in a
+                                   single sequential pass over assembly_contig_file,
+                                   routing each contig to the file of its bin
+
+        contigs are written in assembly order, a contig in several bins to each of their
+        files; unbinned contigs are skipped and the scan stops as soon as every contig of
+        bins has been written
+        line_width: wrap sequences every line_width bases, default to a single line
+        """
+        result_files = []
+        contig_file_paths = {}
+        for bin in bins:
+            result_file = os.path.join(result_directory, bin.get('bid'))
+            open(result_file, 'wb').close()
+            result_files.append(result_file)
+            for contig_id in bin.get('contigs'):
+                contig_file_paths.setdefault(contig_id, []).append(result_file)
 
+        log(f'splitting assembly file [{assembly_contig_file}] into {len(bins)} bins')
+        split_fasta(assembly_contig_file, contig_file_paths, line_width=line_width)
+
+        if contig_file_paths:
+            contig_id = next(iter(contig_file_paths))
+            error_msg = f'Cannot find contig [{contig_id}] from file [{assembly_contig_file}].'
+            raise ValueError(error_msg)
+
+        return result_files
+
+    def _get_default_bin_file_engine(self, bins, n_bins, keep_bin_files, concatenated):
+        """
+        _get_default_bin_file_engine: bucketed if bins is a subset of the n_bins bins of the
+                                      BinnedContig with no contig in more than one of them,
+                                      otherwise indexed
+
+        the indexed engine needs a .fai index of the whole assembly, which is built with a
+        full scan the first time and only cached afterwards; the bucketed engine stops
+        scanning the assembly once the contigs of bins are written
+        """
+        if not keep_bin_files or concatenated or len(bins) >= n_bins:
+            return BIN_FILE_ENGINES[0]
+
+        contig_ids = set()
+        n_contigs = 0
+        for bin in bins:
+            contig_ids.update(bin.get('contigs'))
+            n_contigs += len(bin.get('contigs'))
+
+        return 'bucketed' if len(contig_ids) == n_contigs else BIN_FILE_ENGINES[0]
+
+    def _get_packed_file_path(self):
         output_directory = os.path.join(self.scratch, 'packed_binned_contig_' + str(uuid.uuid4()))
         self._mkdir_p(output_directory)
-        result_file = os.path.join(output_directory,
-                                   f'packed_binned_contig_{uuid.uuid4()}.zip')
 
-        with zipfile.ZipFile(result_file, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zip_file:
-            for file in result_files:
-                zip_file.write(file, os.path.basename(file))
+        return os.path.join(output_directory, f'packed_binned_contig_{uuid.uuid4()}.zip')
 
+    def _save_packed_file_to_shock(self, result_file):
         shock_id = self.dfu.file_to_shock({'file_path': result_file}).get('shock_id')
 
         log(f'saved file to shock: {shock_id}')
 
         return shock_id
 
+    def _pack_file_to_shock(self, result_files, compression=None, compression_level=None,
+                            parallelism=1):
+        """
+        _pack_file_to_shock: pack files in result_files list and save in shock
+
+        compression: packed file layout, one of PACKED_FILE_LAYOUTS, default to deflated
+        compression_level: zlib level 0-9, default to zlib's default
+        parallelism: number of threads BGZF compressing files side by side
+        """
+
+        log('start packing and uploading files:\n{}'.format('\n'.join(result_files)))
+
+        result_file = self._get_packed_file_path()
+        pack_files(result_file, result_files, compression or PACKED_FILE_LAYOUTS[0],
+                   compression_level, parallelism)
+
+        return self._save_packed_file_to_shock(result_file)
+
+    def _pack_bins_to_shock(self, bins, assembly_contig_file, index_file=None,
+                            index_bin_contigs_only=False, line_width=None,
+                            compression=None, compression_level=None, concatenated=False):
+        """
+        _pack_bins_to_shock: stream the fasta records of each bin straight into its zip
+                             archive entry and save the archive in shock, without writing
+                             bin files to scratch
+
+        concatenated: stream all bins into a single entry, see _write_concatenated_bin_file
+        see _write_bins_indexed and _pack_file_to_shock for the other params
+        """
+
+        log(f'start packing and uploading {len(bins)} bins')
+
+        compression = compression or PACKED_FILE_LAYOUTS[0]
+        result_file = self._get_packed_file_path()
+        with zipfile.ZipFile(result_file, 'w',
+                             zipfile.ZIP_DEFLATED if compression == 'deflated'
+                             else zipfile.ZIP_STORED,
+                             allowZip64=True, compresslevel=compression_level) as zip_file:
+
+            def open_member(member_name):
+                if compression == 'bgzf':
+                    return BgzfWriter(zip_file.open(member_name + '.gz', 'w', force_zip64=True),
+                                      compression_level)
+                return zip_file.open(member_name, 'w', force_zip64=True)
+
+            if concatenated:
+                with open_member(CONCATENATED_BIN_FILE) as file:
+                    bin_sizes = self._write_bins_indexed(bins, assembly_contig_file,
+                                                         lambda bin_id: nullcontext(file),
+                                                         index_file, index_bin_contigs_only,
+                                                         line_width, tag_bin=True)
+                zip_file.writestr(BIN_MANIFEST_FILE, self._get_bin_manifest(bins, bin_sizes))
+            else:
+                self._write_bins_indexed(bins, assembly_contig_file, open_member, index_file,
+                                         index_bin_contigs_only, line_width)
+
+        return self._save_packed_file_to_shock(result_file)
+
     def _generate_report(self, report_message, params, created_objects=None):
         """
         generate_report: generate summary report
@@ -423,14 +1317,14 @@ class MetagenomeFileUtils:
 
         report_message = ''
 
-        binned_contig = self.dfu.get_objects({'object_refs': [new_binned_contig_ref]})['data'][0]
-        binned_contig_info = binned_contig.get('info')
+        binned_contig_info, binned_contig_data = self._get_binned_contig_object(
+            new_binned_contig_ref)
         binned_contig_name = binned_contig_info[1]
         report_message += f'Generated BinnedContigs: {binned_contig_name}' \
                           f' [{new_binned_contig_ref}]\n'
 
         binned_contig_count = 0
-        total_bins = binned_contig.get('data').get('bins')
+        total_bins = binned_contig_data.get('bins')
         total_bins_count = len(total_bins)
         bin_ids = []
         for bin in total_bins:
@@ -448,27 +1342,44 @@ class MetagenomeFileUtils:
         """
         _merge_bins: merge a list of bins into new_bin_id
 
+        a contig found in several bins is kept once, as in the workspace contigs map
         """
-        total_contigs = {}
+        total_contigs = ContigTable()
+        total_contig_ids = set()
         total_gc_count = 0
         total_sum_contig_len = 0
         total_cov_len = 0
 
+        has_cov = True
+
         for bin in bin_objects_to_merge:
-            total_contigs.update(bin.get('contigs'))
+            contigs = bin.get('contigs')
+            contig_ids = set(contigs)
+            if total_contig_ids.isdisjoint(contig_ids):
+                total_contigs.extend(contigs)
+            else:
+                for contig_row in contigs.rows():
+                    if contig_row[0] not in total_contig_ids:
+                        total_contigs.add(*contig_row)
+            total_contig_ids |= contig_ids
             sum_contig_len = bin.get('sum_contig_len')
             total_sum_contig_len += sum_contig_len
             total_gc_count += sum_contig_len * bin.get('gc')
-            total_cov_len += sum_contig_len * bin.get('cov')
+            if bin.get('cov') is None:
+                # bins built from a contig to bin table carry no coverage
+                has_cov = False
+            else:
+                total_cov_len += sum_contig_len * bin.get('cov')
 
         contig_bin = {
             'bid': new_bin_id,
             'contigs': total_contigs,
             'n_contigs': len(total_contigs),
             'gc': round(float(total_gc_count) / total_sum_contig_len, 5),
-            'sum_contig_len': total_sum_contig_len,
-            'cov': round(float(total_cov_len) / total_sum_contig_len, 5)
+            'sum_contig_len': total_sum_contig_len
         }
+        if has_cov:
+            contig_bin['cov'] = round(float(total_cov_len) / total_sum_contig_len, 5)
 
         return contig_bin
 
@@ -483,16 +1394,24 @@ class MetagenomeFileUtils:
         else:
             workspace_id = self.dfu.ws_name_to_id(workspace_name)
 
+        # contig tables are converted to the workspace shape while being written out
+        data_json_file = os.path.join(self.scratch, f'binned_contig_{uuid.uuid4()}.json')
+        write_binned_contigs_json(binned_contigs, data_json_file)
+
         object_type = 'KBaseMetagenomes.BinnedContigs'
         save_object_params = {
-            'id': workspace_id,
+            'id': int(workspace_id),
             'objects': [{'type': object_type,
-                         'data': binned_contigs,
+                         'data_json_file': data_json_file,
                          'name': binned_contig_name}]
         }
 
-        dfu_oi = self.dfu.save_objects(save_object_params)[0]
-        new_binned_contig_ref = str(dfu_oi[6]) + '/' + str(dfu_oi[0]) + '/' + str(dfu_oi[4])
+        ws_large_data = WsLargeDataIO(self.callback_url, service_ver="beta")
+        try:
+            obj_info = ws_large_data.save_objects(save_object_params)[0]
+        finally:
+            os.remove(data_json_file)
+        new_binned_contig_ref = f'{obj_info[6]}/{obj_info[0]}/{obj_info[4]}'
 
         return new_binned_contig_ref
 
@@ -537,9 +1456,41 @@ class MetagenomeFileUtils:
 
         return file_path, file_name
 
-    def _process_binned_contig_data(self, binned_contig_data):
+    def _write_binned_contig_sheet(self, workbook, bin, assembly_ref, bold):
+        """
+        _write_binned_contig_sheet: add a sheet named by bin id to workbook (constant_memory
+                                    in exports), with one row per contig of bin
+        """
+        bin_id = bin.get('bid')
+        total_coverage = bin.get('cov', 'NULL')
+
+        worksheet = workbook.add_worksheet(bin_id)
+
+        worksheet.write(0, 0, 'bin_id', bold)
+        worksheet.write(0, 1, bin_id)
+
+        worksheet.write(1, 0, 'total_coverage', bold)
+        worksheet.write(1, 1, total_coverage)
+
+        worksheet.write(2, 0, 'assembly_ref', bold)
+        worksheet.write(2, 1, assembly_ref)
+
+        contigs = bin.get('contigs')
+        worksheet.write(4, 0, 'contigs', bold)
+        worksheet.write_row(EXCEL_CONTIG_HEADER_ROW, 0, EXCEL_CONTIG_HEADER, bold)
+
+        row = EXCEL_CONTIG_HEADER_ROW + 1
+        for contig_id, contig_len, contig_gc, contig_cov in contigs.rows():
+            worksheet.write_row(row, 0, (contig_id, contig_gc, contig_len,
+                                         'NULL' if contig_cov is None else contig_cov))
+            row += 1
+
+    def _process_binned_contig_data(self, binned_contig_data, contig_rows=None):
         """
         _process_binned_contig_data: construc binned_contig data
+
+        contig_rows: (contig_id, gc, len, contig_coverage) rows, read from the contig columns
+                     of binned_contig_data if not given
         """
 
         bin_id = binned_contig_data.get('bin_id')[0]
@@ -554,30 +1505,31 @@ class MetagenomeFileUtils:
 
         cov = binned_contig_data.get('total_coverage')[0]
 
-        contig_ids = binned_contig_data.get('contig_id')
-        contig_gcs = binned_contig_data.get('gc')
-        contig_lens = binned_contig_data.get('len')
-        contig_covs = binned_contig_data.get('contig_coverage')
+        if contig_rows is None:
+            contig_rows = zip(binned_contig_data.get('contig_id'), binned_contig_data.get('gc'),
+                              binned_contig_data.get('len'),
+                              binned_contig_data.get('contig_coverage'))
+
+        return sheet_assembly_ref, self._build_contig_bin(bin_id, cov, contig_rows)
+
+    def _build_contig_bin(self, bin_id, cov, contig_rows):
+        """
+        _build_contig_bin: construct a ContigBin from (contig_id, gc, len, cov) contig_rows
 
-        contigs = {}
+        contig_rows is consumed in a single pass, values may be numbers or strings
+        """
+        contigs = ContigTable()
 
         sum_contig_len = 0
         sum_gc_count = 0
-        for index, contig_id in enumerate(contig_ids):
-            contig_len = int(contig_lens[index])
-            contig_gc = contig_gcs[index]
-            # contig_cov = contig_covs[index]
+        for contig_id, contig_gc, contig_len, contig_cov in contig_rows:
+            contig_len = int(contig_len)
+            contig_gc = float(contig_gc)
             try:
-                contig_cov = float(contig_covs[index])
+                contig_cov = float(contig_cov)
             except:
                 contig_cov = None
-            if contig_cov:
-                contigs.update({contig_id: {'gc': contig_gc,
-                                            'len': contig_len,
-                                            'cov': contig_cov}})
-            else:
-                contigs.update({contig_id: {'gc': contig_gc,
-                                            'len': contig_len}})
+            contigs.add(contig_id, contig_len, contig_gc, contig_cov or None)
             sum_gc_count += round(contig_len * contig_gc, 5)
             sum_contig_len += int(contig_len)
 
@@ -585,44 +1537,61 @@ class MetagenomeFileUtils:
             'bid': bin_id,
             'contigs': contigs,
             'n_contigs': len(contigs),
-            'gc': round(float(sum_gc_count) / sum_contig_len, 5),
+            'gc': round(float(sum_gc_count) / sum_contig_len, 5) if sum_contig_len else 0,
             'sum_contig_len': sum_contig_len,
             'cov': cov
         }
 
-        return sheet_assembly_ref, contig_bin
+        return contig_bin
 
-    def _process_binned_contig_excel(self, file_path):
+    def _process_binned_contig_sheet(self, rows):
         """
-        _process_binned_contig_excel: fetch and construct BinnedContig info from file
+        _process_binned_contig_sheet: construct binned_contig data from the rows of an Excel sheet
+
+        both sheet layouts are read: one row per contig below a contig_id | gc | len |
+        contig_coverage header row (written by export_binned_contigs_as_excel), streamed
+        straight into the bin, or the legacy one row per key with one column per contig
         """
-        try:
-            workbook = load_workbook(filename=file_path, read_only=True)
-        except:
-            raise ValueError('Unexpected excel file')
+        header_size = len(EXCEL_CONTIG_HEADER)
+        padding = (None,) * header_size
 
-        sheets = workbook.get_sheet_names()
+        binned_contig_data = {}
+        for row in rows:
+            if row[:header_size] == EXCEL_CONTIG_HEADER:
+                contig_rows = ((contig_row + padding)[:header_size] for contig_row in rows
+                               if contig_row[0] is not None)
+                return self._process_binned_contig_data(binned_contig_data, contig_rows)
+            binned_contig_data[row[0]] = list(row[1:])
+
+        return self._process_binned_contig_data(binned_contig_data)
+
+    def _process_binned_contig_excel(self, file_path, parallelism=1):
+        """
+        _process_binned_contig_excel: fetch and construct BinnedContig info from file
+
+        sheets are parsed into bins by up to parallelism worker processes, bins are returned
+        in sheet order and the assembly_ref of every sheet is checked once all are parsed
+        """
+        with XlsxReader(file_path) as workbook:
+            sheets = workbook.sheet_names
+            if parallelism <= 1 or len(sheets) <= 1:
+                sheet_bins = [self._process_binned_contig_sheet(workbook.iter_rows(sheet))
+                              for sheet in sheets]
+            else:
+                parallelism = min(parallelism, len(sheets))
+                log(f'parsing {len(sheets)} Excel sheets with {parallelism} worker processes')
+                with ProcessPoolExecutor(max_workers=parallelism,
+                                         initializer=_init_excel_sheet_worker,
+                                         initargs=(self, file_path)) as executor:
+                    sheet_bins = list(executor.map(
+                        _process_binned_contig_sheet_worker, sheets,
+                        chunksize=max(1, len(sheets) // (parallelism * 4))))
 
         bins = []
         assembly_ref = None
         total_contig_len = 0
 
-        for sheet in sheets:
-            worksheet = workbook[sheet]
-
-            binned_contig_data = {}
-            for row in worksheet.rows:
-                key_entry = True
-                key = ''
-                for cell in row:
-                    if key_entry:
-                        key = cell.value
-                        binned_contig_data[key] = []
-                        key_entry = False
-                    else:
-                        binned_contig_data[key].append(cell.value)
-
-            sheet_assembly_ref, contig_bin = self._process_binned_contig_data(binned_contig_data)
+        for sheet_assembly_ref, contig_bin in sheet_bins:
             if not assembly_ref:
                 assembly_ref = sheet_assembly_ref
             else:
@@ -633,6 +1602,134 @@ class MetagenomeFileUtils:
 
         return assembly_ref, bins, total_contig_len
 
+    def _process_binned_contig_table(self, file_path):
+        """
+        _process_binned_contig_table: construct BinnedContig info from a table file, reading
+                                      one contig row at a time
+        """
+        bins = []
+        total_contig_len = 0
+
+        with open(file_path, 'r', newline='') as table_file:
+            assembly_ref, table_bins = read_binned_contigs_table(table_file)
+            if not assembly_ref:
+                raise ValueError('assembly_ref is None in table file')
+            for bin_id, cov, contig_rows in table_bins:
+                contig_bin = self._build_contig_bin(bin_id, float(cov) if cov else None,
+                                                    contig_rows)
+                bins.append(contig_bin)
+                total_contig_len += contig_bin.get('sum_contig_len')
+
+        return assembly_ref, bins, total_contig_len
+
+    def _check_bin_contigs(self, bins, assembly_contigs):
+        """
+        _check_bin_contigs: find contigs of bins missing from assembly_contigs and contigs
+                            sitting in more than one bin (or twice in a bin)
+
+        the contig ids of all bins are gathered in one set checked against the assembly with
+        a single set operation, and duplicates show up as a set smaller than the contig count;
+        the bins of unknown or duplicated contigs are only collected once one is found
+
+        return: (unknown_contigs, duplicate_contigs), lists of {'bid', 'contig_id'} and of
+                {'contig_id', 'bids'} with a bin id per occurrence of the contig
+        """
+        contig_ids = set()
+        contig_count = 0
+        for contig_bin in bins:
+            contigs = contig_bin.get('contigs')
+            contig_ids.update(contigs)
+            contig_count += len(contigs)
+
+        unknown_contigs = []
+        missing_contig_ids = assembly_contigs.missing(contig_ids)
+        if missing_contig_ids:
+            for contig_bin in bins:
+                unknown_contigs.extend({'bid': contig_bin.get('bid'), 'contig_id': contig_id}
+                                       for contig_id in dict.fromkeys(contig_bin.get('contigs'))
+                                       if contig_id in missing_contig_ids)
+
+        duplicate_contigs = []
+        if len(contig_ids) < contig_count:
+            contig_counts = Counter(itertools.chain.from_iterable(
+                contig_bin.get('contigs') for contig_bin in bins))
+            contig_bin_ids = {contig_id: [] for contig_id, count in contig_counts.items()
+                              if count > 1}
+            for contig_bin in bins:
+                for contig_id in contig_bin.get('contigs'):
+                    if contig_id in contig_bin_ids:
+                        contig_bin_ids[contig_id].append(contig_bin.get('bid'))
+            duplicate_contigs = [{'contig_id': contig_id, 'bids': bin_ids}
+                                 for contig_id, bin_ids in contig_bin_ids.items()]
+
+        return unknown_contigs, duplicate_contigs
+
+    def _import_binned_contigs(self, params, process_file, description):
+        """
+        _import_binned_contigs: save the BinnedContigs built by process_file(file_path) from the
+                                file at params shock_id and report it
+
+        with params validate set, the contigs of the bins are first checked against the
+        assembly and the BinnedContigs is only saved if none is unknown or duplicated
+        """
+        bc_file_path,  bc_file_name = self._download_file_from_shock(params.get('shock_id'))
+
+        binned_contigs_name = params.get('binned_contigs_name')
+        if not binned_contigs_name:
+            time_stamp = datetime.datetime.fromtimestamp(time.time()).strftime('%Y%m%d_%H%M%S')
+            binned_contigs_name = os.path.splitext(bc_file_name)[0] + '_' + time_stamp
+
+        assembly_ref, bins, total_contig_len = process_file(bc_file_path)
+
+        returnVal = {}
+        report_message = ''
+        created_objects = []
+
+        if params.get('validate'):
+            assembly_contigs = self._get_assembly_contig_stats(assembly_ref)
+            if not assembly_contigs:
+                raise ValueError(f'Cannot load contigs of assembly [{assembly_ref}] to validate')
+            unknown_contigs, duplicate_contigs = self._check_bin_contigs(bins, assembly_contigs)
+            returnVal.update({'unknown_contigs': unknown_contigs,
+                              'duplicate_contigs': duplicate_contigs})
+            if unknown_contigs or duplicate_contigs:
+                report_message = f'BinnedContigs {binned_contigs_name} was not saved: '
+                report_message += f'{len(unknown_contigs)} contig(s) not found in assembly '
+                report_message += f'{assembly_ref}, {len(duplicate_contigs)} contig(s) found '
+                report_message += 'in more than one bin'
+                log(report_message)
+
+        if not report_message:
+            binned_contigs = {
+                'assembly_ref': assembly_ref,
+                'bins': bins,
+                'total_contig_len': total_contig_len
+            }
+
+            binned_contigs_ref = self._save_binned_contig(binned_contigs,
+                                                          params.get('workspace_name'),
+                                                          binned_contigs_name)
+
+            created_objects.append({"ref": binned_contigs_ref,
+                                    "description": description})
+        else:
+            binned_contigs_ref = None
+
+        returnVal['binned_contigs_ref'] = binned_contigs_ref
+
+        report_params = {'message': report_message,
+                         'objects_created': created_objects,
+                         'workspace_name': params.get('workspace_name'),
+                         'report_object_name': 'MetagenomeUtils_report_' + str(uuid.uuid4())
+                         }
+
+        kbase_report_client = KBaseReport(self.callback_url)
+        output = kbase_report_client.create_extended_report(report_params)
+
+        returnVal.update({'report_name': output['name'], 'report_ref': output['ref']})
+
+        return returnVal
+
     def __init__(self, config):
         self.callback_url = config['SDK_CALLBACK_URL']
         self.scratch = config['scratch']
@@ -641,6 +1738,15 @@ class MetagenomeFileUtils:
         self.au = AssemblyUtil(self.callback_url)
         self.setapi = SetAPI(self.callback_url)
         self.wss = workspaceService(config['workspace-url'])
+        # deploy.cfg places the caches outside the per-job scratch so that they are shared
+        # across jobs, the scratch fallback only serves configs without the keys
+        self.binned_contig_cache = LRUFileCache(
+            config.get('binned-contig-cache-dir',
+                       os.path.join(self.scratch, 'binned_contig_cache')),
+            int(config.get('binned-contig-cache-size', BINNED_CONTIG_CACHE_SIZE)))
+        self.assembly_cache = LRUFileCache(
+            config.get('assembly-cache-dir', os.path.join(self.scratch, 'assembly_cache')),
+            int(config.get('assembly-cache-size', ASSEMBLY_CACHE_SIZE)))
 
     def file_to_binned_contigs(self, params):
         """
@@ -648,11 +1754,22 @@ class MetagenomeFileUtils:
 
         input params:
         file_directory: file directory containing compressed/unpacked contig file(s) to
-                        build BinnedContig object
+                        build BinnedContig object. Bin contig files may be gzip/bzip2/xz
+                        compressed or packed in tar/zip archives; they are decompressed
+                        on the fly and never extracted to scratch
         assembly_ref: metagenome assembly object reference
         binned_contig_name: BinnedContig object name
         workspace_name: the name/id of the workspace it gets saved to
 
+        optional params:
+        parallelism: number of bins processed concurrently. default to the number of CPUs
+        contig_bin_file: contig to bin table (tab/comma separated contig_id, bin_id) used
+                         instead of bin fasta files in file_directory; bins are built from
+                         assembly contig stats only
+        previous_binned_contig_ref: BinnedContig object from an earlier run of this method;
+                                    its bins whose bin file is byte-identical are reused
+                                    without re-scanning
+
         return params:
         binned_contig_obj_ref: generated result BinnedContig object reference
         """
@@ -664,26 +1781,40 @@ class MetagenomeFileUtils:
 
         file_directory = params.get('file_directory')
         assembly_ref = params.get('assembly_ref')
+        contig_bin_file = params.get('contig_bin_file')
 
-        log('starting generating BinnedContig object')
-        bin_ids = self._get_bin_ids(file_directory)
-
-        try:
-            ws_large_data = WsLargeDataIO(self.callback_url, service_ver="beta")
-            res = ws_large_data.get_objects({'objects': [{"ref": assembly_ref}]})['data'][0]
-            data = json.load(open(res['data_json_file']))
-            assembly_contigs = data.get('contigs')
-        except Exception:
-            assembly_contigs = {}
+        previous_binned_contig_ref = params.get('previous_binned_contig_ref')
 
-        bins = []
-        for bin_id in bin_ids:
-            contig_bin = self._generate_contig_bin(bin_id, file_directory, assembly_contigs)
-            bins.append(contig_bin)
+        log('starting generating BinnedContig object')
+        bin_sources = bin_fingerprints = summary_index = None
+        if not contig_bin_file:
+            bin_sources = self._get_bin_sources(file_directory)
+            bin_fingerprints = self._get_bin_fingerprints(file_directory, bin_sources)
+            summary_index = self._build_summary_index(file_directory)
+
+        cache_key = self._get_binned_contig_cache_key(assembly_ref, bin_fingerprints,
+                                                      summary_index, contig_bin_file)
+        cached_bins = self._get_cached_bins(cache_key) if cache_key else None
+
+        has_assembly_stats = True
+        if cached_bins is not None:
+            log('using cached BinnedContig bins')
+            bins, total_contig_len = cached_bins
+        else:
+            reusable_bins = {}
+            if previous_binned_contig_ref and not contig_bin_file:
+                reusable_bins = self._get_reusable_bins(previous_binned_contig_ref,
+                                                        assembly_ref, bin_fingerprints)
+
+            parallelism = params.get('parallelism') or os.cpu_count() or 1
+            bins, total_contig_len, has_assembly_stats = self._generate_binned_contig_bins(
+                assembly_ref, file_directory, contig_bin_file, parallelism, bin_sources,
+                summary_index, reusable_bins)
+            # bins computed without assembly stats are not cached
+            if cache_key and has_assembly_stats:
+                self._put_cached_bins(cache_key, bins, total_contig_len)
         log('finished generating BinnedContig object')
 
-        total_contig_len = self._get_total_contig_len(file_directory)
-
         binned_contigs = {
             'assembly_ref': assembly_ref,
             'bins': bins,
@@ -694,6 +1825,11 @@ class MetagenomeFileUtils:
                                                          params.get('workspace_name'),
                                                          params.get('binned_contig_name'))
 
+        # recorded so a later rerun can pass this object as previous_binned_contig_ref
+        if bin_fingerprints is not None and has_assembly_stats:
+            self.binned_contig_cache.put_json(
+                self._get_bin_fingerprints_cache_key(binned_contig_obj_ref), bin_fingerprints)
+
         returnVal = {'binned_contig_obj_ref': binned_contig_obj_ref}
         log('successfully saved BinnedContig object')
 
@@ -709,10 +1845,36 @@ class MetagenomeFileUtils:
         optional params:
         save_to_shock: saving result bin files to shock. default to True
         bin_id_list: only extract bin_id_list
+        engine: how bin files are written, one of
+                indexed: read each bin's contigs through a .fai index
+                bucketed: stream the assembly once, routing each contig to its bin
+                          file(s) and stopping once all are found; contigs are written
+                          in assembly rather than bin order
+                default to bucketed if bin_id_list picks out bins sharing no contig (and
+                bin files are kept, not concatenated), otherwise indexed
+        line_width: wrap bin file sequences every line_width bases (e.g. 60 or 80),
+                    default to 0: each sequence on a single line
+        keep_bin_files: write bin files into bin_file_directory. default to True, if
+                        turned off bins are streamed straight into the packed file
+        compression: packed file layout, one of
+                     deflated (default): deflated bin files
+                     stored: uncompressed bin files
+                     bgzf: bin files compressed to BGZF (bgzip compatible gzip, named
+                           bin_id + '.gz') and stored uncompressed in the packed file
+        compression_level: zlib level 0-9 of deflated or BGZF bin files
+        parallelism: number of threads writing (indexed engine) and BGZF compressing bin
+                     files side by side. default to 1
+        output_layout: one of
+                       bin_files (default): one fasta file per bin, named by bin id
+                       concatenated: all bins in a single fasta file (binned_contigs.fasta)
+                                     with >contig_id bin=<bid> headers, plus a TSV manifest
+                                     of the byte range of each bin in the uncompressed
+                                     file (binned_contigs.manifest.tsv)
 
         return params:
         shock_id: saved packed file shock id
-        bin_file_directory: directory that contains all bin files
+        bin_file_directory: directory that contains all bin files (None if keep_bin_files
+                            is turned off)
         """
 
         log('--->\nrunning MetagenomeFileUtils.binned_contigs_to_file\n' +
@@ -720,49 +1882,58 @@ class MetagenomeFileUtils:
 
         self._validate_binned_contigs_to_file_params(params)
 
-        binned_contig_object = self.dfu.get_objects({'object_refs':
-                                                    [params.get('input_ref')]})['data'][0]
-
-        assembly_ref = binned_contig_object.get('data').get('assembly_ref')
-        assembly_contig_file = self._get_contig_file(params.get('input_ref') + ";" + assembly_ref)
-        log(f'parsing assembly file [{assembly_contig_file}] to dictionary')
-        parsed_assembly = SeqIO.to_dict(SeqIO.parse(assembly_contig_file, "fasta"))
+        binned_contig_data = self._get_binned_contig_object(params.get('input_ref'))[1]
 
-        bins = binned_contig_object.get('data').get('bins')
-
-        result_directory = os.path.join(self.scratch, 'binned_contig_files_' + str(uuid.uuid4()))
-        self._mkdir_p(result_directory)
+        assembly_ref = binned_contig_data.get('assembly_ref')
 
-        result_files = []
+        bins = binned_contig_data.get('bins')
+        n_bins = len(bins)
         bin_id_list = params.get('bin_id_list')
-        for bin in bins:
-            bin_id = bin.get('bid')
-            if bin_id_list:
-                if bin_id in bin_id_list:
-                    log(f'processing bin: {bin_id}')
-                    with open(os.path.join(result_directory, bin_id), 'w') as file:
-                        contigs = bin.get('contigs')
-                        for contig_id in list(contigs.keys()):
-                            contig_string = self._get_contig_string(contig_id,
-                                                                    assembly_contig_file,
-                                                                    parsed_assembly)
-                            file.write(contig_string)
-                    result_files.append(os.path.join(result_directory, bin_id))
-                    log(f'saved contig file to: {result_files[-1]}')
+        if bin_id_list:
+            bin_id_set = set(bin_id_list)
+            bins = [bin for bin in bins if bin.get('bid') in bin_id_set]
+
+        keep_bin_files = params.get('keep_bin_files') not in (0, False)
+        save_to_shock = params.get('save_to_shock') not in (0, False)
+        concatenated = params.get('output_layout') == 'concatenated'
+        line_width = params.get('line_width')
+        compression = params.get('compression')
+        compression_level = params.get('compression_level')
+
+        engine = params.get('engine') or self._get_default_bin_file_engine(
+            bins, n_bins, keep_bin_files, concatenated)
+        log(f'writing bin files with the {engine} engine')
+
+        assembly_ref_path = params.get('input_ref') + ";" + assembly_ref
+        with self._get_cached_contig_file(
+                assembly_ref_path, with_index=engine == 'indexed') as (assembly_contig_file,
+                                                                       index_file):
+            if not keep_bin_files:
+                shock_id = self._pack_bins_to_shock(bins, assembly_contig_file, index_file,
+                                                    bool(bin_id_list), line_width,
+                                                    compression, compression_level,
+                                                    concatenated)
+                return {'shock_id': shock_id, 'bin_file_directory': None}
+
+            result_directory = os.path.join(self.scratch,
+                                            'binned_contig_files_' + str(uuid.uuid4()))
+            self._mkdir_p(result_directory)
+            if concatenated:
+                result_files = self._write_concatenated_bin_file(bins, assembly_contig_file,
+                                                                 result_directory, index_file,
+                                                                 bool(bin_id_list), line_width)
+            elif engine == 'bucketed':
+                result_files = self._write_bin_files_bucketed(bins, assembly_contig_file,
+                                                              result_directory, line_width)
             else:
-                log(f'processing bin: {bin_id}')
-                with open(os.path.join(result_directory, bin_id), 'w') as file:
-                    contigs = bin.get('contigs')
-                    for contig_id in list(contigs.keys()):
-                        contig_string = self._get_contig_string(contig_id,
-                                                                assembly_contig_file,
-                                                                parsed_assembly)
-                        file.write(contig_string)
-                result_files.append(os.path.join(result_directory, bin_id))
-                log(f'saved contig file to: {result_files[-1]}')
-
-        if params.get('save_to_shock') or params.get('save_to_shock') is None:
-            shock_id = self._pack_file_to_shock(result_files)
+                result_files = self._write_bin_files_indexed(bins, assembly_contig_file,
+                                                             result_directory, index_file,
+                                                             bool(bin_id_list), line_width,
+                                                             params.get('parallelism') or 1)
+
+        if save_to_shock:
+            shock_id = self._pack_file_to_shock(result_files, compression, compression_level,
+                                                params.get('parallelism') or 1)
         else:
             shock_id = None
 
@@ -773,7 +1944,7 @@ class MetagenomeFileUtils:
     def export_binned_contigs_as_excel(self, params):
         """
         export_binned_contigs_as_excel: Convert BinnedContig object to an excel file and pack it
-                                        to shock
+                                        to shock, one sheet per bin with one row per contig
 
         input params:
         input_ref: BinnedContig object reference
@@ -791,50 +1962,29 @@ class MetagenomeFileUtils:
 
         self._validate_binned_contigs_to_file_params(params)
 
-        binned_contig = self.dfu.get_objects({'object_refs':
-                                             [params.get('input_ref')]})['data'][0]
-        binned_contig_name = binned_contig.get('info')[1]
-        binned_contig_data = binned_contig.get('data')
+        binned_contig_info, binned_contig_data = self._get_binned_contig_object(
+            params.get('input_ref'))
+        binned_contig_name = binned_contig_info[1]
 
         assembly_ref = binned_contig_data.get('assembly_ref')
         bins = binned_contig_data.get('bins')
 
+        for bin in bins:
+            if len(bin.get('contigs')) > EXCEL_MAX_ROWS - EXCEL_CONTIG_HEADER_ROW - 1:
+                error_msg = f'Bin [{bin.get("bid")}] has more contigs than an Excel sheet '
+                error_msg += 'has rows, export it as a table instead'
+                raise ValueError(error_msg)
+
         result_directory = os.path.join(self.scratch, f'binned_contig_excel_{uuid.uuid4()}')
         self._mkdir_p(result_directory)
         output_excel = os.path.join(result_directory, f'{binned_contig_name}.xlsx')
-        workbook = xlsxwriter.Workbook(output_excel)
+        # rows are flushed to a temporary file per sheet as soon as the next one starts
+        workbook = xlsxwriter.Workbook(output_excel, {'constant_memory': True})
         bold = workbook.add_format({'bold': True})
 
         for bin in bins:
-            bin_id = bin.get('bid')
-            total_coverage = bin.get('cov', 'NULL')
-
-            log(f'processing bin: {bin_id}')
-            worksheet = workbook.add_worksheet(bin_id)
-
-            worksheet.write(0, 0, 'bin_id', bold)
-            worksheet.write(0, 1, bin_id)
-
-            worksheet.write(1, 0, 'total_coverage', bold)
-            worksheet.write(1, 1, total_coverage)
-
-            worksheet.write(2, 0, 'assembly_ref', bold)
-            worksheet.write(2, 1, assembly_ref)
-
-            contigs = bin.get('contigs')
-            worksheet.write(4, 0, 'contigs', bold)
-            worksheet.write(5, 0, 'contig_id', bold)
-            worksheet.write(6, 0, 'gc', bold)
-            worksheet.write(7, 0, 'len', bold)
-            worksheet.write(8, 0, 'contig_coverage', bold)
-
-            i = 1
-            for contig_id, contig_value in contigs.items():
-                worksheet.write(5, i, contig_id)
-                worksheet.write(6, i, contig_value.get('gc'))
-                worksheet.write(7, i, contig_value.get('len'))
-                worksheet.write(8, i, contig_value.get('cov', 'NULL'))
-                i += 1
+            log(f'processing bin: {bin.get("bid")}')
+            self._write_binned_contig_sheet(workbook, bin, assembly_ref, bold)
 
         workbook.close()
 
@@ -853,7 +2003,8 @@ class MetagenomeFileUtils:
 
     def import_excel_as_binned_contigs(self, params):
         """
-        import_excel_as_binned_contigs: Import an excel file as BinnedContigs
+        import_excel_as_binned_contigs: Import an excel file as BinnedContigs, with one row or
+                                        one column (legacy layout) per contig in each sheet
 
         required params:
         shock_id: Excel file stored in shock
@@ -862,6 +2013,13 @@ class MetagenomeFileUtils:
         optional params:
         binned_contigs_name: saved BinnedContig name.
                              Auto append timestamp from excel if not given.
+        parallelism: number of worker processes parsing sheets side by side. default to 1
+        validate: check contig ids against assembly_ref before saving. default to False
+
+        return params:
+        binned_contigs_ref: saved BinnedContig reference (None if validation failed)
+        unknown_contigs: (validate only) contigs missing from assembly_ref, {bid, contig_id}
+        duplicate_contigs: (validate only) contigs in more than one bin, {contig_id, bids}
         """
 
         log('--->\nrunning MetagenomeFileUtils.import_excel_as_binned_contigs\n' +
@@ -869,44 +2027,126 @@ class MetagenomeFileUtils:
 
         self._validate_import_excel_as_binned_contigs_params(params)
 
-        bc_file_path,  bc_file_name = self._download_file_from_shock(params.get('shock_id'))
+        parallelism = params.get('parallelism') or 1
 
-        binned_contigs_name = params.get('binned_contigs_name')
-        if not binned_contigs_name:
-            time_stamp = datetime.datetime.fromtimestamp(time.time()).strftime('%Y%m%d_%H%M%S')
-            binned_contigs_name = os.path.splitext(bc_file_name)[0] + '_' + time_stamp
+        return self._import_binned_contigs(
+            params, lambda file_path: self._process_binned_contig_excel(file_path, parallelism),
+            'BinnedContigs from Excel')
 
-        assembly_ref, bins, total_contig_len = self._process_binned_contig_excel(bc_file_path)
+    def export_binned_contigs_as_table(self, params):
+        """
+        export_binned_contigs_as_table: Convert BinnedContig object to a TSV or CSV table and
+                                        pack it to shock, one row per contig
 
-        binned_contigs = {
-            'assembly_ref': assembly_ref,
-            'bins': bins,
-            'total_contig_len': total_contig_len
-        }
+        input params:
+        input_ref: BinnedContig object reference
 
-        binned_contigs_ref = self._save_binned_contig(binned_contigs,
-                                                      params.get('workspace_name'),
-                                                      binned_contigs_name)
+        optional params:
+        save_to_shock: saving result table file to shock. default to True
+        table_format: one of tsv (default) or csv
 
-        created_objects = []
-        created_objects.append({"ref": binned_contigs_ref,
-                                "description": "BinnedContigs from Excel"})
+        return params:
+        shock_id: saved packed file shock id
+        bin_file_directory: directory that contains the table file
+        """
 
-        returnVal = {'binned_contigs_ref': binned_contigs_ref}
+        log('--->\nrunning MetagenomeFileUtils.export_binned_contigs_as_table\n' +
+            f'params:\n{json.dumps(params, indent=1)}')
 
-        report_params = {'message': '',
-                         'objects_created': created_objects,
-                         'workspace_name': params.get('workspace_name'),
-                         'report_object_name': 'MetagenomeUtils_report_' + str(uuid.uuid4())
-                         }
+        self._validate_export_binned_contigs_as_table_params(params)
 
-        kbase_report_client = KBaseReport(self.callback_url)
-        output = kbase_report_client.create_extended_report(report_params)
+        table_format = params.get('table_format') or next(iter(TABLE_DELIMITERS))
 
-        returnVal.update({'report_name': output['name'], 'report_ref': output['ref']})
+        binned_contig_info, binned_contig_data = self._get_binned_contig_object(
+            params.get('input_ref'))
+        binned_contig_name = binned_contig_info[1]
+
+        result_directory = os.path.join(self.scratch, f'binned_contig_table_{uuid.uuid4()}')
+        self._mkdir_p(result_directory)
+        output_table = os.path.join(result_directory, f'{binned_contig_name}.{table_format}')
+        with open(output_table, 'w', newline='') as table_file:
+            write_binned_contigs_table(binned_contig_data, table_file,
+                                       delimiter=TABLE_DELIMITERS[table_format])
+
+        if params.get('save_to_shock') or params.get('save_to_shock') is None:
+            shock_id = self.dfu.file_to_shock({'file_path': result_directory,
+                                               'pack': 'zip'}).get('shock_id')
+        else:
+            shock_id = None
+
+        returnVal = {'shock_id': shock_id, 'bin_file_directory': result_directory}
 
         return returnVal
 
+    def import_table_as_binned_contigs(self, params):
+        """
+        import_table_as_binned_contigs: Import a TSV or CSV table written by
+                                        export_binned_contigs_as_table as BinnedContigs
+
+        required params:
+        shock_id: table file stored in shock
+        workspace_name: the name of the workspace object gets saved to
+
+        optional params:
+        binned_contigs_name: saved BinnedContig name.
+                             Auto append timestamp from table file if not given.
+        validate: check contig ids against assembly_ref before saving. default to False
+
+        return params:
+        binned_contigs_ref: saved BinnedContig reference (None if validation failed)
+        unknown_contigs: (validate only) contigs missing from assembly_ref, {bid, contig_id}
+        duplicate_contigs: (validate only) contigs in more than one bin, {contig_id, bids}
+        """
+
+        log('--->\nrunning MetagenomeFileUtils.import_table_as_binned_contigs\n' +
+            f'params:\n{json.dumps(params, indent=1)}')
+
+        self._validate_import_table_as_binned_contigs_params(params)
+
+        return self._import_binned_contigs(params, self._process_binned_contig_table,
+                                           'BinnedContigs from table')
+
+    def _save_bin_assemblies(self, bin_files, workspace_name, assembly_suffix,
+                             max_concurrent_saves):
+        """
+        _save_bin_assemblies: save each bin file of bin_files ({bin_id: file_path}) as an
+                              Assembly named bin_id + assembly_suffix, with up to
+                              max_concurrent_saves saves in flight
+
+        a failed save does not stop the others, it is reported once all saves are done
+
+        return: (assembly_refs, failed_bins) in bin_files order, assembly_refs maps the
+                bin_id of every saved Assembly to its reference and failed_bins is a list
+                of {'bid', 'error'}
+        """
+        def save_assembly(bin_id, bin_file):
+            output_assembly_name = bin_id + assembly_suffix
+            log(f'starting generating assembly {output_assembly_name} from {bin_id}')
+            assembly_ref = self.au.save_assembly_from_fasta({
+                'file': {'path': bin_file},
+                'workspace_name': workspace_name,
+                'assembly_name': output_assembly_name
+            })
+            log(f'finished generating assembly from {bin_id}')
+            return assembly_ref
+
+        max_workers = max(1, min(max_concurrent_saves, len(bin_files)))
+        log(f'saving {len(bin_files)} assemblies with up to {max_workers} saves in flight')
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(bin_id, executor.submit(save_assembly, bin_id, bin_file))
+                       for bin_id, bin_file in bin_files.items()]
+
+        assembly_refs = {}
+        failed_bins = []
+        for bin_id, future in futures:
+            try:
+                assembly_refs[bin_id] = future.result()
+            except Exception as error:
+                log(f'failed to generate assembly from {bin_id}: {error}')
+                failed_bins.append({'bid': bin_id, 'error': str(error)})
+
+        return assembly_refs, failed_bins
+
     def _get_object_name_from_ref(self, obj_ref):
         """given the object reference, return the object_name as a string"""
         return(self.wss.get_object_info_new({"objects": [{'ref': obj_ref}]})[0][1])
@@ -921,8 +2161,15 @@ class MetagenomeFileUtils:
         extracted_assemblies: a string, a comma-separated list of bin_ids to be extracted
         workspace_name: the name of the workspace it gets saved to
 
+        optional params:
+        max_concurrent_saves: number of Assembly saves in flight,
+                              default to MAX_CONCURRENT_ASSEMBLY_SAVES
+
         return params:
-        assembly_ref_list: a list of generated result Assembly object reference
+        assembly_ref_list: a list of generated result Assembly object reference, in
+                           extracted_assemblies order without the failed bins
+        assembly_refs: generated result Assembly object reference by bin id
+        failed_bins: bins whose Assembly could not be saved, {bid, error}
         report_name: report name generated by KBaseReport
         report_ref: report reference generated by KBaseReport
         """
@@ -953,27 +2200,26 @@ class MetagenomeFileUtils:
             extracted_assemblies = bin_files
             log("extracted_assemblies was empty, is now " + pformat(extracted_assemblies))
 
-        generated_assembly_ref_list = []
-        assembly_suffix = params.get('assembly_suffix').strip()
+        bin_file_names = set(os.path.basename(f) for f in bin_files)
         for bin_id in extracted_assemblies:
-            if bin_id not in [os.path.basename(f) for f in bin_files]:
+            if bin_id not in bin_file_names:
                 error_msg = f'bin_id [{bin_id}] cannot be found in BinnedContig '
                 error_msg += f'[{binned_contig_obj_ref}]'
                 raise ValueError(error_msg)
-            else:
-                output_assembly_name = bin_id + assembly_suffix
-                log(f'saving assembly: {output_assembly_name}')
-                for bin_file in bin_files:
-                    if os.path.basename(bin_file) == bin_id:
-                        log(f'starting generating assembly from {bin_id}')
-                        assembly_params = {
-                            'file': {'path': os.path.join(bin_file_directory, bin_file)},
-                            'workspace_name': params.get('workspace_name'),
-                            'assembly_name': output_assembly_name
-                        }
-                        assembly_ref = self.au.save_assembly_from_fasta(assembly_params)
-                        log(f'finished generating assembly from {bin_id}')
-                        generated_assembly_ref_list.append(assembly_ref)
+
+        # the AssemblySet is only saved once every assembly save has finished
+        assembly_refs, failed_bins = self._save_bin_assemblies(
+            {bin_id: os.path.join(bin_file_directory, bin_id)
+             for bin_id in extracted_assemblies},
+            params.get('workspace_name'), params.get('assembly_suffix').strip(),
+            params.get('max_concurrent_saves') or MAX_CONCURRENT_ASSEMBLY_SAVES)
+        generated_assembly_ref_list = list(assembly_refs.values())
+        if failed_bins and not generated_assembly_ref_list:
+            error_msg = 'Cannot generate any assembly: '
+            error_msg += '; '.join(f'{failed_bin["bid"]}: {failed_bin["error"]}'
+                                   for failed_bin in failed_bins)
+            raise ValueError(error_msg)
+
         setret = None
         if len(generated_assembly_ref_list) > 1:
             binned_contig_object_name = self._get_object_name_from_ref(binned_contig_obj_ref)
@@ -997,6 +2243,10 @@ class MetagenomeFileUtils:
         if setret:
             report_message = report_message + f'\nGenerated Assembly Set: {setret.get("set_ref")}'
 
+        for failed_bin in failed_bins:
+            report_message += f'\nFailed to generate Assembly from {failed_bin["bid"]}: '
+            report_message += failed_bin['error']
+
         created_objects = []
         if setret:    # if assembly set created put that first
             created_objects.append({"ref": setret.get('set_ref'),
@@ -1009,7 +2259,9 @@ class MetagenomeFileUtils:
 
         reportVal = self._generate_report(report_message, params, created_objects)
 
-        returnVal = {'assembly_ref_list': generated_assembly_ref_list}
+        returnVal = {'assembly_ref_list': generated_assembly_ref_list,
+                     'assembly_refs': assembly_refs,
+                     'failed_bins': failed_bins}
         returnVal.update(reportVal)
 
         if setret:
@@ -1036,14 +2288,13 @@ class MetagenomeFileUtils:
 
         self._validate_remove_bins_from_binned_contig_params(params)
 
-        binned_contig_object = self.dfu.get_objects({'object_refs':
-                                                     [params.get('old_binned_contig_ref')]}
-                                                    )['data'][0]
+        binned_contig_data = self._get_binned_contig_object(
+            params.get('old_binned_contig_ref'))[1]
 
-        assembly_ref = binned_contig_object.get('data').get('assembly_ref')
-        total_contig_len = int(binned_contig_object.get('data').get('total_contig_len'))
+        assembly_ref = binned_contig_data.get('assembly_ref')
+        total_contig_len = int(binned_contig_data.get('total_contig_len'))
 
-        old_bins = binned_contig_object.get('data').get('bins')
+        old_bins = binned_contig_data.get('bins')
         bins_to_remove = params.get('bins_to_remove')
 
         for bin in list(old_bins):
@@ -1093,14 +2344,13 @@ class MetagenomeFileUtils:
         bin_merges = params.get('bin_merges')
         self._check_bin_merges(bin_merges)
 
-        binned_contig_object = self.dfu.get_objects({'object_refs':
-                                                     [params.get('old_binned_contig_ref')]}
-                                                    )['data'][0]
+        binned_contig_data = self._get_binned_contig_object(
+            params.get('old_binned_contig_ref'))[1]
 
-        assembly_ref = binned_contig_object.get('data').get('assembly_ref')
-        total_contig_len = int(binned_contig_object.get('data').get('total_contig_len'))
+        assembly_ref = binned_contig_data.get('assembly_ref')
+        total_contig_len = int(binned_contig_data.get('total_contig_len'))
 
-        bins = binned_contig_object.get('data').get('bins')
+        bins = binned_contig_data.get('bins')
         old_bin_ids = [item.get('bid') for item in bins]
 
         for bin_merge in bin_merges:
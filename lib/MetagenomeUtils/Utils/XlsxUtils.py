@@ -0,0 +1,240 @@
+import posixpath
+import zipfile
+from xml.etree.ElementTree import ParseError, iterparse
+from xml.parsers import expat
+
+_PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_WORKBOOK_PATH = 'xl/workbook.xml'
+_WORKBOOK_RELS_PATH = 'xl/_rels/workbook.xml.rels'
+_SHARED_STRINGS_TYPE = '/sharedStrings'
+_DIGITS = '0123456789'
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _column_index(column_letters):
+    """
+    _column_index: 0-based column index of the column letters of a cell reference ('AB')
+    """
+    index = 0
+    for char in column_letters:
+        index = index * 26 + ord(char) - 64
+
+    return index - 1
+
+
+def _number(text):
+    if '.' in text or 'E' in text or 'e' in text:
+        return float(text)
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+class XlsxReader:
+    """
+    XlsxReader: streaming reader of the cell values of an xlsx workbook
+
+    the workbook and its relationships are read with iterparse, the shared strings table
+    (on first use) and sheet XML are fed chunk by chunk to expat parsers whose callbacks
+    build strings and row tuples directly, without an element tree or cell objects, so
+    only the shared strings table stays in memory. Cell values are str,
+    int, float or bool, formulas yield their cached value.
+    """
+
+    def __init__(self, file_path):
+        try:
+            self._zip = zipfile.ZipFile(file_path)
+            self._sheet_paths = self._read_sheet_paths()
+            self._shared_strings = None
+            self._column_indexes = {}
+        except (zipfile.BadZipFile, KeyError, ParseError, OSError) as error:
+            self.close()
+            raise ValueError(f'Unexpected xlsx file [{file_path}]: {error}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if getattr(self, '_zip', None) is not None:
+            self._zip.close()
+            self._zip = None
+
+    def _read_rels(self):
+        """
+        _read_rels: (type, target path inside the package) of workbook relationships by id
+        """
+        rels = {}
+        with self._zip.open(_WORKBOOK_RELS_PATH) as rels_file:
+            for event, elem in iterparse(rels_file):
+                if elem.tag == _PACKAGE_REL_NS + 'Relationship':
+                    target = elem.get('Target')
+                    if target.startswith('/'):
+                        target = target[1:]
+                    else:
+                        target = posixpath.normpath(
+                            posixpath.join(posixpath.dirname(_WORKBOOK_PATH), target))
+                    rels[elem.get('Id')] = (elem.get('Type'), target)
+
+        return rels
+
+    def _read_sheet_paths(self):
+        """
+        _read_sheet_paths: sheet XML path by sheet name, in workbook order
+        """
+        self._rels = self._read_rels()
+        sheet_paths = {}
+        with self._zip.open(_WORKBOOK_PATH) as workbook_file:
+            for event, elem in iterparse(workbook_file):
+                if _local_name(elem.tag) == 'sheet':
+                    rel_id = next(value for key, value in elem.attrib.items()
+                                  if _local_name(key) == 'id')
+                    sheet_paths[elem.get('name')] = self._rels[rel_id][1]
+
+        return sheet_paths
+
+    def _get_shared_strings(self):
+        """
+        _get_shared_strings: shared strings table, read on first use
+        """
+        if self._shared_strings is not None:
+            return self._shared_strings
+
+        shared_strings = []
+        shared_strings_paths = [target for rel_type, target in self._rels.values()
+                                if rel_type.endswith(_SHARED_STRINGS_TYPE)]
+        if shared_strings_paths:
+            parts = []
+            phonetic = False
+            tags = {}
+
+            # rich text strings are split into runs, phonetic hints are not part of them
+            def start_element(name, attrs):
+                nonlocal phonetic
+                tag = tags.get(name)
+                if tag is None:
+                    tag = tags.setdefault(name, _local_name(name))
+                if tag == 't' and not phonetic:
+                    parser.CharacterDataHandler = parts.append
+                elif tag == 'rPh':
+                    phonetic = True
+
+            def end_element(name):
+                nonlocal phonetic
+                tag = tags[name]
+                if tag == 't':
+                    parser.CharacterDataHandler = None
+                elif tag == 'rPh':
+                    phonetic = False
+                elif tag == 'si':
+                    shared_strings.append(''.join(parts))
+                    parts.clear()
+
+            parser = self._create_parser(start_element, end_element)
+            for _ in self._feed(parser, shared_strings_paths[0]):
+                pass
+
+        self._shared_strings = shared_strings
+        return shared_strings
+
+    def _create_parser(self, start_element, end_element):
+        parser = expat.ParserCreate(namespace_separator='}')
+        parser.buffer_text = True
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+
+        return parser
+
+    def _feed(self, parser, part_path):
+        """
+        _feed: feed part_path to parser chunk by chunk, yielding after each chunk
+        """
+        with self._zip.open(part_path) as part_file:
+            while True:
+                chunk = part_file.read(_CHUNK_SIZE)
+                try:
+                    parser.Parse(chunk, not chunk)
+                except expat.ExpatError as error:
+                    raise ValueError(f'Unexpected XML in [{part_path}]: {error}')
+                yield
+                if not chunk:
+                    break
+
+    @property
+    def sheet_names(self):
+        return list(self._sheet_paths)
+
+    def iter_rows(self, sheet_name):
+        """
+        iter_rows: yield a tuple of cell values per non-empty row of sheet_name
+
+        missing cells before the last value of a row are None, rows end at their last cell
+        """
+        try:
+            sheet_path = self._sheet_paths[sheet_name]
+        except KeyError:
+            raise ValueError(f'Cannot find sheet [{sheet_name}]')
+        shared_strings = self._get_shared_strings()
+        column_indexes = self._column_indexes
+
+        rows = []
+        row = cell_ref = cell_type = parts = None
+        tags = {}
+
+        # expat callbacks build row tuples directly, no element tree is kept
+        def start_element(name, attrs):
+            nonlocal row, cell_ref, cell_type, parts
+            tag = tags.get(name)
+            if tag is None:
+                tag = tags.setdefault(name, _local_name(name))
+            if tag == 'c':
+                cell_ref = attrs.get('r')
+                cell_type = attrs.get('t', 'n')
+                parts = None
+            elif tag == 'v' or tag == 't':
+                if parts is None:
+                    parts = []
+                parser.CharacterDataHandler = parts.append
+            elif tag == 'row':
+                row = []
+
+        def end_element(name):
+            tag = tags[name]
+            if tag == 'c':
+                if cell_ref is not None:
+                    column_letters = cell_ref.rstrip(_DIGITS)
+                    column = column_indexes.get(column_letters)
+                    if column is None:
+                        column = column_indexes.setdefault(column_letters,
+                                                           _column_index(column_letters))
+                    if column > len(row):
+                        row.extend([None] * (column - len(row)))
+                value = None
+                if parts is not None:
+                    value = ''.join(parts)
+                    if cell_type == 'n':
+                        value = _number(value)
+                    elif cell_type == 's':
+                        value = shared_strings[int(value)]
+                    elif cell_type == 'b':
+                        value = value == '1'
+                row.append(value)
+            elif tag == 'v' or tag == 't':
+                parser.CharacterDataHandler = None
+            elif tag == 'row':
+                while row and row[-1] is None:
+                    row.pop()
+                if row:
+                    rows.append(tuple(row))
+
+        parser = self._create_parser(start_element, end_element)
+        for _ in self._feed(parser, sheet_path):
+            yield from rows
+            rows.clear()
@@ -4,16 +4,36 @@ import shutil
 import time
 import unittest
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from configparser import ConfigParser
 from os import environ
 from pprint import pprint  # noqa: F401
 import json
+import gzip
+import io
+import tarfile
+import tracemalloc
 
+import xlsxwriter
 from Bio import SeqIO
+from openpyxl import load_workbook
 
 from MetagenomeUtils.MetagenomeUtilsImpl import MetagenomeUtils
 from MetagenomeUtils.MetagenomeUtilsServer import MethodContext
+from MetagenomeUtils.Utils.ArchiveUtils import pack_files
+from MetagenomeUtils.Utils.AssemblyStatsUtils import (ContigStatsTable,
+                                                      load_assembly_contig_stats)
+from MetagenomeUtils.Utils.BinnedContigUtils import (ContigTable, bins_from_workspace,
+                                                     bins_to_workspace, load_binned_contigs,
+                                                     write_binned_contigs_json,
+                                                     write_binned_contigs_table)
+from MetagenomeUtils.Utils.CacheUtils import LRUFileCache
+from MetagenomeUtils.Utils.FastaUtils import (FastaIndex, _scan_file_range, _split_records,
+                                              build_fasta_index, fasta_record_chunks,
+                                              scan_fasta_stats, scan_fasta_stream,
+                                              split_fasta)
 from MetagenomeUtils.Utils.MetagenomeFileUtils import MetagenomeFileUtils
+from MetagenomeUtils.Utils.XlsxUtils import XlsxReader
 from MetagenomeUtils.authclient import KBaseAuth as _KBaseAuth
 from installed_clients.AssemblyUtilClient import AssemblyUtil
 from installed_clients.DataFileUtilClient import DataFileUtil
@@ -327,6 +347,18 @@ class MetagenomeUtilsTest(unittest.TestCase):
             self.getImpl().extract_binned_contigs_as_assembly(self.getContext(),
                                                               invalidate_input_params)
 
+        invalidate_input_params = {
+            'binned_contig_obj_ref': 'binned_contig_obj_ref',
+            'extracted_assemblies': 'bin_id1',
+            'assembly_suffix': '_assembly',
+            'workspace_name': 'workspace_name',
+            'max_concurrent_saves': 0
+        }
+        with self.assertRaisesRegex(
+                ValueError, 'expecting a positive integer for max_concurrent_saves param'):
+            self.getImpl().extract_binned_contigs_as_assembly(self.getContext(),
+                                                              invalidate_input_params)
+
     def test_bad_binned_contigs_to_file_params(self):
         invalidate_input_params = {
             'missing_input_ref': 'input_ref'
@@ -335,6 +367,48 @@ class MetagenomeUtilsTest(unittest.TestCase):
                 ValueError, '"input_ref" parameter is required, but missing'):
             self.getImpl().binned_contigs_to_file(self.getContext(), invalidate_input_params)
 
+        invalidate_input_params = {
+            'input_ref': 'input_ref',
+            'engine': 'random_access'
+        }
+        with self.assertRaisesRegex(
+                ValueError, r'expecting one of \[indexed, bucketed\] for engine param'):
+            self.getImpl().binned_contigs_to_file(self.getContext(), invalidate_input_params)
+
+        invalidate_input_params = {
+            'input_ref': 'input_ref',
+            'line_width': -60
+        }
+        with self.assertRaisesRegex(
+                ValueError, 'expecting a non-negative integer for line_width param'):
+            self.getImpl().binned_contigs_to_file(self.getContext(), invalidate_input_params)
+
+        invalidate_input_params = {
+            'input_ref': 'input_ref',
+            'compression': 'bzip2'
+        }
+        with self.assertRaisesRegex(
+                ValueError, r'expecting one of \[deflated, stored, bgzf\] for compression param'):
+            self.getImpl().binned_contigs_to_file(self.getContext(), invalidate_input_params)
+
+        invalidate_input_params = {
+            'input_ref': 'input_ref',
+            'output_layout': 'concatenated',
+            'engine': 'bucketed'
+        }
+        with self.assertRaisesRegex(
+                ValueError, 'bucketed engine writes bins side by side and cannot concatenate'):
+            self.getImpl().binned_contigs_to_file(self.getContext(), invalidate_input_params)
+
+        invalidate_input_params = {
+            'input_ref': 'input_ref',
+            'keep_bin_files': 0,
+            'engine': 'bucketed'
+        }
+        with self.assertRaisesRegex(
+                ValueError, 'bucketed engine writes bins side by side'):
+            self.getImpl().binned_contigs_to_file(self.getContext(), invalidate_input_params)
+
     def test_bad_export_binned_contigs_as_excel_params(self):
         invalidate_input_params = {
             'missing_input_ref': 'input_ref'
@@ -363,6 +437,44 @@ class MetagenomeUtilsTest(unittest.TestCase):
             self.getImpl().import_excel_as_binned_contigs(self.getContext(),
                                                           invalidate_input_params)
 
+        invalidate_input_params = {
+            'shock_id': 'shock_id',
+            'workspace_name': 'workspace_name',
+            'parallelism': 0
+        }
+        with self.assertRaisesRegex(
+                ValueError, 'expecting a positive integer for parallelism param'):
+            self.getImpl().import_excel_as_binned_contigs(self.getContext(),
+                                                          invalidate_input_params)
+
+    def test_bad_export_binned_contigs_as_table_params(self):
+        invalidate_input_params = {
+            'missing_input_ref': 'input_ref'
+        }
+        with self.assertRaisesRegex(
+                ValueError, '"input_ref" parameter is required, but missing'):
+            self.getImpl().export_binned_contigs_as_table(self.getContext(),
+                                                          invalidate_input_params)
+
+        invalidate_input_params = {
+            'input_ref': 'input_ref',
+            'table_format': 'xlsx'
+        }
+        with self.assertRaisesRegex(
+                ValueError, r'expecting one of \[tsv, csv\] for table_format param'):
+            self.getImpl().export_binned_contigs_as_table(self.getContext(),
+                                                          invalidate_input_params)
+
+    def test_bad_import_table_as_binned_contigs_params(self):
+        invalidate_input_params = {
+            'missing_shock_id': 'shock_id',
+            'workspace_name': 'workspace_name'
+        }
+        with self.assertRaisesRegex(
+                ValueError, '"shock_id" parameter is required, but missing'):
+            self.getImpl().import_table_as_binned_contigs(self.getContext(),
+                                                          invalidate_input_params)
+
     def test_bad_file_to_binned_contigs_params(self):
         invalidate_input_params = {
             'missing_assembly_ref': 'assembly_ref',
@@ -408,6 +520,17 @@ class MetagenomeUtilsTest(unittest.TestCase):
                 ValueError, '"workspace_name" parameter is required, but missing'):
             self.getImpl().file_to_binned_contigs(self.getContext(), invalidate_input_params)
 
+        invalidate_input_params = {
+            'assembly_ref': 'assembly_ref',
+            'file_directory': 'file_directory',
+            'binned_contig_name': 'binned_contig_name',
+            'workspace_name': 'workspace_name',
+            'parallelism': 0
+        }
+        with self.assertRaisesRegex(
+                ValueError, 'expecting a positive integer for parallelism param'):
+            self.getImpl().file_to_binned_contigs(self.getContext(), invalidate_input_params)
+
     def test_MetagenomeFileUtils_get_bin_ids(self):
 
         file_directory = self.test_directory_path
@@ -442,17 +565,38 @@ class MetagenomeUtilsTest(unittest.TestCase):
         self.assertEqual(sum_contig_len, 2674902)
         self.assertEqual(cov, 1)
 
+    def test_MetagenomeFileUtil_build_summary_index(self):
+
+        summary_index = self.binned_contig_builder._build_summary_index(
+            self.test_directory_path)
+
+        expect_bin_ids_set = {'out_header.001.fasta', 'out_header.002.fasta',
+                              'out_header.003.fasta'}
+        self.assertEqual(set(summary_index.keys()), expect_bin_ids_set)
+        self.assertEqual(summary_index.get('out_header.003.fasta'),
+                         (0.548, 2452188, 0.925, None))
+
+        total_contig_len = self.binned_contig_builder._get_total_contig_len(
+            self.test_directory_path, summary_index)
+        self.assertEqual(total_contig_len, 8397583)
+
+        # 5-column layout carries Abundance
+        lines = ['Bin name\tAbundance\tCompleteness\tGenome size\tGC content\n',
+                 'maxbin_output.001.fasta\t0.00\t97.2%\t2690533\t52.9\n']
+        summary_index = self.binned_contig_builder._parse_summary_lines(lines)
+        self.assertEqual(summary_index.get('maxbin_output.001.fasta'),
+                         (0.529, 2690533, 0.972, 0.0))
+
     def test_MetagenomeFileUtil_generate_contigs(self):
 
         ws_large_data = WsLargeDataIO(self.callback_url, service_ver="beta")
         res = ws_large_data.get_objects({'objects': [{"ref": self.assembly_ref}]})['data'][0]
-        data = json.load(open(res['data_json_file']))
-        assembly_contigs = data.get('contigs')
+        assembly_contigs = load_assembly_contig_stats(res['data_json_file'])
         # testing contigs can be found in assembly object
         contigs = self.binned_contig_builder._generate_contigs(
             self.assembly_filename,
             os.path.dirname(self.assembly_fasta_file_path),
-            assembly_contigs)
+            assembly_contigs).to_dict()
 
         self.assertEqual(len(contigs), 8)
 
@@ -479,7 +623,7 @@ class MetagenomeUtilsTest(unittest.TestCase):
         contigs = self.binned_contig_builder._generate_contigs(
             'fake_' + assembly_filename,
             os.path.dirname(assembly_fasta_file_path),
-            assembly_contigs)
+            assembly_contigs).to_dict()
 
         self.assertEqual(len(contigs), 9)
 
@@ -493,14 +637,139 @@ class MetagenomeUtilsTest(unittest.TestCase):
         expect_dic = {'gc': 0.5, 'len': 24}
         self.assertDictEqual(contigs.get('test_contig_id'), expect_dic)
 
+    def test_FastaUtils_scan_fasta_stats(self):
+
+        contig_stats = list(scan_fasta_stats(self.assembly_fasta_file_path))
+
+        expect_contig_stats = []
+        for record in SeqIO.parse(self.assembly_fasta_file_path, "fasta"):
+            sequence = str(record.seq).upper()
+            expect_contig_stats.append((record.id, len(sequence),
+                                        sequence.count('G') + sequence.count('C')))
+
+        self.assertEqual(contig_stats, expect_contig_stats)
+
+        # lowercase, N bases, CRLF line endings and empty records
+        fasta_file_path = os.path.join(self.scratch, 'scan_fasta_stats.fasta')
+        with open(fasta_file_path, 'w') as file:
+            file.write('>contig_1 description\nACgt\r\nNNnn\n>contig_2\n>contig_3\nGGGG')
+
+        self.assertEqual(list(scan_fasta_stats(fasta_file_path)),
+                         [('contig_1', 8, 2), ('contig_2', 0, 0), ('contig_3', 4, 4)])
+
+        for block_size in [1, 5, 1024]:
+            with open(fasta_file_path, 'rb') as fasta_file:
+                self.assertEqual(list(scan_fasta_stream(fasta_file, block_size)),
+                                 [('contig_1', 8, 2), ('contig_2', 0, 0), ('contig_3', 4, 4)])
+
+        # an unwrapped sequence and a header spanning many blocks
+        with open(fasta_file_path, 'w') as file:
+            file.write('>contig_1\n' + 'ACGT' * 100000 + '\n>contig_2 ' + 'd' * 100 + '\nGG\n')
+        with open(fasta_file_path, 'rb') as fasta_file:
+            self.assertEqual(list(scan_fasta_stream(fasta_file, 7)),
+                             [('contig_1', 400000, 200000), ('contig_2', 2, 2)])
+
+    def test_FastaUtils_scan_fasta_stats_parallel(self):
+        fasta_file_path = os.path.join(self.scratch, 'scan_fasta_stats_parallel.fasta')
+        with open(self.assembly_fasta_file_path, 'rb') as assembly_file:
+            assembly = assembly_file.read()
+        with open(fasta_file_path, 'wb') as fasta_file:
+            for copy in range(4):
+                fasta_file.write(assembly.replace(b'>', b'>copy_%d_' % copy).lower())
+
+        expect_contig_stats = []
+        for record in SeqIO.parse(fasta_file_path, "fasta"):
+            sequence = str(record.seq).upper()
+            expect_contig_stats.append((record.id, len(sequence),
+                                        sequence.count('G') + sequence.count('C')))
+
+        # small files are scanned by a single process whatever the parallelism
+        self.assertEqual(list(scan_fasta_stats(fasta_file_path, 4)), expect_contig_stats)
+
+        # the record ranges handed to worker processes cover every record once, in order
+        file_ranges = _split_records(fasta_file_path, 4)
+        self.assertEqual(len(file_ranges), 4)
+        self.assertEqual([contig_stats for start, end in file_ranges
+                          for contig_stats in _scan_file_range(fasta_file_path, start, end)],
+                         expect_contig_stats)
+
+    def test_ArchiveUtils_pack_files_parallel(self):
+        pack_directory = os.path.join(self.scratch, 'test_pack_files_parallel')
+        os.makedirs(pack_directory)
+        with open(self.assembly_fasta_file_path, 'rb') as assembly_file:
+            assembly = assembly_file.read()
+        file_paths = []
+        # a few BGZF blocks per file
+        for index in range(4):
+            file_paths.append(os.path.join(pack_directory, f'bin.{index:03d}.fasta'))
+            with open(file_paths[-1], 'wb') as bin_file:
+                while bin_file.tell() < 200 * 1024:
+                    bin_file.write(assembly)
+
+        for layout, parallelism in [('deflated', 4), ('bgzf', 4)]:
+            zip_path = os.path.join(pack_directory, f'{layout}_{parallelism}.zip')
+            pack_files(zip_path, file_paths, layout, max_workers=parallelism)
+
+            with zipfile.ZipFile(zip_path) as zip_file:
+                self.assertIsNone(zip_file.testzip())
+                for file_path in file_paths:
+                    member_name = os.path.basename(file_path)
+                    if layout == 'bgzf':
+                        data = gzip.decompress(zip_file.read(member_name + '.gz'))
+                    else:
+                        data = zip_file.read(member_name)
+                    with open(file_path, 'rb') as bin_file:
+                        self.assertEqual(data, bin_file.read())
+
+        self.assertCountEqual(os.listdir(pack_directory),
+                              [os.path.basename(file_path) for file_path in file_paths] +
+                              ['deflated_4.zip', 'bgzf_4.zip'])
+
+    def test_AssemblyStatsUtils_load_assembly_contig_stats(self):
+
+        ws_large_data = WsLargeDataIO(self.callback_url, service_ver="beta")
+        res = ws_large_data.get_objects({'objects': [{"ref": self.assembly_ref}]})['data'][0]
+        with open(res['data_json_file']) as json_file:
+            expect_contigs = json.load(json_file).get('contigs')
+
+        assembly_contigs = load_assembly_contig_stats(res['data_json_file'])
+
+        self.assertEqual(len(assembly_contigs), len(expect_contigs))
+        for contig_id, contig in expect_contigs.items():
+            self.assertEqual(assembly_contigs.get(contig_id),
+                             (contig.get('length'), contig.get('gc_content')))
+
+        # streaming through a generated assembly object, the multi-million contig memory
+        # check is the opt-in bench_load_assembly_contig_stats.py
+        num_contigs = 1000
+        json_file_path = os.path.join(self.scratch, 'large_assembly_object.json')
+        with open(json_file_path, 'w') as json_file:
+            json_file.write('{"assembly_id": "large_assembly", "contigs": {')
+            for i in range(num_contigs):
+                if i:
+                    json_file.write(', ')
+                contig_id = f'NODE_{i}'
+                json_file.write(json.dumps(contig_id) + ': ' +
+                                json.dumps({'contig_id': contig_id,
+                                            'length': i + 100,
+                                            'gc_content': round((i % 1000) / 1000, 3),
+                                            'md5': '0123456789abcdef0123456789abcdef'}))
+            json_file.write('}, "dna_size": 0, "num_contigs": %d}' % num_contigs)
+
+        assembly_contigs = load_assembly_contig_stats(json_file_path)
+
+        self.assertEqual(len(assembly_contigs), num_contigs)
+        self.assertEqual(assembly_contigs.get('NODE_0'), (100, 0.0))
+        self.assertEqual(assembly_contigs.get('NODE_999'), (1099, 0.999))
+        self.assertIsNone(assembly_contigs.get('fake_id'))
+
     def test_MetagenomeFileUtil_generate_contig_bin(self):
         bin_id = 'out_header.003.fasta'
         file_directory = self.test_directory_path
 
         ws_large_data = WsLargeDataIO(self.callback_url, service_ver="beta")
         res = ws_large_data.get_objects({'objects': [{"ref": self.large_assembly_ref}]})['data'][0]
-        data = json.load(open(res['data_json_file']))
-        assembly_contigs = data.get('contigs')
+        assembly_contigs = load_assembly_contig_stats(res['data_json_file'])
 
         contig_bin = self.binned_contig_builder._generate_contig_bin(bin_id,
                                                                      file_directory,
@@ -514,6 +783,55 @@ class MetagenomeUtilsTest(unittest.TestCase):
         self.assertEqual(contig_bin.get('cov'), 0.925)
         self.assertEqual(contig_bin.get('n_contigs'), 472)
 
+    def test_MetagenomeFileUtil_generate_contig_bins_parallel(self):
+        file_directory = self.test_directory_path
+        bin_ids = self.binned_contig_builder._get_bin_ids(file_directory)
+        summary_index = self.binned_contig_builder._build_summary_index(file_directory)
+
+        serial_bins = self.binned_contig_builder._generate_contig_bins(
+            bin_ids, file_directory, {}, summary_index, 1)
+        parallel_bins = self.binned_contig_builder._generate_contig_bins(
+            bin_ids, file_directory, {}, summary_index, 3)
+
+        self.assertEqual([contig_bin.get('bid') for contig_bin in parallel_bins], bin_ids)
+        self.assertEqual(json.dumps(bins_to_workspace(parallel_bins)),
+                         json.dumps(bins_to_workspace(serial_bins)))
+
+    def test_MetagenomeFileUtil_generate_contig_bins_compressed(self):
+        file_directory = self.test_directory_path
+        bin_ids = sorted(self.binned_contig_builder._get_bin_ids(file_directory))
+        summary_index = self.binned_contig_builder._build_summary_index(file_directory)
+        expect_bins = self.binned_contig_builder._generate_contig_bins(
+            bin_ids, file_directory, {}, summary_index, 1)
+
+        # gzip compressed bin files
+        gzip_directory = os.path.join(self.scratch, 'test_compressed_bins_gzip')
+        os.makedirs(gzip_directory)
+        shutil.copy(os.path.join(file_directory, 'out_header.summary'), gzip_directory)
+        for bin_id in bin_ids:
+            with open(os.path.join(file_directory, bin_id), 'rb') as bin_file:
+                with gzip.open(os.path.join(gzip_directory, bin_id + '.gz'), 'wb') as gz_file:
+                    shutil.copyfileobj(bin_file, gz_file)
+
+        # tar.gz archive of bin files and summary
+        tar_directory = os.path.join(self.scratch, 'test_compressed_bins_tar')
+        os.makedirs(tar_directory)
+        with tarfile.open(os.path.join(tar_directory, 'bins.tar.gz'), 'w:gz') as tar:
+            for item in bin_ids + ['out_header.summary']:
+                tar.add(os.path.join(file_directory, item), arcname=item)
+
+        for compressed_directory in [gzip_directory, tar_directory]:
+            bin_sources = self.binned_contig_builder._get_bin_sources(compressed_directory)
+            self.assertCountEqual(list(bin_sources.keys()), bin_ids)
+            summary_index = self.binned_contig_builder._build_summary_index(
+                compressed_directory)
+            bins = self.binned_contig_builder._generate_contig_bins(
+                bin_ids, compressed_directory, {}, summary_index, 2, bin_sources)
+            self.assertEqual(json.dumps(bins_to_workspace(bins)),
+                             json.dumps(bins_to_workspace(expect_bins)))
+            # nothing extracted to scratch
+            self.assertFalse(set(os.listdir(compressed_directory)) & set(bin_ids))
+
     def test_MetagenomeFileUtil_get_contig_file(self):
         contig_file = self.binned_contig_builder._get_contig_file(self.assembly_ref)
 
@@ -525,13 +843,13 @@ class MetagenomeUtilsTest(unittest.TestCase):
 
         self.assertCountEqual(contig_file_content, expect_contig_file_content)
 
-    def test_MetagenomeFileUtil_get_contig_string(self):
+    def test_MetagenomeFileUtil_get_contig_record(self):
         target_contig_id = 'NODE_1_length_28553_cov_19.031240'
-        parsed_assembly = SeqIO.to_dict(SeqIO.parse(self.assembly_fasta_file_path, "fasta"))
-        contig_string = self.binned_contig_builder._get_contig_string(
+        fasta_index = FastaIndex(self.assembly_fasta_file_path)
+        contig_string = b''.join(self.binned_contig_builder._get_contig_record(
                                                                 target_contig_id,
                                                                 self.assembly_fasta_file_path,
-                                                                parsed_assembly)
+                                                                fasta_index)).decode()
 
         expect_contig_string = '>NODE_1_length_28553_cov_19.031240\n'
         expect_contig_string += 'TCGGCGTCACAAAACTCGGAATCGTCGGACAGGAACAGTTCGCTGACGGTAAGTTATAAGGG'
@@ -541,13 +859,14 @@ class MetagenomeUtilsTest(unittest.TestCase):
         self.assertEqual(contig_string, expect_contig_string)
 
         target_contig_id = 'NODE_9_length_4254_cov_19.036436'
-        contig_string = self.binned_contig_builder._get_contig_string(
+        contig_string = b''.join(self.binned_contig_builder._get_contig_record(
                                                                 target_contig_id,
                                                                 self.assembly_fasta_file_path,
-                                                                parsed_assembly)
+                                                                fasta_index,
+                                                                line_width=60)).decode()
 
         expect_contig_string = '>NODE_9_length_4254_cov_19.036436\n'
-        expect_contig_string += 'ACAAAGTACAACCCTCACGTGCCACTCTCAGGGCTTAACTGACGACACGCCGTAATAGTA'
+        expect_contig_string += 'ACAAAGTACAACCCTCACGTGCCACTCTCAGGGCTTAACTGACGACACGCCGTAATAGTA\n'
         expect_contig_string += 'TTTATTGGTTCACAGAAGGGTTGTACATCGGGTTAGATTATGAAAAAG\n'
 
         self.assertEqual(contig_string, expect_contig_string)
@@ -557,9 +876,61 @@ class MetagenomeUtilsTest(unittest.TestCase):
                 ValueError,
                 'Cannot find contig \[fake_id\] from file \[{}\].'.format(
                     self.assembly_fasta_file_path)):
-            self.binned_contig_builder._get_contig_string(target_contig_id,
+            self.binned_contig_builder._get_contig_record(target_contig_id,
                                                           self.assembly_fasta_file_path,
-                                                          parsed_assembly)
+                                                          fasta_index)
+        fasta_index.close()
+
+    def test_FastaUtils_fasta_index(self):
+        # wrapped, unwrapped, CRLF, lowercase, irregular line lengths and empty records
+        fasta_file_path = os.path.join(self.scratch, 'fasta_index.fasta')
+        with open(fasta_file_path, 'w') as file:
+            file.write('>contig_1 description\nACGTA\nCGTAC\nGT\n'
+                       '>contig_2\r\nacgtn\r\nACG\r\n'
+                       '>contig_3\n>contig_4\nAC\nGTACGT\nA\n'
+                       '>contig_5\nGGGGCCCCAAAA')
+
+        index_path = build_fasta_index(fasta_file_path)
+        with open(index_path) as index_file:
+            self.assertEqual(index_file.readline(), 'contig_1\t12\t22\t5\t6\n')
+
+        with FastaIndex(fasta_file_path) as fasta_index:
+            for record in SeqIO.parse(fasta_file_path, "fasta"):
+                self.assertEqual(fasta_index.fetch(record.id).decode(), str(record.seq))
+            self.assertIsNone(fasta_index.fetch('fake_id'))
+
+        with FastaIndex(fasta_file_path, {'contig_4'}) as fasta_index:
+            self.assertIn('contig_4', fasta_index)
+            self.assertNotIn('contig_1', fasta_index)
+            self.assertEqual(fasta_index.fetch('contig_4'), b'ACGTACGTA')
+
+        with FastaIndex(fasta_file_path) as fasta_index:
+            self.assertEqual(fasta_index.fetch('contig_2', upper=True), b'ACGTNACG')
+            record = fasta_record_chunks('contig_2', fasta_index.fetch('contig_2'), 3)
+            self.assertEqual(b''.join(record), b'>contig_2\nacg\ntnA\nCG\n')
+
+    def test_MetagenomeFileUtil_write_bin_files_indexed_parallel(self):
+        contig_ids = [record.id for record in SeqIO.parse(self.assembly_fasta_file_path,
+                                                          "fasta")]
+        # many small bins sharing contigs
+        bins = [{'bid': f'bin.{index:03d}.fasta', 'contigs': contig_ids[index % 3::3]}
+                for index in range(60)]
+
+        bin_files = {}
+        for parallelism in [1, 8]:
+            result_directory = os.path.join(self.scratch,
+                                            f'test_write_bin_files_indexed_{parallelism}')
+            os.makedirs(result_directory)
+            result_files = self.binned_contig_builder._write_bin_files_indexed(
+                bins, self.assembly_fasta_file_path, result_directory, parallelism=parallelism)
+
+            self.assertEqual(result_files, [os.path.join(result_directory, bin['bid'])
+                                            for bin in bins])
+            for result_file in result_files:
+                with open(result_file) as file:
+                    bin_files.setdefault(os.path.basename(result_file), set()).add(file.read())
+
+        self.assertTrue(all(len(contents) == 1 for contents in bin_files.values()))
 
     def test_MetagenomeFileUtil_pack_file_to_shock(self):
         result_files = [self.assembly_fasta_file_path, self.assembly_fasta_file_path]
@@ -630,7 +1001,9 @@ class MetagenomeUtilsTest(unittest.TestCase):
         bin_objects_to_merge.append(bin_object_1_to_merge)
         bin_objects_to_merge.append(bin_object_2_to_merge)
 
-        new_contig_bin = self.binned_contig_builder._merge_bins(new_bin_id, bin_objects_to_merge)
+        new_contig_bin = self.binned_contig_builder._merge_bins(
+            new_bin_id, bins_from_workspace(bin_objects_to_merge))
+        new_contig_bin = bins_to_workspace([new_contig_bin])[0]
 
         expect_new_contig_bin = {
             'bid': new_bin_id,
@@ -656,6 +1029,31 @@ class MetagenomeUtilsTest(unittest.TestCase):
 
         self.assertDictEqual(expect_new_contig_bin, new_contig_bin)
 
+    def test_MetagenomeFileUtil_merge_overlapping_bins(self):
+        bin_objects_to_merge = [
+            {'bid': 'Bin_1', 'contigs': {'contig_1': {'gc': 0.5, 'len': 10},
+                                         'contig_2': {'gc': 0.5, 'len': 2}},
+             'n_contigs': 2, 'gc': 0.5, 'sum_contig_len': 12, 'cov': 0.8},
+            {'bid': 'Bin_2', 'contigs': {'contig_2': {'gc': 0.5, 'len': 2},
+                                         'contig_3': {'gc': 0.5, 'len': 6}},
+             'n_contigs': 2, 'gc': 0.5, 'sum_contig_len': 8, 'cov': 0.5}
+        ]
+
+        new_contig_bin = self.binned_contig_builder._merge_bins(
+            'MyNewBin_ID', bins_from_workspace(bin_objects_to_merge))
+
+        self.assertEqual(new_contig_bin['n_contigs'], 3)
+        self.assertEqual(list(new_contig_bin['contigs']), ['contig_1', 'contig_2', 'contig_3'])
+
+        # every contig is serialized once, as a valid map
+        json_file_path = os.path.join(self.scratch, 'merge_overlapping_bins.json')
+        write_binned_contigs_json({'bins': [new_contig_bin]}, json_file_path)
+        with open(json_file_path) as json_file:
+            binned_contigs = json.load(json_file, object_pairs_hook=list)
+        contig_pairs = dict(dict(binned_contigs)['bins'][0])['contigs']
+        self.assertEqual([contig_id for contig_id, contig in contig_pairs],
+                         ['contig_1', 'contig_2', 'contig_3'])
+
     def test_file_to_binned_contigs(self):
 
         binned_contig_name = 'MyBinnedContig'
@@ -690,6 +1088,484 @@ class MetagenomeUtilsTest(unittest.TestCase):
         expect_bin_keys = ['contigs', 'bid', 'gc', 'sum_contig_len', 'cov', 'n_contigs']
         self.assertCountEqual(list(binned_contig_data.get('bins')[0].keys()), expect_bin_keys)
 
+    def test_file_to_binned_contigs_from_contig_bin_table(self):
+
+        # DAS Tool style contig2bin table built from the MaxBin bin files
+        contig_bin_file = os.path.join(self.scratch, 'contig2bin.tsv')
+        with open(contig_bin_file, 'w') as table_file:
+            table_file.write('contig_id\tbin_id\n')
+            for bin_id in ['out_header.001.fasta', 'out_header.002.fasta',
+                           'out_header.003.fasta']:
+                for record in SeqIO.parse(os.path.join(self.test_directory_path, bin_id),
+                                          "fasta"):
+                    table_file.write(f'{record.id}\t{bin_id}\n')
+
+        binned_contig_name = 'MyBinnedContigFromTable'
+        params = {
+            'assembly_ref': self.large_assembly_ref,
+            'contig_bin_file': contig_bin_file,
+            'binned_contig_name': binned_contig_name,
+            'workspace_name': self.getWsName()
+        }
+
+        resultVal = self.getImpl().file_to_binned_contigs(self.getContext(), params)[0]
+        self.assertTrue('binned_contig_obj_ref' in resultVal)
+
+        binned_contig_data = self.dfu.get_objects(
+            {'object_refs': [resultVal['binned_contig_obj_ref']]})['data'][0]['data']
+
+        bins = binned_contig_data.get('bins')
+        self.assertEqual([contig_bin.get('bid') for contig_bin in bins],
+                         ['out_header.001.fasta', 'out_header.002.fasta',
+                          'out_header.003.fasta'])
+        self.assertEqual([contig_bin.get('n_contigs') for contig_bin in bins], [81, 369, 472])
+        self.assertEqual(binned_contig_data.get('total_contig_len'),
+                         sum(contig_bin.get('sum_contig_len') for contig_bin in bins))
+
+        # contigs missing from the assembly
+        with open(contig_bin_file, 'a') as table_file:
+            table_file.write('fake_contig_id\tout_header.001.fasta\n')
+        with self.assertRaisesRegex(ValueError, r'Cannot find 1 contig\(s\) from assembly'):
+            self.getImpl().file_to_binned_contigs(self.getContext(), params)
+
+    def test_BinnedContigUtils_contig_table(self):
+        bins = []
+        for bin_index in range(10):
+            contigs = {}
+            for contig_index in range(30000):
+                contig_id = f'NODE_{bin_index}{contig_index}_length_{contig_index}_cov_18.663614'
+                contigs[contig_id] = {'gc': 0.5 + contig_index % 7 / 100, 'len': contig_index}
+                if contig_index % 2:
+                    contigs[contig_id]['cov'] = 19.031
+            bins.append({'bid': f'out_header.{bin_index:03d}.fasta', 'contigs': contigs,
+                         'n_contigs': len(contigs), 'gc': 0.5, 'sum_contig_len': 1,
+                         'cov': 0.9})
+        binned_contigs = {'assembly_ref': self.assembly_ref, 'bins': bins,
+                          'total_contig_len': 10}
+        json_file_path = os.path.join(self.scratch, 'test_contig_table.json')
+        with open(json_file_path, 'w') as json_file:
+            json.dump(binned_contigs, json_file)
+        del bins, binned_contigs
+
+        tracemalloc.start()
+        with open(json_file_path) as json_file:
+            expect_binned_contigs = json.load(json_file)
+        dict_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        binned_contigs = load_binned_contigs(json_file_path)
+        table_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        self.assertIsInstance(binned_contigs['bins'][0]['contigs'], ContigTable)
+        self.assertGreater(dict_size / table_size, 5)
+
+        self.assertEqual(json.dumps(bins_to_workspace(binned_contigs['bins'])),
+                         json.dumps(expect_binned_contigs['bins']))
+
+        write_binned_contigs_json(binned_contigs, json_file_path)
+        with open(json_file_path) as json_file:
+            self.assertEqual(json.load(json_file), expect_binned_contigs)
+
+    def test_MetagenomeFileUtil_excel_sheet_layouts(self):
+        contigs = ContigTable()
+        for contig_index in range(100000):
+            contigs.add(f'NODE_{contig_index}_length_{contig_index}_cov_18.663614',
+                        contig_index + 1, 0.5, 19.031 if contig_index % 2 else None)
+        contig_bin = {'bid': 'out_header.001.fasta', 'contigs': contigs, 'cov': 0.9}
+
+        # rows are flushed as they are written, far more contigs than Excel has columns
+        excel_file_path = os.path.join(self.scratch, 'test_excel_sheet_layouts.xlsx')
+        tracemalloc.start()
+        workbook = xlsxwriter.Workbook(excel_file_path, {'constant_memory': True})
+        self.binned_contig_builder._write_binned_contig_sheet(
+            workbook, contig_bin, self.assembly_ref, workbook.add_format({'bold': True}))
+        workbook.close()
+        peak_size = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertLess(peak_size, 4 * 1024 * 1024)
+
+        assembly_ref, bins, total_contig_len = \
+            self.binned_contig_builder._process_binned_contig_excel(excel_file_path)
+        self.assertEqual(assembly_ref, self.assembly_ref)
+        self.assertEqual(json.dumps(bins_to_workspace(bins)[0]['contigs']),
+                         json.dumps(contigs.to_dict()))
+
+        # legacy layout with one column per contig
+        excel_file_path = os.path.join(self.scratch, 'test_excel_sheet_legacy_layout.xlsx')
+        workbook = xlsxwriter.Workbook(excel_file_path)
+        worksheet = workbook.add_worksheet('out_header.002.fasta')
+        worksheet.write_column(0, 0, ['bin_id', 'total_coverage', 'assembly_ref'])
+        worksheet.write_column(0, 1, ['out_header.002.fasta', 0.9, self.assembly_ref])
+        worksheet.write_column(4, 0, ['contigs', 'contig_id', 'gc', 'len', 'contig_coverage'])
+        worksheet.write_column(5, 1, ['NODE_1', 0.5, 10, 'NULL'])
+        worksheet.write_column(5, 2, ['NODE_2', 0.25, 30, 19.031])
+        workbook.close()
+
+        assembly_ref, bins, total_contig_len = \
+            self.binned_contig_builder._process_binned_contig_excel(excel_file_path)
+        self.assertEqual(assembly_ref, self.assembly_ref)
+        self.assertEqual(total_contig_len, 40)
+        self.assertEqual(bins[0]['contigs'].to_dict(),
+                         {'NODE_1': {'gc': 0.5, 'len': 10},
+                          'NODE_2': {'gc': 0.25, 'len': 30, 'cov': 19.031}})
+
+    def test_MetagenomeFileUtil_binned_contig_table(self):
+        contig_bins = []
+        for bin_index in range(3):
+            contigs = ContigTable()
+            for contig_index in range(100):
+                contigs.add(f'NODE_{bin_index}_{contig_index}_cov_18.663614', contig_index + 1,
+                            0.51234, 19.031 if contig_index % 2 else None)
+            contig_bins.append({'bid': f'out_header.{bin_index:03}.fasta', 'contigs': contigs,
+                                'cov': 0.9 if bin_index else None})
+        # a bin without contigs, followed by one more bin
+        contig_bins.append({'bid': 'out_header.empty.fasta', 'contigs': ContigTable(),
+                            'cov': None})
+        contigs = ContigTable()
+        contigs.add('NODE_a,"b"', 10, 0.25, 1.5)
+        contig_bins.append({'bid': 'out_header, odd.fasta', 'contigs': contigs, 'cov': 0.5})
+        binned_contigs = {'assembly_ref': self.assembly_ref, 'bins': contig_bins}
+
+        for table_format, delimiter in (('tsv', '\t'), ('csv', ',')):
+            table_file_path = os.path.join(self.scratch,
+                                           f'test_binned_contig_table.{table_format}')
+            with open(table_file_path, 'w', newline='') as table_file:
+                write_binned_contigs_table(binned_contigs, table_file, delimiter=delimiter)
+            assembly_ref, bins, total_contig_len = \
+                self.binned_contig_builder._process_binned_contig_table(table_file_path)
+
+            self.assertEqual(assembly_ref, self.assembly_ref)
+            self.assertEqual(total_contig_len, 3 * 100 * 101 // 2 + 10)
+            self.assertEqual([contig_bin['bid'] for contig_bin in bins],
+                             [contig_bin['bid'] for contig_bin in contig_bins])
+            self.assertEqual([contig_bin['cov'] for contig_bin in bins],
+                             [contig_bin['cov'] for contig_bin in contig_bins])
+            for contig_bin, expected_bin in zip(bins, contig_bins):
+                self.assertEqual(list(contig_bin['contigs'].rows()),
+                                 list(expected_bin['contigs'].rows()))
+            empty_bin = bins[3]
+            self.assertEqual((empty_bin['n_contigs'], empty_bin['sum_contig_len'],
+                              empty_bin['gc']), (0, 0, 0))
+
+        with open(table_file_path, 'w') as table_file:
+            table_file.write('#assembly_ref,1/2/3\n#bin,bin_1,\n')
+            table_file.write('bin_id,contig_id,gc,len,cov\nbin_1,NODE_1,0.5,10,\n')
+            table_file.write('bin_2,NODE_2,0.5,10,\n')
+        with self.assertRaisesRegex(ValueError, r'Contigs of bin \[bin_2\] are not listed'):
+            self.binned_contig_builder._process_binned_contig_table(table_file_path)
+
+    def test_XlsxUtils_xlsx_reader(self):
+        # shared strings (the default xlsxwriter and Excel layout) and sparse cells
+        excel_file_path = os.path.join(self.scratch, 'test_xlsx_reader.xlsx')
+        workbook = xlsxwriter.Workbook(excel_file_path)
+        bold = workbook.add_format({'bold': True})
+        worksheet = workbook.add_worksheet('out_header.001.fasta')
+        worksheet.write_rich_string(0, 0, 'NODE', bold, '_1', '_a&b')
+        worksheet.write(0, 2, True)
+        worksheet.write_formula(1, 1, '=1+1', None, 2)
+        worksheet.write(2, 27, 1e-7)
+        worksheet.write_row(4, 0, ('NODE_2', 0.5, 10))
+        workbook.add_worksheet('out_header.002.fasta')
+        workbook.close()
+
+        with XlsxReader(excel_file_path) as xlsx_reader:
+            self.assertEqual(xlsx_reader.sheet_names,
+                             ['out_header.001.fasta', 'out_header.002.fasta'])
+            self.assertEqual(list(xlsx_reader.iter_rows('out_header.001.fasta')),
+                             [('NODE_1_a&b', None, True), (None, 2),
+                              (None,) * 27 + (1e-7,), ('NODE_2', 0.5, 10)])
+            self.assertEqual(list(xlsx_reader.iter_rows('out_header.002.fasta')), [])
+            with self.assertRaisesRegex(ValueError, 'Cannot find sheet \\[missing\\]'):
+                list(xlsx_reader.iter_rows('missing'))
+
+        with self.assertRaisesRegex(ValueError, 'Unexpected xlsx file'):
+            XlsxReader(self.assembly_fasta_file_path)
+
+        # exported bin sheets, read the same as openpyxl does
+        excel_file_path = os.path.join(self.scratch, 'test_xlsx_reader_bins.xlsx')
+        workbook = xlsxwriter.Workbook(excel_file_path)
+        bold = workbook.add_format({'bold': True})
+        for bin_index in range(5):
+            contigs = ContigTable()
+            for contig_index in range(100):
+                contigs.add(f'NODE_{bin_index}_{contig_index}_cov_18.663614', contig_index + 1,
+                            0.51234, 19.031 if contig_index % 2 else None)
+            contig_bin = {'bid': f'out_header.{bin_index:03}.fasta', 'contigs': contigs,
+                          'cov': 0.9}
+            self.binned_contig_builder._write_binned_contig_sheet(workbook, contig_bin,
+                                                                  self.assembly_ref, bold)
+        workbook.close()
+
+        assembly_ref, bins, total_contig_len = \
+            self.binned_contig_builder._process_binned_contig_excel(excel_file_path)
+        self.assertEqual(assembly_ref, self.assembly_ref)
+        self.assertEqual(len(bins), 5)
+        self.assertEqual(total_contig_len, 5 * 100 * 101 // 2)
+
+        workbook = load_workbook(filename=excel_file_path, read_only=True)
+        openpyxl_rows = [[row for row in workbook[sheet].iter_rows(values_only=True)
+                          if any(value is not None for value in row)]
+                         for sheet in workbook.sheetnames]
+        with XlsxReader(excel_file_path) as xlsx_reader:
+            self.assertEqual([[row + (None,) * (len(openpyxl_row) - len(row))
+                               for row, openpyxl_row in zip(xlsx_reader.iter_rows(sheet),
+                                                            sheet_rows)]
+                              for sheet, sheet_rows in zip(xlsx_reader.sheet_names,
+                                                           openpyxl_rows)],
+                             openpyxl_rows)
+
+    def test_MetagenomeFileUtil_process_binned_contig_excel_parallel(self):
+        excel_file_path = os.path.join(self.scratch, 'test_binned_contig_excel_parallel.xlsx')
+        workbook = xlsxwriter.Workbook(excel_file_path)
+        bold = workbook.add_format({'bold': True})
+        for bin_index in range(20):
+            contigs = ContigTable()
+            for contig_index in range(bin_index + 1):
+                contigs.add(f'NODE_{bin_index}_{contig_index}', contig_index + 1, 0.5, 19.031)
+            contig_bin = {'bid': f'out_header.{bin_index:03}.fasta', 'contigs': contigs,
+                          'cov': 0.9}
+            self.binned_contig_builder._write_binned_contig_sheet(workbook, contig_bin,
+                                                                  self.assembly_ref, bold)
+        workbook.close()
+
+        expected = self.binned_contig_builder._process_binned_contig_excel(excel_file_path)
+        assembly_ref, bins, total_contig_len = \
+            self.binned_contig_builder._process_binned_contig_excel(excel_file_path,
+                                                                    parallelism=3)
+        self.assertEqual(assembly_ref, self.assembly_ref)
+        self.assertEqual(total_contig_len, expected[2])
+        self.assertEqual(json.dumps(bins_to_workspace(bins)),
+                         json.dumps(bins_to_workspace(expected[1])))
+        self.assertEqual([contig_bin['bid'] for contig_bin in bins],
+                         [f'out_header.{bin_index:03}.fasta' for bin_index in range(20)])
+
+        # sheets are checked against each other once every worker is done
+        workbook = xlsxwriter.Workbook(excel_file_path)
+        bold = workbook.add_format({'bold': True})
+        for bin_index in range(4):
+            contigs = ContigTable()
+            contigs.add(f'NODE_{bin_index}', 10, 0.5)
+            contig_bin = {'bid': f'out_header.{bin_index:03}.fasta', 'contigs': contigs}
+            self.binned_contig_builder._write_binned_contig_sheet(
+                workbook, contig_bin, '1/2/3' if bin_index < 3 else '1/2/4', bold)
+        workbook.close()
+        with self.assertRaisesRegex(ValueError, 'Excel sheets have different assembly_ref'):
+            self.binned_contig_builder._process_binned_contig_excel(excel_file_path,
+                                                                    parallelism=2)
+
+    def test_MetagenomeFileUtil_check_bin_contigs(self):
+        assembly_contigs = ContigStatsTable()
+        for contig_index in range(2000):
+            assembly_contigs.add(f'NODE_{contig_index}_cov_18.663614', 100, 0.5)
+
+        contig_bins = []
+        for bin_index in range(10):
+            contigs = ContigTable()
+            for contig_index in range(bin_index * 100, (bin_index + 1) * 100):
+                contigs.add(f'NODE_{contig_index}_cov_18.663614', 100, 0.5)
+            contig_bins.append({'bid': f'out_header.{bin_index:03}.fasta', 'contigs': contigs})
+
+        unknown_contigs, duplicate_contigs = self.binned_contig_builder._check_bin_contigs(
+            contig_bins, assembly_contigs)
+        self.assertEqual(unknown_contigs, [])
+        self.assertEqual(duplicate_contigs, [])
+
+        contig_bins[3]['contigs'].add('NODE_unknown', 100, 0.5)
+        contig_bins[5]['contigs'].add('NODE_0_cov_18.663614', 100, 0.5)
+        contig_bins[7]['contigs'].add('NODE_700_cov_18.663614', 100, 0.5)
+        unknown_contigs, duplicate_contigs = self.binned_contig_builder._check_bin_contigs(
+            contig_bins, assembly_contigs)
+        self.assertEqual(unknown_contigs,
+                         [{'bid': 'out_header.003.fasta', 'contig_id': 'NODE_unknown'}])
+        self.assertCountEqual(duplicate_contigs,
+                              [{'contig_id': 'NODE_0_cov_18.663614',
+                                'bids': ['out_header.000.fasta', 'out_header.005.fasta']},
+                               {'contig_id': 'NODE_700_cov_18.663614',
+                                'bids': ['out_header.007.fasta', 'out_header.007.fasta']}])
+
+    def test_CacheUtils_lru_file_cache(self):
+        cache = LRUFileCache(os.path.join(self.scratch, 'test_lru_file_cache'), 100)
+
+        self.assertIsNone(cache.get_json('key_1'))
+        cache.put_json('key_1', ['a' * 40])
+        self.assertEqual(cache.get_json('key_1'), ['a' * 40])
+
+        time.sleep(0.1)
+        cache.put_json('key_2', ['b' * 40])
+        time.sleep(0.1)
+        # refresh key_1 so key_2 becomes the least recently used entry
+        cache.get_json('key_1')
+        time.sleep(0.1)
+        cache.put_json('key_3', ['c' * 40])
+
+        self.assertIsNone(cache.get_json('key_2'))
+        self.assertEqual(cache.get_json('key_1'), ['a' * 40])
+        self.assertEqual(cache.get_json('key_3'), ['c' * 40])
+
+    def test_CacheUtils_fetch_file(self):
+        cache = LRUFileCache(os.path.join(self.scratch, 'test_fetch_file_cache'), 100)
+        fills = []
+
+        def fill(content):
+            def fill_file(file_path):
+                fills.append(content)
+                with open(file_path, 'w') as file:
+                    file.write(content)
+            return fill_file
+
+        with cache.fetch_file('key_1', '.txt', fill('a' * 60)) as file_path:
+            with open(file_path) as file:
+                self.assertEqual(file.read(), 'a' * 60)
+            # key_1 is in use, so adding key_2 over the budget cannot evict it
+            time.sleep(0.1)
+            with cache.fetch_file('key_2', '.txt', fill('b' * 60)):
+                pass
+            self.assertTrue(os.path.exists(file_path))
+
+        with cache.fetch_file('key_1', '.txt', fill('a' * 60)) as file_path:
+            self.assertTrue(os.path.exists(file_path))
+        self.assertEqual(fills, ['a' * 60, 'b' * 60])
+
+        # nothing in use: key_2 is now the least recently used entry
+        with cache.fetch_file('key_3', '.txt', fill('c' * 60)):
+            pass
+        self.assertFalse(os.path.exists(os.path.join(cache.cache_dir, 'key_2.txt')))
+
+        # concurrent fetches of a missing key wait for a single fill
+        def slow_fill(file_path):
+            time.sleep(0.2)
+            fill('d' * 10)(file_path)
+
+        def fetch_key_4(_):
+            with cache.fetch_file('key_4', '.txt', slow_fill) as file_path:
+                with open(file_path) as file:
+                    return file.read()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(list(executor.map(fetch_key_4, range(4))), ['d' * 10] * 4)
+        self.assertEqual(fills.count('d' * 10), 1)
+
+        # per key lock files do not pile up once fetches are done
+        self.assertEqual([file_name for file_name in os.listdir(cache.cache_dir)
+                          if file_name.endswith('.lock') and file_name != '.lock'], [])
+
+    def test_file_to_binned_contigs_cache(self):
+        params = {
+            'assembly_ref': self.large_assembly_ref,
+            'file_directory': self.test_directory_path,
+            'binned_contig_name': 'MyBinnedContigCached',
+            'workspace_name': self.getWsName()
+        }
+
+        bin_fingerprints = self.binned_contig_builder._get_bin_fingerprints(
+            self.test_directory_path,
+            self.binned_contig_builder._get_bin_sources(self.test_directory_path))
+        summary_index = self.binned_contig_builder._build_summary_index(self.test_directory_path)
+        cache_key = self.binned_contig_builder._get_binned_contig_cache_key(
+            self.large_assembly_ref, bin_fingerprints, summary_index, None)
+        self.assertIsNotNone(cache_key)
+
+        first_ref = self.getImpl().file_to_binned_contigs(
+            self.getContext(), params.copy())[0]['binned_contig_obj_ref']
+        cached_bins = self.binned_contig_builder.binned_contig_cache.get_json(cache_key)
+        self.assertIsNotNone(cached_bins)
+
+        second_ref = self.getImpl().file_to_binned_contigs(
+            self.getContext(), params.copy())[0]['binned_contig_obj_ref']
+
+        first_data, second_data = [obj['data'] for obj in self.dfu.get_objects(
+            {'object_refs': [first_ref, second_ref]})['data']]
+        self.assertEqual(json.dumps(first_data), json.dumps(second_data))
+        self.assertEqual(second_data.get('bins'), cached_bins.get('bins'))
+
+    def test_file_to_binned_contigs_cache_memory(self):
+        # bin files of its own, so the primed cache entry is not hit by other tests
+        file_directory = os.path.join(self.scratch, 'test_cache_memory_bins')
+        shutil.copytree(self.test_directory_path, file_directory)
+        with open(os.path.join(file_directory, 'out_header.001.fasta'), 'a') as bin_file:
+            bin_file.write('\n')
+
+        builder = self.binned_contig_builder
+        cache_key = builder._get_binned_contig_cache_key(
+            self.large_assembly_ref,
+            builder._get_bin_fingerprints(file_directory,
+                                          builder._get_bin_sources(file_directory)),
+            builder._build_summary_index(file_directory), None)
+
+        bins = []
+        for bin_index in range(10):
+            contigs = ContigTable()
+            for contig_index in range(30000):
+                contigs.add(f'NODE_{bin_index}{contig_index}_length_{contig_index}_cov_18.663614',
+                            contig_index + 1, 0.5, 19.031 if contig_index % 2 else None)
+            bins.append({'bid': f'out_header.{bin_index:03d}.fasta', 'contigs': contigs,
+                         'n_contigs': len(contigs), 'gc': 0.5, 'sum_contig_len': 1,
+                         'cov': 0.9})
+
+        tracemalloc.start()
+        builder._put_cached_bins(cache_key, bins, 10)
+        put_peak_size = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        workspace_bins = bins_to_workspace(bins)
+        dict_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del bins, workspace_bins
+
+        params = {
+            'assembly_ref': self.large_assembly_ref,
+            'file_directory': file_directory,
+            'binned_contig_name': 'MyBinnedContigCacheMemory',
+            'workspace_name': self.getWsName()
+        }
+        tracemalloc.start()
+        binned_contig_obj_ref = self.getImpl().file_to_binned_contigs(
+            self.getContext(), params)[0]['binned_contig_obj_ref']
+        peak_size = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        # the cache entry is written and read back one contig at a time, never as dicts
+        self.assertLess(put_peak_size, dict_size / 10)
+        self.assertLess(peak_size, dict_size / 2)
+
+        obj_info = self.wsClient.get_object_info3(
+            {'objects': [{'ref': binned_contig_obj_ref}]})['infos'][0]
+        self.assertEqual(obj_info[1], 'MyBinnedContigCacheMemory')
+
+    def test_file_to_binned_contigs_previous_binned_contig_ref(self):
+        params = {
+            'assembly_ref': self.large_assembly_ref,
+            'file_directory': self.test_directory_path,
+            'binned_contig_name': 'MyBinnedContigPrevious',
+            'workspace_name': self.getWsName()
+        }
+        first_ref = self.getImpl().file_to_binned_contigs(
+            self.getContext(), params.copy())[0]['binned_contig_obj_ref']
+
+        cache = self.binned_contig_builder.binned_contig_cache
+        fingerprints = cache.get_json(
+            self.binned_contig_builder._get_bin_fingerprints_cache_key(first_ref), record=False)
+        self.assertEqual(set(fingerprints),
+                         {'out_header.001.fasta', 'out_header.002.fasta', 'out_header.003.fasta'})
+
+        bin_fingerprints = self.binned_contig_builder._get_bin_fingerprints(
+            self.test_directory_path,
+            self.binned_contig_builder._get_bin_sources(self.test_directory_path))
+        reusable_bins = self.binned_contig_builder._get_reusable_bins(
+            first_ref, self.large_assembly_ref, bin_fingerprints)
+        self.assertEqual(set(reusable_bins), set(fingerprints))
+
+        params['previous_binned_contig_ref'] = first_ref
+        second_ref = self.getImpl().file_to_binned_contigs(
+            self.getContext(), params)[0]['binned_contig_obj_ref']
+
+        first_data, second_data = [obj['data'] for obj in self.dfu.get_objects(
+            {'object_refs': [first_ref, second_ref]})['data']]
+        self.assertEqual(json.dumps(first_data), json.dumps(second_data))
+
     def test_binned_contigs_to_file(self):
 
         binned_contig_name = 'MyBinnedContig'
@@ -726,6 +1602,144 @@ class MetagenomeUtilsTest(unittest.TestCase):
                     self.assertEqual(''.join(sorted(data.decode().replace('\n', ''))),
                                      ''.join(sorted(origin_file.read().replace('\n', ''))))
 
+    def test_binned_contigs_to_file_bucketed(self):
+        params = {
+            'assembly_ref': self.large_assembly_ref,
+            'file_directory': self.test_directory_path,
+            'binned_contig_name': 'MyBinnedContig',
+            'workspace_name': self.dfu.ws_name_to_id(self.getWsName())
+        }
+        binned_contig_obj_ref = self.getImpl().file_to_binned_contigs(
+            self.getContext(), params)[0]['binned_contig_obj_ref']
+
+        result_directories = {}
+        for engine in ['indexed', 'bucketed']:
+            resultVal = self.getImpl().binned_contigs_to_file(
+                self.getContext(), {'input_ref': binned_contig_obj_ref,
+                                    'save_to_shock': False,
+                                    'engine': engine})[0]
+            result_directories[engine] = resultVal.get('bin_file_directory')
+
+        expect_files = ['out_header.001.fasta', 'out_header.002.fasta', 'out_header.003.fasta']
+        for engine, result_directory in result_directories.items():
+            self.assertCountEqual(os.listdir(result_directory), expect_files)
+
+        # same records, in assembly rather than bin order
+        for bin_file in expect_files:
+            records = [sorted((record.id, str(record.seq)) for record in SeqIO.parse(
+                os.path.join(result_directory, bin_file), "fasta"))
+                for result_directory in result_directories.values()]
+            self.assertEqual(records[0], records[1])
+
+    def test_extract_binned_contigs_as_assembly_stops_scan_early(self):
+        params = {
+            'assembly_ref': self.large_assembly_ref,
+            'file_directory': self.test_directory_path,
+            'binned_contig_name': 'MyBinnedContig',
+            'workspace_name': self.getWsName()
+        }
+        binned_contig_obj_ref = self.getImpl().file_to_binned_contigs(
+            self.getContext(), params)[0]['binned_contig_obj_ref']
+
+        # an assembly cache of its own, so the rewritten entry is not shared with other tests
+        builder = MetagenomeFileUtils(self.cfg)
+        builder.assembly_cache = LRUFileCache(os.path.join(self.scratch, 'early_stop_cache'),
+                                              10 * 1024 ** 3)
+        binned_contig_data = builder._get_binned_contig_object(binned_contig_obj_ref)[1]
+        bin_contigs = {bin['bid']: set(bin['contigs']) for bin in binned_contig_data['bins']}
+        with builder._get_cached_contig_file(
+                binned_contig_obj_ref + ';' + binned_contig_data['assembly_ref'],
+                with_index=False) as (assembly_contig_file, _):
+            records = list(SeqIO.parse(assembly_contig_file, 'fasta'))
+
+        # the contigs of out_header.002.fasta first, then a record no full scan can read
+        extracted_records = [record for record in records
+                             if record.id in bin_contigs['out_header.002.fasta']]
+        with open(assembly_contig_file, 'wb') as assembly_file:
+            for record in extracted_records:
+                assembly_file.write(f'>{record.id}\n{record.seq}\n'.encode())
+            assembly_file.write(b'>\xff\xfe\nACGT\n')
+            for record in records:
+                if record.id not in bin_contigs['out_header.002.fasta']:
+                    assembly_file.write(f'>{record.id}\n{record.seq}\n'.encode())
+        with self.assertRaises(UnicodeDecodeError):
+            build_fasta_index(assembly_contig_file,
+                              os.path.join(self.scratch, 'early_stop_assembly.fai'))
+
+        resultVal = builder.extract_binned_contigs_as_assembly({
+            'binned_contig_obj_ref': binned_contig_obj_ref,
+            'extracted_assemblies': 'out_header.002.fasta',
+            'assembly_suffix': '_early_stop',
+            'assembly_set_name': 'early_stop_assembly_set',
+            'workspace_name': self.getWsName()
+        })
+
+        # bucketed by default: no .fai is built and the scan stops before the bad record
+        self.assertEqual(resultVal['failed_bins'], [])
+        self.assertEqual(list(resultVal['assembly_refs']), ['out_header.002.fasta'])
+        self.assertFalse([file_name for file_name in os.listdir(builder.assembly_cache.cache_dir)
+                          if file_name.endswith('.fai')])
+
+    def test_MetagenomeFileUtil_write_bin_files_overlapping_bins(self):
+        assembly_contig_file = os.path.join(self.scratch, 'overlapping_bins.fasta')
+        with open(assembly_contig_file, 'w') as file:
+            file.write('>c1\nACGT\nAC\n>c2\nGG\n>c3\nTT\n')
+        bins = [{'bid': 'b1', 'contigs': {'c1': {}, 'c2': {}}},
+                {'bid': 'b2', 'contigs': {'c2': {}}},
+                {'bid': 'b3', 'contigs': {'c3': {}, 'c1': {}}}]
+
+        bin_files = {}
+        for engine in ['indexed', 'bucketed']:
+            result_directory = os.path.join(self.scratch, 'overlapping_bins_' + engine)
+            os.makedirs(result_directory)
+            write_bin_files = getattr(self.binned_contig_builder,
+                                      '_write_bin_files_' + engine)
+            bin_files[engine] = write_bin_files(bins, assembly_contig_file, result_directory)
+
+        # same records, in assembly rather than bin order
+        for indexed_file, bucketed_file in zip(bin_files['indexed'], bin_files['bucketed']):
+            records = [sorted((record.id, str(record.seq))
+                              for record in SeqIO.parse(bin_file, "fasta"))
+                       for bin_file in [indexed_file, bucketed_file]]
+            self.assertEqual(records[0], records[1])
+        with open(bin_files['bucketed'][1]) as bin_file:
+            self.assertEqual(bin_file.read(), '>c2\nGG\n')
+        with open(bin_files['bucketed'][2]) as bin_file:
+            self.assertEqual(bin_file.read(), '>c1\nACGTAC\n>c3\nTT\n')
+
+    def test_FastaUtils_split_fasta(self):
+        fasta_file_path = os.path.join(self.scratch, 'split_fasta.fasta')
+        with open(fasta_file_path, 'w') as file:
+            file.write('>contig_1 description\nACgt\nAC\n>contig_2\nGG\n>contig_3\nTT\n'
+                       '>contig_4\ncc\n')
+
+        split_directory = os.path.join(self.scratch, 'test_split_fasta')
+        os.makedirs(split_directory)
+        bin_1 = os.path.join(split_directory, 'bin_1')
+        bin_2 = os.path.join(split_directory, 'bin_2')
+        contig_file_paths = {'contig_1': [bin_1], 'contig_2': [bin_1, bin_2],
+                             'contig_4': [bin_1], 'missing_contig': [bin_2]}
+
+        # a single open handle forces reopening bin files in append mode
+        split_fasta(fasta_file_path, contig_file_paths, max_open_files=1)
+
+        self.assertEqual(contig_file_paths, {'missing_contig': [bin_2]})
+        with open(bin_1) as bin_file:
+            self.assertEqual(bin_file.read(),
+                             '>contig_1\nACGTAC\n>contig_2\nGG\n>contig_4\nCC\n')
+        with open(bin_2) as bin_file:
+            self.assertEqual(bin_file.read(), '>contig_2\nGG\n')
+
+        # only the leading records are wanted, the rest of the file is never parsed
+        bin_3 = os.path.join(split_directory, 'bin_3')
+        contig_file_paths = {'contig_1': [bin_3]}
+        with open(fasta_file_path, 'a') as file:
+            file.write('>' + 'x' * 1024 * 1024)
+        split_fasta(fasta_file_path, contig_file_paths)
+        self.assertEqual(contig_file_paths, {})
+        with open(bin_3) as bin_file:
+            self.assertEqual(bin_file.read(), '>contig_1\nACGTAC\n')
+
     def test_binned_contigs_to_file_save_to_shock(self):
 
         binned_contig_name = 'MyBinnedContig'
@@ -756,6 +1770,92 @@ class MetagenomeUtilsTest(unittest.TestCase):
         expect_files = ['out_header.001.fasta', 'out_header.002.fasta', 'out_header.003.fasta']
         self.assertCountEqual(list(map(os.path.basename, bin_files)), expect_files)
 
+    def test_binned_contigs_to_file_concatenated(self):
+
+        binned_contig_name = 'MyBinnedContig'
+        params = {
+            'assembly_ref': self.large_assembly_ref,
+            'file_directory': self.test_directory_path,
+            'binned_contig_name': binned_contig_name,
+            'workspace_name': self.dfu.ws_name_to_id(self.getWsName())
+        }
+
+        resultVal = self.getImpl().file_to_binned_contigs(self.getContext(), params)[0]
+        binned_contig_obj_ref = resultVal.get('binned_contig_obj_ref')
+
+        params = {
+            'input_ref': binned_contig_obj_ref,
+            'save_to_shock': False,
+            'output_layout': 'concatenated'
+        }
+        resultVal = self.getImpl().binned_contigs_to_file(self.getContext(), params)[0]
+
+        bin_file_directory = resultVal.get('bin_file_directory')
+        self.assertCountEqual(os.listdir(bin_file_directory),
+                              ['binned_contigs.fasta', 'binned_contigs.manifest.tsv'])
+
+        with open(os.path.join(bin_file_directory, 'binned_contigs.manifest.tsv')) as file:
+            self.assertEqual(file.readline(), 'bid\toffset\tlength\n')
+            manifest = [line.rstrip('\n').split('\t') for line in file]
+
+        expect_files = ['out_header.001.fasta', 'out_header.002.fasta', 'out_header.003.fasta']
+        self.assertCountEqual([bin_id for bin_id, offset, length in manifest], expect_files)
+        with open(os.path.join(bin_file_directory, 'binned_contigs.fasta'), 'rb') as file:
+            for bin_id, offset, length in manifest:
+                # each bin is a single ranged read
+                file.seek(int(offset))
+                bin_fasta = file.read(int(length)).decode()
+                records = list(SeqIO.parse(io.StringIO(bin_fasta), "fasta"))
+                self.assertTrue(all(record.description == f'{record.id} bin={bin_id}'
+                                    for record in records))
+
+                bin_fasta_file = os.path.join(self.test_directory_path, bin_id)
+                expect_records = [(record.id, str(record.seq).upper())
+                                  for record in SeqIO.parse(bin_fasta_file, "fasta")]
+                self.assertCountEqual([(record.id, str(record.seq)) for record in records],
+                                      expect_records)
+            self.assertFalse(file.read())
+
+    def test_binned_contigs_to_file_stream_to_shock(self):
+
+        binned_contig_name = 'MyBinnedContig'
+        params = {
+            'assembly_ref': self.large_assembly_ref,
+            'file_directory': self.test_directory_path,
+            'binned_contig_name': binned_contig_name,
+            'workspace_name': self.dfu.ws_name_to_id(self.getWsName())
+        }
+
+        resultVal = self.getImpl().file_to_binned_contigs(self.getContext(), params)[0]
+        binned_contig_obj_ref = resultVal.get('binned_contig_obj_ref')
+
+        params = {
+            'input_ref': binned_contig_obj_ref,
+            'keep_bin_files': False,
+            'compression': 'stored'
+        }
+        resultVal = self.getImpl().binned_contigs_to_file(self.getContext(), params)[0]
+        self.assertIsNone(resultVal.get('bin_file_directory'))
+
+        output_directory = os.path.join(self.scratch, 'test_stream_to_shock')
+        os.makedirs(output_directory)
+        result_file = self.dfu.shock_to_file({'shock_id': resultVal.get('shock_id'),
+                                              'file_path': output_directory}).get('file_path')
+
+        expect_files = ['out_header.001.fasta', 'out_header.002.fasta', 'out_header.003.fasta']
+        with zipfile.ZipFile(result_file) as z:
+            self.assertCountEqual(z.namelist(), expect_files)
+            self.assertEqual({info.compress_type for info in z.infolist()},
+                             {zipfile.ZIP_STORED})
+            for bin_file in expect_files:
+                bin_fasta_file = os.path.join(self.test_directory_path, bin_file)
+                expect_records = [(record.id, str(record.seq).upper())
+                                  for record in SeqIO.parse(bin_fasta_file, "fasta")]
+                z.extract(bin_file, output_directory)
+                records = [(record.id, str(record.seq)) for record in SeqIO.parse(
+                    os.path.join(output_directory, bin_file), "fasta")]
+                self.assertCountEqual(records, expect_records)
+
     def test_export_binned_contigs_as_excel(self):
 
         binned_contig_name = 'MyBinnedContig'
@@ -813,6 +1913,65 @@ class MetagenomeUtilsTest(unittest.TestCase):
         self.assertEqual(len(binned_contig_data.get('bins')), 3)
         self.assertEqual(binned_contig_data.get('total_contig_len'), 6116280)
 
+    def test_export_import_binned_contigs_as_table(self):
+
+        binned_contig_name = 'MyBinnedContig'
+        params = {
+            'assembly_ref': self.large_assembly_ref,
+            'file_directory': self.test_directory_path,
+            'binned_contig_name': binned_contig_name,
+            'workspace_name': self.dfu.ws_name_to_id(self.getWsName())
+        }
+
+        resultVal = self.getImpl().file_to_binned_contigs(self.getContext(), params)[0]
+        binned_contig_obj_ref = resultVal.get('binned_contig_obj_ref')
+
+        params = {
+            'input_ref': binned_contig_obj_ref,
+            'table_format': 'csv'
+        }
+        resultVal = self.getImpl().export_binned_contigs_as_table(self.getContext(), params)[0]
+        self.assertTrue('shock_id' in resultVal)
+
+        output_directory = os.path.join(self.scratch, 'test_export_binned_contigs_as_table')
+        os.makedirs(output_directory)
+        shock_to_file_params = {
+            'shock_id': resultVal.get('shock_id'),
+            'file_path': output_directory
+        }
+        result_file = self.dfu.shock_to_file(shock_to_file_params).get('file_path')
+
+        expect_files = [binned_contig_name + '.csv']
+        with zipfile.ZipFile(result_file) as z:
+            self.assertEqual(set(z.namelist()), set(expect_files))
+
+        table_file_path = os.path.join(resultVal.get('bin_file_directory'), expect_files[0])
+        shock_id = self.dfu.file_to_shock({'file_path': table_file_path}).get('shock_id')
+
+        params = {
+            'shock_id': shock_id,
+            'workspace_name': self.getWsName(),
+            'validate': 1
+        }
+        resultVal = self.getImpl().import_table_as_binned_contigs(self.getContext(), params)[0]
+        self.assertTrue('binned_contigs_ref' in resultVal)
+        self.assertEqual(resultVal['unknown_contigs'], [])
+        self.assertEqual(resultVal['duplicate_contigs'], [])
+
+        binned_contig_data = self.dfu.get_objects(
+            {'object_refs': [resultVal['binned_contigs_ref']]})['data'][0]['data']
+        original_binned_contig_data = self.dfu.get_objects(
+            {'object_refs': [binned_contig_obj_ref]})['data'][0]['data']
+
+        self.assertEqual(binned_contig_data.get('assembly_ref'),
+                         original_binned_contig_data.get('assembly_ref'))
+        self.assertEqual(binned_contig_data.get('total_contig_len'),
+                         original_binned_contig_data.get('total_contig_len'))
+        self.assertEqual({contig_bin['bid']: contig_bin['contigs']
+                          for contig_bin in binned_contig_data.get('bins')},
+                         {contig_bin['bid']: contig_bin['contigs']
+                          for contig_bin in original_binned_contig_data.get('bins')})
+
     def test_extract_binned_contigs_as_assembly(self):
 
         binned_contig_name = 'MyBinnedContig'
@@ -828,16 +1987,24 @@ class MetagenomeUtilsTest(unittest.TestCase):
 
         params = {
             'binned_contig_obj_ref': binned_contig_obj_ref,
-            'extracted_assemblies': 'out_header.001.fasta,out_header.002.fasta',
+            'extracted_assemblies': 'out_header.002.fasta,out_header.001.fasta',
             'assembly_suffix': '_assembly',
             'assembly_set_name': 'test2_assembly_set',
-            'workspace_name': self.getWsName()
+            'workspace_name': self.getWsName(),
+            'max_concurrent_saves': 2
         }
 
         resultVal = self.getImpl().extract_binned_contigs_as_assembly(self.getContext(),
                                                                       params)[0]
 
         self.assertTrue('assembly_ref_list' in resultVal)
+        self.assertEqual(resultVal['failed_bins'], [])
+        self.assertEqual(list(resultVal['assembly_refs'].values()),
+                         resultVal['assembly_ref_list'])
+        assembly_infos = self.wsClient.get_object_info3(
+            {'objects': [{'ref': ref} for ref in resultVal['assembly_ref_list']]})['infos']
+        self.assertEqual([info[1] for info in assembly_infos],
+                         ['out_header.002.fasta_assembly', 'out_header.001.fasta_assembly'])
         self.assertTrue('report_name' in resultVal)
         self.assertTrue('report_ref' in resultVal)
         self.assertTrue('assembly_set_ref' in resultVal)
@@ -861,6 +2028,17 @@ class MetagenomeUtilsTest(unittest.TestCase):
             self.getImpl().extract_binned_contigs_as_assembly(self.getContext(),
                                                               invalidate_input_params)
 
+    def test_MetagenomeFileUtil_save_bin_assemblies(self):
+        bin_files = {'out_header.001.fasta': self.assembly_fasta_file_path,
+                     'out_header.002.fasta': os.path.join(self.scratch, 'nonexisting.fasta')}
+
+        assembly_refs, failed_bins = self.binned_contig_builder._save_bin_assemblies(
+            bin_files, self.getWsName(), '_assembly', 2)
+
+        self.assertEqual(list(assembly_refs), ['out_header.001.fasta'])
+        self.assertEqual([failed_bin['bid'] for failed_bin in failed_bins],
+                         ['out_header.002.fasta'])
+
     def test_empty_extract_binned_contigs_as_assembly(self):
 
         binned_contig_name = 'MyBinnedContig'
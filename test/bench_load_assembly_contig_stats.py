@@ -0,0 +1,83 @@
+"""
+bench_load_assembly_contig_stats: check that AssemblyStatsUtils.load_assembly_contig_stats
+                                  stays within bounded memory on a multi-million contig
+                                  Assembly object, compared to json.load
+
+opt-in check, not collected by the test suite; run from the module directory with
+    PYTHONPATH=lib python test/bench_load_assembly_contig_stats.py [--contigs 2000000]
+exits non zero if the streamed load peaks above json.load's peak / --min-ratio; the fixed
+size read buffers dominate below a few hundred thousand contigs
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from MetagenomeUtils.Utils.AssemblyStatsUtils import load_assembly_contig_stats
+
+
+def _write_assembly_object(json_file_path, num_contigs):
+    with open(json_file_path, 'w') as json_file:
+        json_file.write('{"assembly_id": "large_assembly", "contigs": {')
+        for i in range(num_contigs):
+            if i:
+                json_file.write(', ')
+            contig_id = f'NODE_{i}'
+            json_file.write(json.dumps(contig_id) + ': ' +
+                            json.dumps({'contig_id': contig_id,
+                                        'length': i + 100,
+                                        'gc_content': round((i % 1000) / 1000, 3),
+                                        'md5': '0123456789abcdef0123456789abcdef'}))
+        json_file.write('}, "dna_size": 0, "num_contigs": %d}' % num_contigs)
+
+
+def _traced_peak(label, load):
+    start_time = time.time()
+    tracemalloc.start()
+    result = load()
+    peak_size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{label}: peak {peak_size / 1024 ** 2:.1f} MB in {time.time() - start_time:.2f}s')
+
+    return result, peak_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='load_assembly_contig_stats memory check')
+    parser.add_argument('--contigs', type=int, default=2000000,
+                        help='number of contigs in the generated Assembly object')
+    parser.add_argument('--min-ratio', type=float, default=3,
+                        help='minimum json.load peak / load_assembly_contig_stats peak')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_assembly_stats_') as bench_directory:
+        json_file_path = os.path.join(bench_directory, 'large_assembly_object.json')
+        _write_assembly_object(json_file_path, args.contigs)
+
+        assembly_contigs, stream_peak_size = _traced_peak(
+            'load_assembly_contig_stats', lambda: load_assembly_contig_stats(json_file_path))
+
+        def json_load():
+            with open(json_file_path) as json_file:
+                return json.load(json_file)
+
+        assembly_object, json_peak_size = _traced_peak('json.load', json_load)
+        del assembly_object
+
+    last_contig = f'NODE_{args.contigs - 1}'
+    assert len(assembly_contigs) == args.contigs
+    assert assembly_contigs.get('NODE_0') == (100, 0.0)
+    assert assembly_contigs.get(last_contig) == (args.contigs + 99,
+                                                 round(((args.contigs - 1) % 1000) / 1000, 3))
+
+    ratio = json_peak_size / stream_peak_size
+    print(f'json.load / load_assembly_contig_stats peak: {ratio:.1f}x')
+    if ratio < args.min_ratio:
+        sys.exit(f'expecting at least {args.min_ratio}x, getting {ratio:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+bench_pack_files: time ArchiveUtils.pack_files against a single threaded ZipFile.write
+
+opt-in benchmark, not collected by the test suite; run from the module directory with
+    PYTHONPATH=lib python test/bench_pack_files.py [--files 8] [--size-mb 16] [--parallelism 4]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+from MetagenomeUtils.Utils.ArchiveUtils import pack_files
+
+_ASSEMBLY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Data',
+                              'small_bin_contig_file.fasta')
+
+
+def _write_bin_files(bench_directory, n_files, file_size):
+    with open(_ASSEMBLY_FILE, 'rb') as assembly_file:
+        assembly = assembly_file.read()
+
+    file_paths = []
+    for index in range(n_files):
+        file_paths.append(os.path.join(bench_directory, f'bin.{index:03d}.fasta'))
+        with open(file_paths[-1], 'wb') as bin_file:
+            while bin_file.tell() < file_size:
+                bin_file.write(assembly)
+
+    return file_paths
+
+
+def _timed(label, pack):
+    start_time = time.time()
+    pack()
+    print(f'{label}: {time.time() - start_time:.2f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='time pack_files against ZipFile.write')
+    parser.add_argument('--files', type=int, default=8, help='number of bin files')
+    parser.add_argument('--size-mb', type=int, default=16, help='size of each bin file')
+    parser.add_argument('--parallelism', type=int, default=os.cpu_count(),
+                        help='pack_files max_workers')
+    args = parser.parse_args()
+
+    bench_directory = tempfile.mkdtemp(prefix='bench_pack_files_')
+    try:
+        file_paths = _write_bin_files(bench_directory, args.files,
+                                      args.size_mb * 1024 * 1024)
+
+        def zipfile_write():
+            with zipfile.ZipFile(os.path.join(bench_directory, 'zipfile_write.zip'), 'w',
+                                 zipfile.ZIP_DEFLATED, allowZip64=True) as zip_file:
+                for file_path in file_paths:
+                    zip_file.write(file_path, os.path.basename(file_path))
+
+        _timed('ZipFile.write deflated', zipfile_write)
+        for layout in ('deflated', 'stored', 'bgzf'):
+            for parallelism in sorted({1, args.parallelism}):
+                zip_path = os.path.join(bench_directory, f'{layout}_{parallelism}.zip')
+                _timed(f'pack_files {layout} with parallelism {parallelism}',
+                       lambda: pack_files(zip_path, file_paths, layout,
+                                          max_workers=parallelism))
+    finally:
+        shutil.rmtree(bench_directory)
+
+
+if __name__ == '__main__':
+    main()